@@ -0,0 +1,113 @@
+"""
+成绩表列转换的基准测试
+
+比较原有的逐单元格转换（Series.apply + convert_to_float_or_string）和
+score_converter.convert_score_frame 的向量化转换，并校验两者输出完全一致。
+
+用法：
+    python benchmarks/convert_benchmark.py [--rows 100000] [--repeat 3]
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from file_import.score_converter import SPECIAL_COLUMNS, convert_score_frame, convert_to_float_or_string
+
+
+def legacy_convert_score_frame(df: pd.DataFrame) -> list:
+    """
+    原 FileDealer.import_file 中的转换逻辑，作为对照。
+    """
+    data = {}
+    for col in df.columns:
+        if col in SPECIAL_COLUMNS:
+            data[col] = df[col].apply(convert_to_float_or_string).tolist()
+        else:
+            data[col] = df[col].fillna('').astype(str).tolist()
+    return [dict(zip(data.keys(), row)) for row in zip(*data.values())]
+
+
+def make_frame(rows: int, seed: int = 0) -> pd.DataFrame:
+    """
+    生成与教务成绩表结构相似的测试数据，包含缺失值、"合格"、等级成绩和数字字符串。
+    """
+    rng = random.Random(seed)
+    grades = ['优秀', '良好', '中等', '及格', '不及格', '合格', ' 合格 ']
+
+    def score():
+        roll = rng.random()
+        if roll < 0.05:
+            return np.nan
+        if roll < 0.15:
+            return rng.choice(grades)
+        if roll < 0.20:
+            return str(rng.randint(60, 100))
+        return rng.randint(0, 100)
+
+    return pd.DataFrame({
+        "学年学期": [f"20{rng.randint(18, 24)}-20{rng.randint(19, 25)}-{rng.randint(1, 3)}" for _ in range(rows)],
+        "课程名": [f"课程{rng.randint(0, 2000)}" for _ in range(rows)],
+        "课程号": [rng.randint(10000, 99999) for _ in range(rows)],
+        "总成绩": [score() for _ in range(rows)],
+        "学分": [rng.choice([0.5, 1, 1.5, 2, 3, 4, np.nan]) for _ in range(rows)],
+        "学时": [rng.choice([16, 32, 48, 64]) for _ in range(rows)],
+        "绩点": [rng.choice([0, 1.0, 2.3, 3.7, 4.0, np.nan]) for _ in range(rows)],
+        "等级成绩": [rng.choice(grades + [np.nan, 'A', '95']) for _ in range(rows)],
+        "考试日期": [rng.choice(["2023-01-05", np.nan, "2024-06-30"]) for _ in range(rows)],
+    })
+
+
+def assert_identical(expected: list, actual: list):
+    """
+    逐单元格校验取值和类型完全一致（NaN 视为相等）。
+    """
+    assert len(expected) == len(actual), "行数不一致"
+    for row_index, (expected_row, actual_row) in enumerate(zip(expected, actual)):
+        assert list(expected_row) == list(actual_row), f"第 {row_index} 行的列不一致"
+        for key, expected_value in expected_row.items():
+            actual_value = actual_row[key]
+            same = (type(expected_value) is type(actual_value) and
+                    (expected_value == actual_value or
+                     (isinstance(expected_value, float) and math.isnan(expected_value) and math.isnan(actual_value))))
+            assert same, f"第 {row_index} 行 {key} 列不一致: {expected_value!r} != {actual_value!r}"
+    assert json.dumps(expected, ensure_ascii=False) == json.dumps(actual, ensure_ascii=False)
+
+
+def best_of(func, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="成绩表列转换基准测试")
+    parser.add_argument("--rows", type=int, default=100000, help="测试数据行数")
+    parser.add_argument("--repeat", type=int, default=3, help="重复次数，取最快的一次")
+    args = parser.parse_args()
+
+    df = make_frame(args.rows)
+    assert_identical(legacy_convert_score_frame(df), convert_score_frame(df))
+
+    legacy = best_of(lambda: legacy_convert_score_frame(df), args.repeat)
+    vectorized = best_of(lambda: convert_score_frame(df), args.repeat)
+    print(f"行数: {args.rows}")
+    print(f"逐单元格转换: {legacy * 1000:.1f} ms")
+    print(f"向量化转换:   {vectorized * 1000:.1f} ms")
+    print(f"加速比:       {legacy / vectorized:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+课程匹配索引的基准测试
+
+在包含大量课程的索引中测量精确、规范化和近似匹配的单次查询耗时。
+测量之前先检查近似匹配不会把系列课程中的另一门（序号不同）或名称只多出一段的课程当作同一门课程。
+
+用法：
+    python benchmarks/course_matcher_benchmark.py [--courses 30000] [--queries 5000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from degree_process.course_matcher import CourseMatcher
+
+PREFIXES = ["高等", "大学", "线性", "概率", "离散", "数据", "计算机", "程序", "操作", "软件", "电路", "信号", "机器",
+            "马克思主义", "中国近现代史", "思想道德", "形势", "体育", "英语", "物理", "化学", "生物", "经济", "管理"]
+TOPICS = ["数学", "物理", "代数", "统计", "结构", "网络", "原理", "系统", "工程", "分析", "设计", "实验", "导论", "基础",
+          "方法", "应用", "理论", "技术", "概论", "专题", "研究", "实践"]
+SUFFIXES = ["", "", "", "(上)", "(下)", "(双语)", "A", "B", "Ⅰ", "Ⅱ", "(实验)", "(荣誉)"]
+
+
+def make_names(count: int, rng: random.Random) -> list:
+    names = set()
+    while len(names) < count:
+        names.add(rng.choice(PREFIXES) + rng.choice(TOPICS) + rng.choice(TOPICS) + rng.choice(SUFFIXES) +
+                  str(rng.randint(0, 999)))
+    return sorted(names)
+
+
+def perturb(name: str, rng: random.Random) -> str:
+    """
+    模拟培养方案与成绩中课程名的常见差异：全角括号、空格、注释、个别字符不同。
+    """
+    roll = rng.random()
+    if roll < 0.25:
+        return name.replace("(", "（").replace(")", "）")
+    if roll < 0.5:
+        return " ".join(name)
+    if roll < 0.75:
+        return name + "（双语）"
+    # 替换中间的一个字符，末尾的序号保持不变
+    middle = len(name) // 2
+    return name[:middle] + "X" + name[middle + 1:]
+
+
+# (索引中的课程名, 查询的课程名, 是否应匹配)
+MATCH_CHECKS = [
+    ("大学物理实验(一)", "大学物理实验(二)", False),
+    ("程序设计基础I", "程序设计基础II", False),
+    ("程序设计基础Ⅰ", "程序设计基础Ⅱ", False),
+    ("大学英语1", "大学英语2", False),
+    ("高等数学(上)", "高等数学(下)", False),
+    ("高等数学(上)", "高等数学", False),
+    ("马克思主义基本原理概论", "马克思主义基本原理", False),
+    ("马克思主义基本原理", "马克思主义基本原理概论", False),
+    ("大学物理实验(二)", "大学物里实验(二)", True),
+    ("程序设计基础II", "程序设计基础Ⅱ", True),
+    ("高等数学(上)", "高等数学（上）（双语）", True),
+    ("毛泽东思想和中国特色社会主义理论体系概论", "毛泽东思想与中国特色社会主义理论体系概论", True),
+]
+
+
+def check_matches():
+    """
+    检查 MATCH_CHECKS 中的每一对课程名，课程名与其他课程一起放入索引，避免只有一个候选。
+    """
+    for indexed, query, expected in MATCH_CHECKS:
+        others = [name for name, _, _ in MATCH_CHECKS if name != indexed and name != query]
+        matcher = CourseMatcher({"课程名": name} for name in others + [indexed])
+        course, similarity = matcher.match_with_score(query)
+        matched = course is not None and course["课程名"] == indexed
+        assert matched == expected, f"{query!r} -> {indexed!r}: 期望{'匹配' if expected else '不匹配'}，" \
+                                    f"结果 {course and course['课程名']!r} ({similarity:.3f})"
+    print(f"匹配检查通过: {len(MATCH_CHECKS)} 对课程名")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="课程匹配索引基准测试")
+    parser.add_argument("--courses", type=int, default=30000, help="索引中的课程数")
+    parser.add_argument("--queries", type=int, default=5000, help="查询次数")
+    args = parser.parse_args()
+
+    check_matches()
+    rng = random.Random(0)
+    names = make_names(args.courses, rng)
+
+    start = time.perf_counter()
+    matcher = CourseMatcher({"课程名": name} for name in names)
+    build_time = time.perf_counter() - start
+
+    samples = rng.sample(names, min(args.queries, len(names)))
+    for label, queries in (("精确", samples), ("近似", [perturb(name, rng) for name in samples])):
+        start = time.perf_counter()
+        matched = sum(matcher.match(query) is not None for query in queries)
+        elapsed = time.perf_counter() - start
+        print(f"{label}查询: 命中 {matched}/{len(queries)}，平均 {elapsed / len(queries) * 1e6:.1f} µs/次")
+    print(f"建立索引（{len(names)} 门课程）: {build_time * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
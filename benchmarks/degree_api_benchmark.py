@@ -0,0 +1,74 @@
+"""
+无界面学位进度计算（degree_api）的基准测试
+
+在临时目录中生成一份培养方案和一批学生的成绩（SQLite 成绩存储），
+分别顺序执行和用线程池并发执行 run_degree_progress，并校验结果一致。不需要显示器。
+
+用法：
+    python benchmarks/degree_api_benchmark.py [--students 200] [--rows 300] [--workers 4]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.docx_table_benchmark import make_document
+from degree_process.degree_api import load_program, run_degree_progress
+from degree_process.program_parser import ProgramCache
+from file_import.score_store import ScoreStore
+
+
+def make_students(store: ScoreStore, count: int, rows: int, rng: random.Random) -> list:
+    student_ids = []
+    for index in range(count):
+        student_id = f"3722{index:08d}"
+        scores = [{'课程号': f"C{row}", '课程名': f"{row}-1", '学年学期': "2023-2024-1", '成绩': str(rng.randint(60, 100)),
+                   '学分': "2"} for row in range(1, rows + 1) if rng.random() < 0.7]
+        store.save_student({'姓名': f"学生{index}", '学号': student_id}, scores)
+        student_ids.append(student_id)
+    return student_ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description="无界面学位进度计算基准测试")
+    parser.add_argument("--students", type=int, default=200, help="学生数")
+    parser.add_argument("--rows", type=int, default=300, help="培养方案课程表格行数")
+    parser.add_argument("--workers", type=int, default=4, help="并发线程数")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp()
+    program_path = os.path.join(work_dir, "program.docx")
+    make_document(args.rows, program_path)
+    store = ScoreStore(os.path.join(work_dir, "scores.db"))
+    student_ids = make_students(store, args.students, args.rows, random.Random(0))
+
+    cache = ProgramCache(cache_dir=os.path.join(work_dir, "cache"))
+    load_program(program_path, cache)
+
+    def audit(student_id):
+        return run_degree_progress(program_path, student_id, score_store=store, export=False, cache=cache)
+
+    start = time.perf_counter()
+    sequential = [audit(student_id) for student_id in student_ids]
+    sequential_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        concurrent = list(executor.map(audit, student_ids))
+    concurrent_time = time.perf_counter() - start
+
+    assert [result.tables for result in sequential] == [result.tables for result in concurrent]
+    print(f"学生数: {args.students}，课程表格行数: {args.rows}")
+    print(f"顺序执行:             {sequential_time * 1000:.1f} ms  "
+          f"({sequential_time / args.students * 1000:.2f} ms/人)")
+    print(f"线程池（{args.workers} 线程）:    {concurrent_time * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+培养方案课程表格提取的基准测试
+
+比较原有的按列访问 row.cells 的提取方式和 docx_stream.iter_table_rows 的单遍提取，
+以及流式解析整个文档（docx_stream.stream_program），并校验结果一致。
+
+用法：
+    python benchmarks/docx_table_benchmark.py [--rows 2000] [--repeat 3]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from docx import Document
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from degree_process.docx_stream import stream_program
+from degree_process.program_parser import DESIRED_COLUMNS, REQUIRED_COLUMN, parse_program
+
+HEADER = ['课程编号', '课程名称', '修读形式', '学分', '总学时', REQUIRED_COLUMN, '实验学时', '开课学年', '开课学期',
+          '备注']
+
+
+def legacy_extract(document) -> list:
+    """
+    原 DocxProcess.extract_tables_and_paragraphs 中的表格提取逻辑，作为对照。
+    """
+    results = []
+    for table in document.tables:
+        if not table.rows:
+            continue
+        original_header_row = [cell.text.strip() for cell in table.rows[0].cells]
+        if REQUIRED_COLUMN not in original_header_row:
+            continue
+        column_indices = {col: original_header_row.index(col) for col in DESIRED_COLUMNS if
+                          col in original_header_row}
+        rows = []
+        for row in table.rows[1:]:
+            row_data = [row.cells[column_indices[col]].text.strip() for col in DESIRED_COLUMNS if
+                        col in column_indices]
+            course_name = row.cells[column_indices['课程名称']].text.strip()
+            rows.append(row_data + [course_name])
+        results.append(rows)
+    return results
+
+
+def make_document(rows: int, path: str):
+    """
+    生成一个包含无关表格、段落和一个带合并单元格的大课程表格的文档。
+    """
+    document = Document()
+    document.add_paragraph("专业核心课 最低必修学分数：30 最低选修学分数：10")
+    for _ in range(20):
+        document.add_paragraph("培养目标 " * 30)
+        document.add_table(rows=10, cols=4).rows[0].cells[0].text = "无关表格"
+
+    table = document.add_table(rows=rows + 1, cols=len(HEADER))
+    for col, header in enumerate(HEADER):
+        table.rows[0].cells[col].text = header
+    for row in range(1, rows + 1):
+        cells = table.rows[row].cells
+        for col in range(len(HEADER)):
+            cells[col].text = f"{row}-{col}"
+    # 纵向合并"开课学年"、横向合并"备注"和"开课学期"
+    for start in range(1, rows - 4, 50):
+        table.cell(start, 7).merge(table.cell(start + 3, 7))
+        table.cell(start + 1, 8).merge(table.cell(start + 1, 9))
+    document.save(path)
+
+
+def best_of(func, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="培养方案课程表格提取基准测试")
+    parser.add_argument("--rows", type=int, default=2000, help="课程表格行数")
+    parser.add_argument("--repeat", type=int, default=3, help="重复次数，取最快的一次")
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "program.docx")
+    make_document(args.rows, path)
+    document = Document(path)
+
+    legacy = legacy_extract(document)
+    program = parse_program(document)
+    assert [[row[:-1] for row in table] for table in legacy] == [table['rows'] for table in program.tables]
+    assert all(row[-1] == row[0] for table in legacy for row in table)
+    assert stream_program(path) == program
+
+    legacy_time = best_of(lambda: legacy_extract(document), args.repeat)
+    grid_time = best_of(lambda: parse_program(document), args.repeat)
+    stream_time = best_of(lambda: stream_program(path), args.repeat)
+    print(f"课程表格行数: {args.rows}")
+    print(f"按列访问 row.cells:     {legacy_time * 1000:.1f} ms")
+    print(f"单遍提取（已打开文档）: {grid_time * 1000:.1f} ms  加速比 {legacy_time / grid_time:.1f}x")
+    print(f"流式解析（含读取文件）: {stream_time * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
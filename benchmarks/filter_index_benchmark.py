@@ -0,0 +1,95 @@
+"""
+成绩表格列过滤索引的基准测试
+
+比较原 CustomSortFilterProxyModel.filterAcceptsRow 的逐行判断（每行每个过滤列在所选取值列表中查找）
+和 FilterIndex 的位集交集，以及修改单元格后的增量更新，并校验结果一致。
+
+用法：
+    python benchmarks/filter_index_benchmark.py [--rows 100000] [--repeat 3]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from file_import.filter_index import FilterIndex
+from file_import.score_table import ScoreTable
+
+TERMS = [f"{year}-{year + 1}-{term}" for year in range(2015, 2025) for term in (1, 2)]
+COURSE_TYPES = ["必修", "选修", "校选", "通识", "实践"]
+GRADES = [str(score) for score in range(60, 101)] + ["合格", "优秀", "良好", "中等", "及格"]
+
+
+def legacy_accepted(scores: list, headers: list, filters: dict) -> list:
+    """
+    原 filterAcceptsRow 的判断逻辑，作为对照。
+    """
+    accepted = []
+    for score in scores:
+        row_accepted = True
+        for column, values in filters.items():
+            if not values or str(score.get(headers[column], "")) not in values:
+                row_accepted = False
+                break
+        accepted.append(row_accepted)
+    return accepted
+
+
+def best_of(func, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="成绩表格列过滤索引基准测试")
+    parser.add_argument("--rows", type=int, default=100000, help="成绩行数")
+    parser.add_argument("--repeat", type=int, default=3, help="重复次数，取最快的一次")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    headers = ["课程名", "学年学期", "课程性质", "总成绩"]
+    scores = [{"课程名": f"课程{rng.randint(0, 5000)}", "学年学期": rng.choice(TERMS),
+               "课程性质": rng.choice(COURSE_TYPES), "总成绩": rng.choice(GRADES)} for _ in range(args.rows)]
+    filters = {1: TERMS[4:16], 2: ["必修", "选修", "通识"], 3: GRADES[10:]}
+
+    table = ScoreTable(scores, headers)
+    index = FilterIndex(table)
+
+    def apply_filters():
+        for column, values in filters.items():
+            index.set_filter(column, values)
+
+    apply_filters()
+    assert index.accepted.tolist() == legacy_accepted(scores, headers, filters)
+
+    legacy_time = best_of(lambda: legacy_accepted(scores, headers, filters), args.repeat)
+    index_time = best_of(apply_filters, args.repeat)
+
+    edits = [(rng.randrange(args.rows), rng.choice(list(filters)), rng.choice(TERMS + COURSE_TYPES + GRADES))
+             for _ in range(1000)]
+    start = time.perf_counter()
+    for row, column, text in edits:
+        table.set_text(row, column, text)
+    edit_time = (time.perf_counter() - start) / len(edits)
+    for row, column, text in edits:
+        scores[row][headers[column]] = text
+    assert np.array_equal(index.accepted, np.array(legacy_accepted(scores, headers, filters)))
+
+    print(f"成绩行数: {args.rows}，过滤列数: {len(filters)}")
+    print(f"逐行判断:   {legacy_time * 1000:.1f} ms")
+    print(f"位集交集:   {index_time * 1000:.1f} ms  加速比 {legacy_time / index_time:.1f}x")
+    print(f"修改单元格后的增量更新: {edit_time * 1e6:.1f} µs/次")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+成绩接口客户端的基准测试（离线，使用 scraper.stub_grade_server）
+
+比较逐页顺序请求（每页 10 条、每个请求新建连接，即 urllib 的默认行为）和 GradeApiClient
+（最大每页条数、长连接池、并发分页）获取全部成绩的耗时、请求数和连接数，并校验结果一致。
+
+用法：
+    python benchmarks/grade_client_benchmark.py [--rows 400] [--latency 0.02] [--max-page-size 100] [--repeat 3]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import urllib.parse
+import urllib.request
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scraper.grade_client import (DEFAULT_ORDER, GRADE_API_PATH, GRADE_DATASET, GradeApiClient, add_browser_cookies,
+                                  grades_to_tables)
+from scraper.stub_grade_server import (SESSION_COOKIE_NAME, SESSION_COOKIE_VALUE, make_stub_grades,
+                                       start_stub_server, stub_session_cookies)
+
+
+def sequential_fetch(base_url: str, page_size: int = 10) -> list:
+    """
+    逐页顺序请求，每个请求新建连接，作为对照。
+    """
+    rows = []
+    page_number = 1
+    while True:
+        body = urllib.parse.urlencode({"querySetting": "[]", "*order": DEFAULT_ORDER, "pageSize": page_size,
+                                       "pageNumber": page_number}).encode("utf-8")
+        request = urllib.request.Request(base_url + GRADE_API_PATH, data=body, headers={
+            "Cookie": f"{SESSION_COOKIE_NAME}={SESSION_COOKIE_VALUE}"})
+        with urllib.request.urlopen(request) as response:
+            dataset = json.loads(response.read().decode("utf-8"))["datas"][GRADE_DATASET]
+        rows.extend(dataset["rows"])
+        if not dataset["rows"] or len(rows) >= dataset["totalSize"]:
+            return rows
+        page_number += 1
+
+
+def pooled_fetch(base_url: str) -> list:
+    client = GradeApiClient(base_url)
+    add_browser_cookies(client.cookie_jar, stub_session_cookies(base_url))
+    try:
+        return client.fetch_all_grades()
+    finally:
+        client.close()
+
+
+def measure(server, func, repeat: int):
+    """
+    :return: (最快一次的耗时, 该次的请求数, 该次的连接数, 结果)
+    """
+    best = None
+    for _ in range(repeat):
+        requests, connections = server.request_count, server.connection_count
+        start = time.perf_counter()
+        result = func(server.base_url)
+        elapsed = time.perf_counter() - start
+        run = (elapsed, server.request_count - requests, server.connection_count - connections, result)
+        if best is None or run[0] < best[0]:
+            best = run
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="成绩接口客户端基准测试")
+    parser.add_argument("--rows", type=int, default=400, help="成绩条数")
+    parser.add_argument("--latency", type=float, default=0.02, help="模拟服务器每个请求的延迟（秒）")
+    parser.add_argument("--max-page-size", type=int, default=100, help="模拟服务器的每页条数上限")
+    parser.add_argument("--repeat", type=int, default=3, help="重复次数，取最快的一次")
+    args = parser.parse_args()
+
+    grades = make_stub_grades(args.rows)
+    server = start_stub_server(grades, latency=args.latency, max_page_size=args.max_page_size)
+    try:
+        sequential = measure(server, sequential_fetch, args.repeat)
+        pooled = measure(server, pooled_fetch, args.repeat)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert sequential[3] == grades and pooled[3] == grades
+    assert grades_to_tables(sequential[3]) == grades_to_tables(pooled[3])
+
+    print(f"成绩条数: {args.rows}，模拟延迟: {args.latency * 1000:.0f} ms/请求，服务器每页上限: {args.max_page_size}")
+    for label, (elapsed, requests, connections, _) in (("逐页顺序请求（每页 10 条）", sequential),
+                                                       ("连接池 + 最大每页 + 并发分页", pooled)):
+        print(f"{label}: {elapsed * 1000:7.1f} ms  请求 {requests} 次，建立连接 {connections} 个")
+    print(f"加速比 {sequential[0] / pooled[0]:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+学位进度数组模型的基准测试
+
+比较原 CourseInfoWidget.calculate_completed_credits 的逐行计算和 DegreeProgressModel 的向量化计算，
+以及修改一条成绩后的增量更新，并校验结果一致。
+
+用法：
+    python benchmarks/progress_model_benchmark.py [--types 12] [--rows 2000] [--repeat 5]
+"""
+
+import argparse
+import copy
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from degree_process.progress_model import DegreeProgressModel
+
+HEADER = ['课程名称', '修读形式', '学分', '总学时', '开课学年', '开课学期', '状态', '成绩', '绩点']
+
+
+def legacy_completed_credits(table_data) -> float:
+    """
+    原 CourseInfoWidget.calculate_completed_credits 的逻辑，作为对照。
+    """
+    headers = table_data['header']
+    credit_index = headers.index("学分") if "学分" in headers else -1
+    status_index = headers.index("状态") if "状态" in headers else -1
+    completed_credits = 0
+    if credit_index != -1 and status_index != -1:
+        for row in table_data['data']:
+            if row[status_index] == "已修读":
+                try:
+                    completed_credits += float(row[credit_index])
+                except ValueError:
+                    pass
+    return completed_credits
+
+
+def make_data(types: int, rows: int, rng: random.Random) -> list:
+    data = []
+    for type_index in range(types):
+        table = []
+        for row in range(rows):
+            completed = rng.random() < 0.6
+            table.append([f"课程{type_index}-{row}", rng.choice(["必修", "选修"]), rng.choice(["1", "2", "3", "4.5", "-"]),
+                          "32", "第一学年", "1", "已修读" if completed else "未修读", "90" if completed else "", ""])
+        data.append({'info': [f"课程类型{type_index}", 20, 10], 'table': {'header': HEADER, 'data': table}})
+    return data
+
+
+def best_of(func, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="学位进度数组模型基准测试")
+    parser.add_argument("--types", type=int, default=12, help="课程类型数")
+    parser.add_argument("--rows", type=int, default=2000, help="每个课程类型的课程数")
+    parser.add_argument("--repeat", type=int, default=5, help="重复次数，取最快的一次")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    data = make_data(args.types, args.rows, rng)
+    model = DegreeProgressModel(copy.deepcopy(data))
+    assert [round(value, 6) for value in model.completed_credits()] == \
+           [round(legacy_completed_credits(item['table']), 6) for item in data]
+
+    legacy_time = best_of(lambda: [legacy_completed_credits(item['table']) for item in data], args.repeat)
+    vector_time = best_of(lambda: model._compute_all(), args.repeat)
+
+    names = [row[0] for item in model.data for row in item['table']['data']]
+    updates = [({'课程名': name}, {'课程名': name, '总成绩': '75', '绩点': '2.5'}) for name in rng.sample(names, 100)]
+    start = time.perf_counter()
+    for old_score, new_score in updates:
+        model.update_score(old_score, new_score)
+    update_time = (time.perf_counter() - start) / len(updates)
+    assert [round(value, 6) for value in model.completed_credits()] == \
+           [round(legacy_completed_credits(item['table']), 6) for item in model.data]
+
+    print(f"课程类型数: {args.types}，每类课程数: {args.rows}")
+    print(f"逐行计算全部课程类型: {legacy_time * 1000:.2f} ms")
+    print(f"向量化计算全部课程类型: {vector_time * 1000:.2f} ms  加速比 {legacy_time / vector_time:.1f}x")
+    print(f"修改一条成绩后的增量更新: {update_time * 1e6:.1f} µs/次")
+
+
+if __name__ == "__main__":
+    main()
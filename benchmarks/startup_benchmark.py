@@ -0,0 +1,119 @@
+"""
+程序冷启动的基准测试
+
+在子进程中用 python -X importtime 启动主窗口，测量从解释器启动到第一个窗口绘制完成的时间，
+并按 -X importtime 的格式列出第一个窗口之前导入耗时最多的模块。
+对照组先导入原来在启动时加载的模块（pandas、成绩窗口、学位进度窗口），模拟延迟导入之前的启动过程。
+最后测量后台预加载（file_import.preload）的耗时，这部分工作已移出启动的关键路径。
+
+用法：
+    python benchmarks/startup_benchmark.py [--repeat 3] [--top 15] [--platform offscreen]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+REPO_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# 延迟导入之前，启动主窗口时就会加载的重量级模块
+EAGER_MODULES = ["pandas", "my_window.StudentInfoWindow", "my_window.DegreeProgressShow"]
+# 第一个窗口之前不应导入的模块
+DEFERRED_MODULES = ["pandas", "numpy", "docx", "file_import.score_converter", "file_import.excel_cache",
+                    "my_window.StudentInfoWindow", "my_window.DegreeProgressShow"]
+
+FIRST_WINDOW_MARKER = "--- first window ---"
+
+CHILD_SCRIPT = """
+import os, sys, time
+sys.path.insert(0, {repo_dir!r})
+for name in {eager!r}:
+    __import__(name)
+from PyQt6.QtWidgets import QApplication
+from my_window.MainWindow import MainWindow
+app = QApplication(sys.argv)
+window = MainWindow()
+window.show()
+sys.stderr.write({marker!r} + "\\n")
+sys.stderr.flush()
+app.processEvents()
+print("first_window", time.time() - float(sys.argv[1]))
+if {preload!r}:
+    from file_import.preload import start_preload
+    start = time.perf_counter()
+    start_preload().join()
+    print("preload", time.perf_counter() - start)
+sys.stdout.flush()
+os._exit(0)
+"""
+
+
+def parse_importtime(stderr: str) -> list:
+    """
+    解析 -X importtime 的输出（第一个窗口之前的部分）。
+
+    :return: [(模块名, 自身耗时 µs, 累计耗时 µs, 嵌套层数)]
+    """
+    entries = []
+    for line in stderr.splitlines():
+        if line.strip() == FIRST_WINDOW_MARKER:
+            break
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return entries
+
+
+def run_child(eager: bool, preload: bool, platform: str):
+    """
+    启动一次主窗口。
+
+    :return: (到第一个窗口的时间 秒, 后台预加载时间 秒或 None, 导入记录)
+    """
+    script = CHILD_SCRIPT.format(repo_dir=REPO_DIR, eager=EAGER_MODULES if eager else [],
+                                 marker=FIRST_WINDOW_MARKER, preload=preload)
+    env = dict(os.environ)
+    if platform:
+        env["QT_QPA_PLATFORM"] = platform
+    # 子进程的 perf_counter 与本进程不可比，传入启动前的墙钟时间，由子进程计算到第一个窗口的时间
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", script, str(time.time())], cwd=REPO_DIR,
+                            env=env, capture_output=True, text=True, check=True)
+    # 启动过程中的其他输出（如配置提示）不以结果标记开头
+    timings = dict(line.split() for line in result.stdout.splitlines() if line.startswith(("first_window ", "preload ")))
+    preload_time = float(timings["preload"]) if preload else None
+    return float(timings["first_window"]), preload_time, parse_importtime(result.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="程序冷启动基准测试")
+    parser.add_argument("--repeat", type=int, default=3, help="重复次数，取最快的一次")
+    parser.add_argument("--top", type=int, default=15, help="列出导入累计耗时最多的模块数")
+    parser.add_argument("--platform", default="offscreen", help="QT_QPA_PLATFORM，为空时使用系统默认")
+    args = parser.parse_args()
+
+    lazy_runs = [run_child(eager=False, preload=True, platform=args.platform) for _ in range(args.repeat)]
+    eager_runs = [run_child(eager=True, preload=False, platform=args.platform) for _ in range(args.repeat)]
+    lazy_time, preload_time, entries = min(lazy_runs, key=lambda run: run[0])
+    eager_time = min(run[0] for run in eager_runs)
+
+    imported = {name for name, _, _, _ in entries}
+    eager_imports = sorted(imported.intersection(DEFERRED_MODULES))
+    assert not eager_imports, f"第一个窗口之前导入了应延迟加载的模块: {eager_imports}"
+
+    print(f"{'cumulative [ms]':>16} | {'self [ms]':>10} | 模块（第一个窗口之前，按累计耗时）")
+    for name, self_us, cumulative_us, depth in sorted(entries, key=lambda entry: -entry[2])[:args.top]:
+        print(f"{cumulative_us / 1000:16.1f} | {self_us / 1000:10.1f} | {'  ' * depth}{name}")
+    print()
+    print(f"启动时导入的模块数: {len(entries)}，导入总耗时: "
+          f"{sum(entry[1] for entry in entries) / 1000:.1f} ms")
+    print(f"到第一个窗口（原启动方式，含 pandas 和成绩窗口）: {eager_time * 1000:.0f} ms")
+    print(f"到第一个窗口（延迟导入）:                         {lazy_time * 1000:.0f} ms")
+    print(f"后台预加载耗时（不在启动关键路径上）:             {preload_time * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+加权绩点、加权分数增量累计的基准测试
+
+比较原 update_weighted_calculations 每次遍历全部显示行的计算方式和 WeightedAggregates 的增量更新
+（修改单元格、改变过滤条件后），并校验结果一致。
+
+用法：
+    python benchmarks/weighted_aggregates_benchmark.py [--rows 50000] [--edits 1000]
+"""
+
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from file_import.filter_index import FilterIndex
+from file_import.score_table import ScoreTable, WeightedAggregates
+
+HEADERS = ["课程名", "学年学期", "课程性质", "学分", "总成绩", "绩点"]
+TERMS = [f"{year}-{year + 1}-{term}" for year in range(2018, 2025) for term in (1, 2)]
+
+
+def legacy_totals(scores: list, visible_rows) -> tuple:
+    """
+    原 update_weighted_calculations 中逐行计算的逻辑，作为对照。
+    """
+    total_credits = total_gpa_points = total_score_points = 0
+    for row in visible_rows:
+        score = scores[row]
+        if str(score["课程性质"]) == "校选":
+            continue
+        credit = float(str(score["学分"]) or 0)
+        value = str(score["总成绩"])
+        if value == "合格":
+            continue
+        try:
+            value = float(value or 0)
+            total_score_points += value * credit
+            total_credits += credit
+        except ValueError:
+            continue
+        try:
+            total_gpa_points += float(str(score["绩点"]) or 0) * credit
+        except ValueError:
+            pass
+    return total_credits, total_gpa_points, total_score_points
+
+
+def random_score(rng: random.Random, index: int) -> dict:
+    return {"课程名": f"课程{index}", "学年学期": rng.choice(TERMS), "课程性质": rng.choice(["必修", "选修", "校选"]),
+            "学分": rng.choice(["1", "2", "3", "4", "1.5"]), "总成绩": rng.choice([str(s) for s in range(60, 101)] + ["合格"]),
+            "绩点": rng.choice(["1.0", "2.0", "3.0", "3.7", "4.0"])}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="加权绩点增量累计基准测试")
+    parser.add_argument("--rows", type=int, default=50000, help="成绩行数")
+    parser.add_argument("--edits", type=int, default=1000, help="修改单元格次数")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    scores = [random_score(rng, index) for index in range(args.rows)]
+    table = ScoreTable(scores, HEADERS)
+    filter_index = FilterIndex(table)
+    aggregates = WeightedAggregates(table, filter_index)
+
+    edits = [(rng.randrange(args.rows), rng.choice([3, 4, 5]), rng.choice(["2", "85", "合格", "3.3", "校选"]))
+             for _ in range(args.edits)]
+    edits = [(row, column, text) for row, column, text in edits if column != 3 or text[0].isdigit()]
+
+    start = time.perf_counter()
+    for row, column, text in edits:
+        table.set_text(row, column, text)
+        aggregates.totals()
+    incremental_edit_time = (time.perf_counter() - start) / len(edits)
+
+    start = time.perf_counter()
+    for row, column, text in edits[:50]:
+        scores[row][HEADERS[column]] = text
+        legacy_totals(scores, range(args.rows))
+    legacy_edit_time = (time.perf_counter() - start) / 50
+    for row, column, text in edits[50:]:
+        scores[row][HEADERS[column]] = text
+
+    start = time.perf_counter()
+    for term_count in range(1, len(TERMS) + 1):
+        filter_index.set_filter(1, TERMS[:term_count])
+        aggregates.totals()
+    filter_time = (time.perf_counter() - start) / len(TERMS)
+
+    expected = legacy_totals(scores, filter_index.accepted_rows())
+    assert all(math.isclose(a, b, rel_tol=1e-9) for a, b in zip(expected, aggregates.totals()))
+
+    print(f"成绩行数: {args.rows}")
+    print(f"修改单元格后重新计算（逐行遍历）: {legacy_edit_time * 1000:.2f} ms/次")
+    print(f"修改单元格后增量更新:             {incremental_edit_time * 1e6:.1f} µs/次")
+    print(f"改变过滤条件后增量更新（含过滤）: {filter_time * 1000:.2f} ms/次")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+"""
+CourseMatcher 模块
+
+培养方案课程与成绩记录之间的课程匹配索引。
+主要功能包括：
+1. 课程号精确匹配（提供课程号时优先使用）
+2. 课程名规范化后匹配：全角/半角字符、空白、各种括号统一，忽略"（双语）"等不区分课程的括号注释
+3. 基于字符二元组（bigram）倒排索引的近似匹配，相似度（Dice 系数）不低于阈值时视为同一门课程；
+   末尾序号（(一)/(二)、I/II、1/2、上/下等）不同，或一个课程名是另一个的前缀时，不视为同一门课程
+
+近似匹配使用前缀过滤：只从查询中最罕见的几个二元组的倒排表中取候选，再逐个精确计算相似度，
+因此即使索引中有数万门课程，单次查询也只需检查少量候选。
+"""
+
+import math
+import os
+import re
+import sys
+import unicodedata
+from collections import defaultdict
+
+sys.path.append(os.getcwd())
+
+DEFAULT_THRESHOLD = 0.8
+
+_BRACKETS = str.maketrans({'（': '(', '）': ')', '[': '(', ']': ')', '【': '(', '】': ')', '{': '(', '}': ')',
+                           '〔': '(', '〕': ')', '<': '(', '>': ')', '《': '(', '》': ')'})
+_WHITESPACE = re.compile(r'\s+')
+_PARENTHESIZED = re.compile(r'\(([^()]*)\)')
+# 区分课程的括号内容：上/下册、序号、罗马数字、字母等级，例如"高等数学(上)"、"大学物理(a)"
+_SEQUENCE_MARKER = re.compile(r'^(上|中|下|[一二三四五六七八九十]+|\d+|[ivx]+|[a-e])$')
+# 课程名末尾的序号：括号内的序号，或直接跟在课程名后的罗马数字、字母、数字、汉字序号，例如"程序设计基础ii"
+_TRAILING_MARKER = re.compile(r'(?:\((上|中|下|[一二三四五六七八九十]+|\d+|[ivx]+|[a-e])\)'
+                              r'|(?<![a-z])([ivx]+|[a-e])|(?<!\d)(\d+)|(上|中|下|[一二三四五六七八九十]+))$')
+_CHINESE_DIGITS = {'一': 1, '二': 2, '三': 3, '四': 4, '五': 5, '六': 6, '七': 7, '八': 8, '九': 9}
+_ROMAN_DIGITS = {'i': 1, 'v': 5, 'x': 10}
+
+_AMBIGUOUS = object()
+
+
+def normalize_course_name(name) -> str:
+    """
+    规范化课程名：NFKC（全角转半角、罗马数字转字母等）、去除空白、统一括号、转为小写。
+    """
+    if name is None:
+        return ""
+    text = unicodedata.normalize('NFKC', str(name)).translate(_BRACKETS)
+    return _WHITESPACE.sub('', text).lower()
+
+
+def core_course_name(normalized: str) -> str:
+    """
+    去除不区分课程的括号注释，例如 "线性代数(双语)" -> "线性代数"，保留 "高等数学(上)"。
+
+    :param normalized: 规范化后的课程名
+    """
+    def replace(match):
+        return match.group(0) if _SEQUENCE_MARKER.match(match.group(1)) else ''
+
+    core = _PARENTHESIZED.sub(replace, normalized)
+    return core or normalized
+
+
+def _marker_value(marker: str):
+    """
+    把序号统一为整数，"二"、"2"、"ii" 都为 2；上/中/下、字母等级原样返回。
+    """
+    if marker.isdigit():
+        return int(marker)
+    if all(char in _ROMAN_DIGITS for char in marker):
+        values = [_ROMAN_DIGITS[char] for char in marker]
+        return sum(-value if value < following else value
+                   for value, following in zip(values, values[1:] + [0]))
+    if len(marker) == 1 and marker in _CHINESE_DIGITS:
+        return _CHINESE_DIGITS[marker]
+    tens, ten, ones = marker.partition('十')
+    if ten and len(tens) <= 1 and len(ones) <= 1 and all(char in _CHINESE_DIGITS for char in tens + ones):
+        return _CHINESE_DIGITS.get(tens, 1) * 10 + _CHINESE_DIGITS.get(ones, 0)
+    return marker
+
+
+def split_sequence_marker(normalized: str):
+    """
+    拆分课程名末尾的序号，例如 "大学物理实验(二)" -> ("大学物理实验", 2)。
+
+    :param normalized: 规范化后的课程名
+    :return: (去除注释和序号后的课程名, 序号)，没有序号时序号为 None
+    """
+    core = core_course_name(normalized)
+    match = _TRAILING_MARKER.search(core)
+    if match is None or match.start() == 0:
+        return core, None
+    marker = next(group for group in match.groups() if group is not None)
+    return core[:match.start()], _marker_value(marker)
+
+
+def _same_course_shape(query_shape, candidate_shape) -> bool:
+    """
+    近似匹配的前提：序号相同，且去除序号后的课程名互相不是前缀（如 "马克思主义基本原理" 与 "马克思主义基本原理概论"）。
+    """
+    (query_stem, query_marker), (candidate_stem, candidate_marker) = query_shape, candidate_shape
+    if query_marker != candidate_marker:
+        return False
+    return query_stem == candidate_stem or not (candidate_stem.startswith(query_stem) or
+                                                query_stem.startswith(candidate_stem))
+
+
+def _grams(normalized: str) -> frozenset:
+    padded = f"^{normalized}$"
+    return frozenset(padded[i:i + 2] for i in range(len(padded) - 1))
+
+
+class CourseMatcher:
+    """
+    CourseMatcher 类为一组课程记录（如一个学生的成绩）建立匹配索引。
+
+    同名课程出现多次时（如重修），与原来的字典查找一致，使用最后一条记录。
+
+    属性:
+        threshold: 近似匹配的相似度阈值，大于 1 时关闭近似匹配
+        name_key: 课程记录中课程名的键
+        number_key: 课程记录中课程号的键
+    """
+
+    def __init__(self, courses=(), threshold: float = DEFAULT_THRESHOLD, name_key: str = '课程名',
+                 number_key: str = '课程号'):
+        """
+        初始化 CourseMatcher 对象。
+
+        :param courses: 课程记录（字典）列表
+        :param threshold: 近似匹配的相似度阈值
+        :param name_key: 课程名的键
+        :param number_key: 课程号的键
+        """
+        self.threshold = threshold
+        self.name_key = name_key
+        self.number_key = number_key
+        self._by_number = {}
+        self._by_name = {}
+        self._by_normalized = {}
+        self._by_core = {}
+        # 近似匹配的索引：每个不同的规范化课程名一项
+        self._keys = []
+        self._key_grams = []
+        self._key_shapes = []
+        self._key_ids = {}
+        self._postings = defaultdict(list)
+        for course in courses:
+            self.add(course)
+
+    def __len__(self):
+        return len(self._by_normalized)
+
+    def add(self, course: dict):
+        """
+        向索引中加入一条课程记录。
+        """
+        name = course.get(self.name_key)
+        number = course.get(self.number_key)
+        if number not in (None, ''):
+            self._by_number[str(number).strip()] = course
+        if name is None:
+            return
+
+        self._by_name[name] = course
+        normalized = normalize_course_name(name)
+        if not normalized:
+            return
+        self._by_normalized[normalized] = course
+
+        core = core_course_name(normalized)
+        existing = self._by_core.get(core)
+        if existing is None or existing is not _AMBIGUOUS and \
+                normalize_course_name(existing.get(self.name_key)) == normalized:
+            self._by_core[core] = course
+        else:
+            # 多门不同课程去除注释后相同，不能用于匹配
+            self._by_core[core] = _AMBIGUOUS
+
+        if normalized not in self._key_ids:
+            key_id = len(self._keys)
+            grams = _grams(normalized)
+            self._key_ids[normalized] = key_id
+            self._keys.append(normalized)
+            self._key_grams.append(grams)
+            self._key_shapes.append(split_sequence_marker(normalized))
+            for gram in grams:
+                self._postings[gram].append(key_id)
+
+    def match(self, name, course_no=None):
+        """
+        查找课程记录。
+
+        :param name: 课程名
+        :param course_no: 课程号，可选
+        :return: 匹配的课程记录，没有匹配时返回 None
+        """
+        course, _ = self.match_with_score(name, course_no)
+        return course
+
+    def match_with_score(self, name, course_no=None):
+        """
+        查找课程记录并返回相似度。
+
+        :param name: 课程名
+        :param course_no: 课程号，可选
+        :return: (课程记录, 相似度)，精确或规范化匹配的相似度为 1.0；没有匹配时返回 (None, 0.0)
+        """
+        if course_no not in (None, ''):
+            course = self._by_number.get(str(course_no).strip())
+            if course is not None:
+                return course, 1.0
+
+        course = self._by_name.get(name)
+        if course is not None:
+            return course, 1.0
+
+        normalized = normalize_course_name(name)
+        if not normalized:
+            return None, 0.0
+        course = self._by_normalized.get(normalized)
+        if course is not None:
+            return course, 1.0
+
+        course = self._by_core.get(core_course_name(normalized))
+        if course is not None and course is not _AMBIGUOUS:
+            return course, 1.0
+
+        if self.threshold > 1:
+            return None, 0.0
+        key, similarity = self._approximate(normalized)
+        if key is None:
+            return None, 0.0
+        return self._by_normalized[key], similarity
+
+    def _approximate(self, normalized: str):
+        grams = _grams(normalized)
+        size = len(grams)
+        threshold = self.threshold
+
+        # 相似度不低于阈值时，共有的二元组数至少为 min_overlap，
+        # 因此候选项必然包含查询中最罕见的 size - min_overlap + 1 个二元组之一
+        min_overlap = max(1, math.ceil(threshold * size / (2 - threshold) - 1e-9))
+        prefix_length = size - min_overlap + 1
+        if prefix_length <= 0:
+            return None, 0.0
+        rare_grams = sorted(grams, key=lambda gram: len(self._postings.get(gram, ())))[:prefix_length]
+
+        # 长度过滤：Dice = 2|A∩B| / (|A|+|B|) ≥ t 要求 |B| 在 [t|A|/(2-t), (2-t)|A|/t] 内
+        min_size = threshold * size / (2 - threshold)
+        max_size = (2 - threshold) * size / threshold if threshold > 0 else math.inf
+
+        shape = split_sequence_marker(normalized)
+        best_key, best_similarity = None, 0.0
+        checked = set()
+        for gram in rare_grams:
+            for key_id in self._postings.get(gram, ()):
+                if key_id in checked:
+                    continue
+                checked.add(key_id)
+                candidate = self._key_grams[key_id]
+                if not min_size - 1e-9 <= len(candidate) <= max_size + 1e-9:
+                    continue
+                similarity = 2 * len(grams & candidate) / (size + len(candidate))
+                if not (similarity > best_similarity or (similarity == best_similarity and best_key is not None and
+                                                         self._keys[key_id] < best_key)):
+                    continue
+                # 系列课程中的另一门（序号不同）或名称只多出一段的课程，相似度再高也不是同一门课程
+                if _same_course_shape(shape, self._key_shapes[key_id]):
+                    best_key, best_similarity = self._keys[key_id], similarity
+
+        if best_similarity + 1e-9 < threshold:
+            return None, 0.0
+        return best_key, best_similarity
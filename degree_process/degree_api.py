@@ -0,0 +1,205 @@
+"""
+DegreeApi 模块
+
+学位进度计算的无界面接口，不依赖 PyQt6，可以在工作线程、进程池或服务端中调用。
+主要功能包括：
+1. 解析培养方案（按内容哈希缓存）
+2. 读取学生成绩（JSON 文件或 SQLite 成绩存储）
+3. 合并培养方案与成绩，得到学位进度
+4. 导出、读取学位进度文件（config/degree_progress_{学号}.json）
+
+所有错误都以 DegreeAuditError 的子类抛出，由调用方决定如何提示用户。
+"""
+
+import json
+import os
+import sys
+from collections import namedtuple
+
+sys.path.append(os.getcwd())
+
+from degree_process.program_parser import ProgramCache, get_program_cache, merge_program
+
+CONFIG_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'config'))
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'data'))
+
+# 一次学位进度计算的结果
+DegreeProgress = namedtuple('DegreeProgress', [
+    'student_id',       # 学号
+    'program_path',     # 培养方案文件路径
+    'tables',           # [{'table': {'header', 'data'}, 'info': CourseInfo 或 None}, ...]
+    'warnings',         # 解析培养方案时的警告
+    'scores_location',  # 成绩数据的位置（JSON 文件或数据库路径）
+])
+
+
+class DegreeAuditError(Exception):
+    """
+    学位进度计算错误的基类。
+    """
+
+
+class ProgramFileError(DegreeAuditError):
+    """
+    培养方案文件不存在、格式不正确或无法解析。
+    """
+
+
+class ScoresNotFoundError(DegreeAuditError):
+    """
+    学生的成绩数据不存在。
+    """
+
+
+class ScoreDataError(DegreeAuditError):
+    """
+    学生的成绩数据无法读取或格式不正确。
+    """
+
+
+def load_program(file_path: str, cache: ProgramCache = None):
+    """
+    解析培养方案，命中缓存时不再解析文档。
+
+    :param file_path: .docx 文件路径
+    :param cache: 培养方案缓存，默认使用进程内共享的缓存
+    :return: program_parser.ParsedProgram
+    :raises ProgramFileError: 文件不是 .docx、不存在或无法解析时
+    """
+    if not str(file_path).lower().endswith('.docx'):
+        raise ProgramFileError("请选择 .docx 格式的文件！")
+    if not os.path.exists(file_path):
+        raise ProgramFileError(f"文件不存在: {file_path}")
+    try:
+        return (cache or get_program_cache()).load(file_path)
+    except Exception as e:
+        raise ProgramFileError(f"无法解析培养方案: {str(e)}") from e
+
+
+def scores_json_path(student_id) -> str:
+    return os.path.join(DATA_DIR, f"{student_id}.json")
+
+
+def load_scores(student_id, score_store=None):
+    """
+    读取学生成绩。
+
+    :param student_id: 学号
+    :param score_store: 成绩存储后端，None 表示使用 data/{学号}.json
+    :return: (成绩字典列表, 成绩数据位置)
+    :raises ScoresNotFoundError: 成绩数据不存在时
+    :raises ScoreDataError: 成绩数据无法读取时
+    """
+    if score_store is not None:
+        try:
+            score_data = score_store.load_student(student_id)
+        except Exception as e:
+            raise ScoreDataError(f"读取教务成绩数据时发生错误：{str(e)}") from e
+        if score_data is None:
+            raise ScoresNotFoundError("未找到成绩数据，请在初始界面进行导入")
+        return score_data["scores"], score_store.db_path
+
+    json_file_path = scores_json_path(student_id)
+    return load_scores_file(json_file_path), json_file_path
+
+
+def load_scores_file(json_file_path: str) -> list:
+    """
+    读取 data/{学号}.json 格式的成绩文件（第一项为学生信息，其余为成绩）。
+
+    :param json_file_path: 成绩文件路径
+    :return: 成绩字典列表
+    :raises ScoresNotFoundError: 文件不存在时
+    :raises ScoreDataError: 文件无法读取或格式不正确时
+    """
+    if not json_file_path or not os.path.exists(json_file_path):
+        raise ScoresNotFoundError("未找到成绩数据，请在初始界面进行导入")
+    try:
+        with open(json_file_path, 'r', encoding='utf-8') as f:
+            json_data = json.load(f)
+    except json.JSONDecodeError as e:
+        raise ScoreDataError("无法解析教务成绩数据，请在主界面重新导入") from e
+    except Exception as e:
+        raise ScoreDataError(f"读取教务成绩数据时发生错误：{str(e)}") from e
+    if not isinstance(json_data, list) or not json_data:
+        raise ScoreDataError("无法解析教务成绩数据，请在主界面重新导入")
+    return json_data[1:]
+
+
+def compute_progress(program, scores: list) -> list:
+    """
+    合并培养方案与成绩。
+
+    :param program: program_parser.ParsedProgram
+    :param scores: 成绩字典列表
+    :return: [{'table': {'header', 'data'}, 'info': CourseInfo 或 None}, ...]
+    """
+    return merge_program(program, scores)
+
+
+def progress_file_path(student_id) -> str:
+    return os.path.join(CONFIG_DIR, f"degree_progress_{student_id}.json")
+
+
+def export_progress(tables: list, student_id) -> str:
+    """
+    把学位进度写入 config/degree_progress_{学号}.json。
+
+    :param tables: compute_progress 的返回值
+    :param student_id: 学号
+    :return: 文件路径
+    """
+    os.makedirs(CONFIG_DIR, exist_ok=True)
+    file_path = progress_file_path(student_id)
+    serializable_results = [{'table': item['table'], 'info': item['info']} for item in tables]
+    with open(file_path, 'w', encoding='utf-8') as f:
+        json.dump(serializable_results, f, ensure_ascii=False, indent=4)
+    return file_path
+
+
+def load_progress(json_filename: str = "degree_progress.json"):
+    """
+    读取 config 目录中的学位进度文件。
+
+    :param json_filename: 文件名
+    :return: 学位进度列表，文件不存在时返回 None
+    """
+    file_path = os.path.join(CONFIG_DIR, json_filename)
+    if not os.path.exists(file_path):
+        return None
+    with open(file_path, 'r', encoding='utf-8') as f:
+        loaded_results = json.load(f)
+    return [{'table': item['table'], 'info': item['info']} for item in loaded_results]
+
+
+def run_degree_progress(program_path: str, student_id, score_store=None, export: bool = True,
+                        cache: ProgramCache = None, progress_callback=None) -> DegreeProgress:
+    """
+    计算一个学生的学位进度：解析培养方案、读取成绩、合并，并（可选）导出到学位进度文件。
+
+    :param program_path: 培养方案 .docx 文件路径
+    :param student_id: 学号
+    :param score_store: 成绩存储后端，None 表示使用 data/{学号}.json
+    :param export: 是否写入 config/degree_progress_{学号}.json
+    :param cache: 培养方案缓存
+    :param progress_callback: 每个步骤开始前调用 callback(已完成步数, 总步数, 说明)；
+                              export 为 True 时最后一步是写入学位进度文件
+    :return: DegreeProgress
+    :raises DegreeAuditError: 培养方案或成绩数据有问题时
+    """
+    total_steps = 4 if export else 3
+
+    def report(done, message):
+        if progress_callback:
+            progress_callback(done, total_steps, message)
+
+    report(0, "正在读取成绩数据...")
+    scores, location = load_scores(student_id, score_store)
+    report(1, "正在解析培养方案...")
+    program = load_program(program_path, cache)
+    report(2, "正在合并成绩...")
+    tables = compute_progress(program, scores)
+    if export:
+        report(3, "正在导出学位进度...")
+        export_progress(tables, student_id)
+    return DegreeProgress(str(student_id), program_path, tables, list(program.warnings), location)
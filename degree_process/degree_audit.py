@@ -0,0 +1,225 @@
+"""
+DegreeAudit 模块
+
+批量学位审核：一次解析 N 份培养方案，在一遍扫描中与 M 个学生的成绩合并，不依赖 PyQt6。
+主要功能包括：
+1. 预先把每份培养方案编译为课程名编码、学分、所属课程类型等数组
+2. 对每个学生只建立一次课程匹配索引（course_matcher），再用数组运算得到各课程类型的已修学分
+3. 输出 学生 × 培养方案 × 课程类型 的审核矩阵（已修学分、剩余学分、未修读的必修课）和毕业资格矩阵
+
+统计口径与学位进度窗口一致：状态为"已修读"的课程计入已修学分，
+每个课程类型需要的学分为最低必修学分数与最低选修学分数之和。
+
+用法：
+    python -m degree_process.degree_audit 方案1.docx [方案2.docx ...] [--students 学号 ...] [--output 结果.csv]
+"""
+
+import argparse
+import os
+import sys
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.getcwd())
+
+from degree_process.course_matcher import CourseMatcher
+from degree_process.degree_api import DegreeAuditError, load_scores
+from degree_process.program_parser import (DEFAULT_COMPLETED_COURSES, SUBTOTAL_ROW, ParsedProgram,
+                                            get_program_cache)
+
+AUDIT_COLUMNS = ["学号", "培养方案", "课程类型", "最低必修学分", "最低选修学分", "要求学分", "已修学分", "剩余学分",
+                 "未修读必修课"]
+
+# 一份培养方案编译后的数组表示，课程按表格顺序排列
+CompiledProgram = namedtuple('CompiledProgram', [
+    'name',             # 培养方案名称
+    'course_types',     # 参与审核的课程类型（CourseInfo 列表）
+    'vocabulary',       # 培养方案中出现的全部 (课程名, 课程号)
+    'name_codes',       # 每门课程在 vocabulary 中的编号
+    'table_ids',        # 每门课程所属的课程类型序号
+    'credits',          # 每门课程的学分，无法解析时为 0
+    'always_completed', # 默认已修读的课程
+    'subtotal',         # "小计"行
+    'required',         # 修读形式为必修的课程
+    'course_names',     # 每门课程的名称
+])
+
+
+def compile_program(name: str, program: ParsedProgram) -> CompiledProgram:
+    """
+    把解析后的培养方案编译为数组。没有学分要求的表格不参与审核。
+
+    :param name: 培养方案名称
+    :param program: 解析后的培养方案
+    :return: CompiledProgram
+    """
+    course_types, course_names, course_numbers, table_ids, credits, required = [], [], [], [], [], []
+    for i, table in enumerate(program.tables):
+        if table is None or i >= len(program.credit_info):
+            continue
+        table_id = len(course_types)
+        course_types.append(program.credit_info[i])
+
+        header = table['header']
+        name_index = header.index('课程名称')
+        credit_index = header.index('学分') if '学分' in header else -1
+        form_index = header.index('修读形式') if '修读形式' in header else -1
+        numbers = table.get('course_numbers') or [None] * len(table['rows'])
+        for row, course_no in zip(table['rows'], numbers):
+            course_names.append(row[name_index])
+            course_numbers.append(course_no)
+            table_ids.append(table_id)
+            try:
+                credits.append(float(row[credit_index]) if credit_index != -1 else 0.0)
+            except ValueError:
+                credits.append(0.0)
+            required.append(form_index != -1 and row[form_index] == "必修")
+
+    keys = pd.Series(list(zip(course_names, course_numbers)), dtype=object)
+    codes, vocabulary = pd.factorize(keys)
+    names = np.array(course_names, dtype=object)
+    return CompiledProgram(
+        name=name,
+        course_types=course_types,
+        vocabulary=list(vocabulary),
+        name_codes=codes.astype(np.int64),
+        table_ids=np.array(table_ids, dtype=np.int64),
+        credits=np.array(credits, dtype=np.float64),
+        always_completed=np.isin(names, DEFAULT_COMPLETED_COURSES),
+        subtotal=names == SUBTOTAL_ROW,
+        required=np.array(required, dtype=bool),
+        course_names=names,
+    )
+
+
+class DegreeAuditEngine:
+    """
+    DegreeAuditEngine 类对一批学生和一批培养方案进行学位审核。
+
+    属性:
+        programs: 已编译的培养方案列表
+        program_cache: 培养方案解析缓存
+    """
+
+    def __init__(self, program_cache=None):
+        """
+        初始化 DegreeAuditEngine 对象。
+
+        :param program_cache: 培养方案解析缓存，默认使用进程内共享的缓存
+        """
+        self.program_cache = program_cache or get_program_cache()
+        self.programs = []
+
+    def add_program(self, file_path: str, name: str = None) -> CompiledProgram:
+        """
+        解析（或从缓存读取）一份培养方案并加入审核。
+
+        :param file_path: .docx 文件路径
+        :param name: 培养方案名称，默认为文件名
+        """
+        name = name or os.path.splitext(os.path.basename(file_path))[0]
+        compiled = compile_program(name, self.program_cache.load(file_path))
+        self.programs.append(compiled)
+        return compiled
+
+    def add_parsed_program(self, name: str, program: ParsedProgram) -> CompiledProgram:
+        compiled = compile_program(name, program)
+        self.programs.append(compiled)
+        return compiled
+
+    @staticmethod
+    def _audit_one(program: CompiledProgram, matcher: CourseMatcher):
+        taken = np.fromiter((matcher.match(name, course_no) is not None for name, course_no in program.vocabulary),
+                            dtype=bool, count=len(program.vocabulary))
+        completed = (taken[program.name_codes] & ~program.subtotal) | program.always_completed
+        completed_credits = np.bincount(program.table_ids, weights=program.credits * completed,
+                                        minlength=len(program.course_types))
+        missing_required = program.required & ~completed & ~program.subtotal
+        return completed_credits, missing_required
+
+    def audit(self, students) -> pd.DataFrame:
+        """
+        审核一批学生。
+
+        :param students: 可迭代的 (学号, 成绩字典列表)，每个学生只被读取一次
+        :return: 审核矩阵，每行为一个 学生 × 培养方案 × 课程类型，列见 AUDIT_COLUMNS
+        """
+        rows = []
+        for student_id, scores in students:
+            # 每个学生只建立一次课程匹配索引，与所有培养方案共用
+            matcher = CourseMatcher(scores)
+            for program in self.programs:
+                completed_credits, missing_required = self._audit_one(program, matcher)
+                missing_by_type = [[] for _ in program.course_types]
+                for index in np.flatnonzero(missing_required):
+                    missing_by_type[program.table_ids[index]].append(program.course_names[index])
+
+                for table_id, info in enumerate(program.course_types):
+                    total = info.required_credits + info.elective_credits
+                    completed = float(completed_credits[table_id])
+                    rows.append((student_id, program.name, info.course_type, info.required_credits,
+                                 info.elective_credits, total, completed, max(0.0, total - completed),
+                                 "、".join(missing_by_type[table_id])))
+        return pd.DataFrame(rows, columns=AUDIT_COLUMNS)
+
+    @staticmethod
+    def eligibility(audit_frame: pd.DataFrame) -> pd.DataFrame:
+        """
+        由审核矩阵得到毕业资格矩阵：所有课程类型都没有剩余学分和未修读的必修课时为 True。
+
+        :param audit_frame: audit 的返回值
+        :return: 行为学号、列为培养方案的布尔矩阵
+        """
+        satisfied = (audit_frame["剩余学分"] <= 0) & (audit_frame["未修读必修课"] == "")
+        return (satisfied.groupby([audit_frame["学号"], audit_frame["培养方案"]], sort=False).all()
+                .unstack("培养方案"))
+
+
+def iter_student_scores(student_ids=None, score_store=None):
+    """
+    依次读取学生成绩，读取失败的学生会被跳过。
+
+    :param student_ids: 学号列表，None 表示学生索引中的全部学生
+    :param score_store: 成绩存储后端，None 表示使用 data/{学号}.json
+    :return: (学号, 成绩字典列表) 生成器
+    """
+    if student_ids is None:
+        from file_import.student_catalog import get_default_catalog
+
+        student_ids = [item["student_id"] for item in get_default_catalog(score_store).list_students()]
+
+    for student_id in student_ids:
+        try:
+            scores, _ = load_scores(student_id, score_store)
+        except DegreeAuditError as e:
+            print(f"读取学生 {student_id} 的成绩失败: {str(e)}")
+            continue
+        yield str(student_id), scores
+
+
+def main():
+    from file_import.score_store import get_default_score_store
+
+    parser = argparse.ArgumentParser(description="批量学位审核")
+    parser.add_argument("programs", nargs="+", help="培养方案 .docx 文件")
+    parser.add_argument("--students", nargs="*", default=None, help="学号，默认审核全部学生")
+    parser.add_argument("--output", default=None, help="审核矩阵输出路径（CSV）")
+    args = parser.parse_args()
+
+    engine = DegreeAuditEngine()
+    for program_path in args.programs:
+        engine.add_program(program_path)
+
+    audit_frame = engine.audit(iter_student_scores(args.students, get_default_score_store()))
+    if args.output:
+        audit_frame.to_csv(args.output, index=False, encoding='utf-8-sig')
+        print(f"审核矩阵已保存到 {args.output}")
+
+    eligibility = DegreeAuditEngine.eligibility(audit_frame)
+    print(eligibility.to_string())
+
+
+if __name__ == "__main__":
+    main()
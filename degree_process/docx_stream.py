@@ -0,0 +1,246 @@
+"""
+DocxStream 模块
+
+培养方案 .docx 的只读流式提取器：直接从 zip 中流式读取正文 XML（word/document.xml），
+用增量 XML 解析器逐个处理正文中的段落和表格，不构造 python-docx 的对象树。
+主要功能包括：
+1. 只保留包含学分要求的段落
+2. 表格的第一行读完后即判断是否为课程表格，其他表格的后续行读完即丢弃
+3. 课程表格逐行转换为单元格文本，每行处理完后释放对应的 XML 元素
+
+段落文本、单元格文本以及合并单元格（gridSpan / vMerge）的处理与 python-docx 保持一致，
+因此结果与 program_parser.parse_program(Document(...)) 相同，内存和时间只与课程表格的大小有关。
+"""
+
+import os
+import posixpath
+import sys
+import zipfile
+
+from lxml import etree
+
+sys.path.append(os.getcwd())
+
+from degree_process.program_parser import REQUIRED_COLUMN, ParsedProgram, build_program, is_credit_paragraph
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_BODY = _W + "body"
+_P = _W + "p"
+_R = _W + "r"
+_HYPERLINK = _W + "hyperlink"
+_T = _W + "t"
+_TAB = _W + "tab"
+_PTAB = _W + "ptab"
+_BR = _W + "br"
+_CR = _W + "cr"
+_NO_BREAK_HYPHEN = _W + "noBreakHyphen"
+_TBL = _W + "tbl"
+_TR = _W + "tr"
+_TC = _W + "tc"
+_TR_PR = _W + "trPr"
+_TC_PR = _W + "tcPr"
+_GRID_BEFORE = _W + "gridBefore"
+_GRID_SPAN = _W + "gridSpan"
+_V_MERGE = _W + "vMerge"
+_VAL = _W + "val"
+_TYPE = _W + "type"
+
+_OFFICE_DOCUMENT_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"
+_PACKAGE_RELS_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+_DEFAULT_DOCUMENT_PART = "word/document.xml"
+
+
+def _run_text(run) -> str:
+    parts = []
+    for child in run:
+        tag = child.tag
+        if tag == _T:
+            parts.append(child.text or "")
+        elif tag == _TAB or tag == _PTAB:
+            parts.append("\t")
+        elif tag == _BR:
+            # 只有换行符（默认类型）对应 "\n"，分页符、分栏符没有文本
+            if child.get(_TYPE, "textWrapping") == "textWrapping":
+                parts.append("\n")
+        elif tag == _CR:
+            parts.append("\n")
+        elif tag == _NO_BREAK_HYPHEN:
+            parts.append("-")
+    return "".join(parts)
+
+
+def paragraph_text(paragraph) -> str:
+    """
+    段落文本：直接子元素中的文字块和超链接中的文字块。
+    """
+    parts = []
+    for child in paragraph:
+        if child.tag == _R:
+            parts.append(_run_text(child))
+        elif child.tag == _HYPERLINK:
+            parts.extend(_run_text(run) for run in child if run.tag == _R)
+    return "".join(parts)
+
+
+def cell_text(tc) -> str:
+    """
+    单元格文本：单元格中各段落的文本以换行符连接，不包括嵌套表格。
+    """
+    return "\n".join(paragraph_text(child) for child in tc if child.tag == _P)
+
+
+def _int_property(properties, tag: str, default: int) -> int:
+    if properties is None:
+        return default
+    element = properties.find(tag)
+    if element is None:
+        return default
+    return int(element.get(_VAL, default))
+
+
+def row_cell_texts(tr, above_offsets):
+    """
+    把一行转换为单元格文本列表，与 python-docx 的 _Row.cells 一致：
+    横向合并的单元格按跨越的列数重复，纵向合并的后续单元格取上一行同一位置的单元格。
+
+    :param tr: w:tr 元素
+    :param above_offsets: 上一行 {单元格起始列: 该单元格对应的文本列表}，第一行为 None
+    :return: (单元格文本列表, 本行的 {单元格起始列: 文本列表})
+    :raises ValueError: 纵向合并的单元格在上一行没有对应的单元格时
+    """
+    cells, offsets = [], {}
+    offset = _int_property(tr.find(_TR_PR), _GRID_BEFORE, 0)
+    for tc in tr:
+        if tc.tag != _TC:
+            continue
+        tc_pr = tc.find(_TC_PR)
+        span = _int_property(tc_pr, _GRID_SPAN, 1)
+        v_merge = tc_pr.find(_V_MERGE) if tc_pr is not None else None
+        if v_merge is not None and v_merge.get(_VAL, "continue") == "continue":
+            if above_offsets is None or offset not in above_offsets:
+                raise ValueError("no tc above vertically merged cell")
+            texts = above_offsets[offset]
+        else:
+            texts = [cell_text(tc)] * span
+        offsets[offset] = texts
+        cells.extend(texts)
+        offset += span
+    return cells, offsets
+
+
+def iter_table_rows(tbl):
+    """
+    逐行生成表格的单元格文本，每个单元格只读取一次。
+
+    python-docx 每次访问 row.cells 都会重新计算整行的单元格（包括横向合并的展开），
+    按列逐个访问 row.cells[i] 的代价约为 行数 × 列数 × 列数；这里按行顺序处理，
+    纵向合并的单元格直接取上一行的结果，总代价与单元格数成正比。
+
+    :param tbl: w:tbl 元素（python-docx 的 Table._tbl）
+    :return: 单元格文本列表的生成器，与 [[cell.text for cell in row.cells] for row in table.rows] 一致
+    """
+    above_offsets = None
+    for tr in tbl:
+        if tr.tag != _TR:
+            continue
+        cells, above_offsets = row_cell_texts(tr, above_offsets)
+        yield cells
+
+
+def materialize_table(tbl) -> list:
+    """
+    把表格转换为二维的单元格文本列表。
+
+    :param tbl: w:tbl 元素（python-docx 的 Table._tbl）
+    :return: 每行的单元格文本列表
+    """
+    return list(iter_table_rows(tbl))
+
+
+def _document_part_name(archive: zipfile.ZipFile) -> str:
+    """
+    从包关系（_rels/.rels）中找到正文部件，通常为 word/document.xml。
+    """
+    try:
+        with archive.open("_rels/.rels") as f:
+            rels = etree.parse(f).getroot()
+    except (KeyError, etree.XMLSyntaxError):
+        return _DEFAULT_DOCUMENT_PART
+    for rel in rels.iter(_PACKAGE_RELS_NS + "Relationship"):
+        if rel.get("Type") == _OFFICE_DOCUMENT_REL:
+            return posixpath.normpath(rel.get("Target", _DEFAULT_DOCUMENT_PART).lstrip("/"))
+    return _DEFAULT_DOCUMENT_PART
+
+
+class _TableState:
+    """
+    正在读取的正文表格的状态。
+    """
+
+    def __init__(self, element):
+        self.element = element
+        self.header = None
+        self.relevant = None
+        self.rows = []
+        self.above_offsets = None
+
+
+def _release(element):
+    """
+    清空已处理的元素，并删除它前面已处理过的兄弟元素，使内存占用不随文档增长。
+    """
+    element.clear()
+    parent = element.getparent()
+    if parent is not None:
+        while element.getprevious() is not None:
+            del parent[0]
+
+
+def stream_program(source, required_column: str = REQUIRED_COLUMN) -> ParsedProgram:
+    """
+    流式解析培养方案文档。
+
+    :param source: .docx 文件路径或二进制文件对象
+    :param required_column: 课程表格必须包含的列名
+    :return: ParsedProgram
+    """
+    relevant_paragraphs, course_tables = [], []
+
+    with zipfile.ZipFile(source) as archive:
+        with archive.open(_document_part_name(archive)) as xml_file:
+            table = None
+            # 只关注段落、行和表格的结束事件，其余元素由 lxml 在 C 代码中构造
+            for _, element in etree.iterparse(xml_file, events=("end",), tag=(_P, _TR, _TBL), huge_tree=True):
+                parent = element.getparent()
+                if parent is None:
+                    continue
+                tag = element.tag
+
+                if tag == _TR:
+                    if parent.getparent() is None or parent.getparent().tag != _BODY:
+                        # 嵌套表格的行，作为外层单元格内容的一部分保留
+                        continue
+                    # 正文表格的一行读取完毕
+                    if table is None or table.element is not parent:
+                        table = _TableState(parent)
+                    if table.relevant is None:
+                        header, table.above_offsets = row_cell_texts(element, None)
+                        table.header = [text.strip() for text in header]
+                        table.relevant = required_column in table.header
+                    elif table.relevant:
+                        cells, table.above_offsets = row_cell_texts(element, table.above_offsets)
+                        table.rows.append(cells)
+                    _release(element)
+                elif parent.tag == _BODY:
+                    # 正文的一个段落或表格读取完毕
+                    if tag == _P:
+                        text = paragraph_text(element)
+                        if is_credit_paragraph(text):
+                            relevant_paragraphs.append(text)
+                    elif table is not None and table.element is element:
+                        if table.relevant:
+                            course_tables.append((table.header, table.rows))
+                        table = None
+                    _release(element)
+
+    return build_program(relevant_paragraphs, course_tables)
@@ -0,0 +1,313 @@
+"""
+ProgramParser 模块
+
+培养方案 Word 文档（.docx）的解析、缓存和成绩合并，不依赖 PyQt6。
+主要功能包括：
+1. 从培养方案中提取课程表格（只保留需要的列）和各课程类型的最低学分要求
+2. 按文档内容哈希缓存解析结果，同一专业的学生共用一份培养方案时只解析一次
+3. 把解析后的培养方案和一个学生的成绩合并，得到每门课程的修读状态
+
+解析结果只与文档内容有关，与学生无关；合并是一次纯内存操作。
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+from collections import OrderedDict, namedtuple
+from io import BytesIO
+
+sys.path.append(os.getcwd())
+
+from degree_process.course_matcher import CourseMatcher
+
+DEFAULT_CACHE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'cache', 'programs'))
+
+# 解析逻辑改变时递增，使旧的缓存失效
+PARSER_VERSION = 2
+
+REQUIRED_COLUMN = "理论教学学时"
+DESIRED_COLUMNS = ['课程名称', '修读形式', '学分', '总学时', '开课学年', '开课学期']
+STATUS_COLUMNS = ["状态", "成绩", "绩点"]
+# 默认已修读的课程
+DEFAULT_COMPLETED_COURSES = ["体育", "大学英语", "跨学科基本课程", "形势与政策", "新时代中国特色社会主义劳动教育"]
+SUBTOTAL_ROW = "小计"
+# 培养方案中可能出现的课程号列名，用于与成绩中的"课程号"匹配
+COURSE_NUMBER_COLUMNS = ['课程编号', '课程号', '课程代码']
+
+CourseInfo = namedtuple('CourseInfo', ['course_type', 'required_credits', 'elective_credits'])
+
+# tables 中每个元素为 {'header': 保留的列名, 'rows': 每行保留列的取值, 'course_numbers': 每行的课程号或 None}，
+# 缺少"课程名称"列的表格为 None
+ParsedProgram = namedtuple('ParsedProgram', ['tables', 'credit_info', 'warnings'])
+
+_CREDIT_PATTERN = re.compile(r'(.*?)\s*最低必修学分数[:：]\s*(\d+)\s*最低选修学分数[:：]\s*(\d+)')
+
+
+def extract_credit_info(strings) -> list:
+    """
+    从字符串中提取课程学分信息。
+
+    :param strings: 包含课程学分信息的字符串列表
+    :return: 包含课程类型、必修学分和选修学分的命名元组列表
+    """
+    credit_info = []
+    seen_course_types = set()
+
+    for string in strings:
+        match = _CREDIT_PATTERN.search(string)
+        if match:
+            course_type = match.group(1).strip()
+            required_credits = int(match.group(2))
+            elective_credits = int(match.group(3))
+
+            if course_type not in seen_course_types:
+                credit_info.append(CourseInfo(course_type, required_credits, elective_credits))
+                seen_course_types.add(course_type)
+
+    return credit_info
+
+
+def is_credit_paragraph(text: str) -> bool:
+    """
+    判断段落是否包含课程学分要求。
+    """
+    return "最低选修学分数" in text or "最低必修学分数" in text
+
+
+def build_program(relevant_paragraphs, course_tables) -> ParsedProgram:
+    """
+    由学分要求段落和课程表格构造 ParsedProgram。
+
+    :param relevant_paragraphs: 包含学分要求的段落文本
+    :param course_tables: 课程表格列表，每个元素为 (表头行, 数据行列表)，表头行已去除首尾空白，
+                          数据行为每个单元格的文本
+    :return: ParsedProgram
+    """
+    credit_info = extract_credit_info(relevant_paragraphs)
+
+    tables, warnings = [], []
+    for i, (original_header_row, rows) in enumerate(course_tables):
+        # 获取所需列的索引
+        column_indices = {col: original_header_row.index(col) for col in DESIRED_COLUMNS if
+                          col in original_header_row}
+
+        if '课程名称' not in column_indices:
+            warnings.append(f"警告: 表格 {i + 1} 中没有找到 '课程名称' 列")
+            # 保留占位，使表格序号与学分信息保持对应
+            tables.append(None)
+            continue
+
+        header = [col for col in DESIRED_COLUMNS if col in column_indices]
+        indices = [column_indices[col] for col in header]
+        number_index = next((original_header_row.index(col) for col in COURSE_NUMBER_COLUMNS
+                             if col in original_header_row), None)
+        tables.append({
+            'header': header,
+            'rows': [[cells[index].strip() for index in indices] for cells in rows],
+            'course_numbers': [cells[number_index].strip() if number_index < len(cells) else None
+                               for cells in rows] if number_index is not None else None,
+        })
+
+    return ParsedProgram(tables, credit_info, warnings)
+
+
+def parse_program(document, required_column: str = REQUIRED_COLUMN) -> ParsedProgram:
+    """
+    解析 python-docx 的 Document 对象。
+
+    :param document: Word 文档对象
+    :param required_column: 课程表格必须包含的列名，用于区分课程表格和其他表格
+    :return: ParsedProgram
+    """
+    from degree_process.docx_stream import iter_table_rows
+
+    relevant_paragraphs = [p.text for p in document.paragraphs if is_credit_paragraph(p.text)]
+
+    course_tables = []
+    for table in document.tables:
+        # 直接读取表格 XML，每个单元格只读取一次，不经过 row.cells
+        rows = iter_table_rows(table._tbl)
+        header = next(rows, None)
+        if header is None:
+            continue
+        header_row = [text.strip() for text in header]
+        if required_column in header_row:
+            course_tables.append((header_row, list(rows)))
+
+    return build_program(relevant_paragraphs, course_tables)
+
+
+def merge_program(program: ParsedProgram, scores: list, matcher=None) -> list:
+    """
+    把培养方案和一个学生的成绩合并。体育、大学英语等课程默认已修读。
+
+    课程按课程号（培养方案中有课程号列时）、规范化后的课程名和近似课程名依次匹配，
+    全角括号、空格或"（双语）"之类的注释不同的课程也能匹配到成绩。
+
+    :param program: 解析后的培养方案
+    :param scores: 成绩字典列表
+    :param matcher: 已建立的 CourseMatcher，默认由 scores 建立
+    :return: [{'table': {'header': ..., 'data': ..., 'course_numbers': 每行的课程号（培养方案中有课程号列时）},
+               'info': CourseInfo 或 None}, ...]
+    """
+    # 提取课程信息
+    course_info = matcher if matcher is not None else CourseMatcher(scores)
+
+    results = []
+    for i, table in enumerate(program.tables):
+        if table is None:
+            continue
+
+        name_index = table['header'].index('课程名称')
+        course_numbers = table.get('course_numbers') or [None] * len(table['rows'])
+        table_data = []
+        for row, course_no in zip(table['rows'], course_numbers):
+            course_name = row[name_index]
+            course = course_info.match(course_name, course_no) if course_name != SUBTOTAL_ROW else None
+
+            if course is not None:
+                # 课程已修读
+                status = "已修读"
+                score = course.get('总成绩', '')
+                grade_point = course.get('绩点', '')
+            elif course_name in DEFAULT_COMPLETED_COURSES:
+                status, score, grade_point = "已修读", '', ''
+            elif course_name == SUBTOTAL_ROW:
+                status, score, grade_point = '', '', ''
+            else:
+                # 课程未修读或正在修读（这里简单处理为未修读）
+                status, score, grade_point = "未修读", '', ''
+
+            table_data.append(row + [status, score, grade_point])
+
+        merged_table = {
+            'header': table['header'] + STATUS_COLUMNS,
+            'data': table_data
+        }
+        if table.get('course_numbers'):
+            # 学位进度窗口按课程号把修改后的成绩对应到课程
+            merged_table['course_numbers'] = table['course_numbers']
+        results.append({
+            'table': merged_table,
+            'info': program.credit_info[i] if i < len(program.credit_info) else None
+        })
+
+    return results
+
+
+class ProgramCache:
+    """
+    ProgramCache 类按文档内容哈希缓存解析后的培养方案。
+
+    最近使用的解析结果保存在内存中，同时以 JSON 写入缓存目录，程序重启后仍然有效。
+
+    属性:
+        cache_dir: 缓存目录
+        max_entries: 内存中最多保存的培养方案数
+    """
+
+    def __init__(self, cache_dir: str = None, max_entries: int = 16):
+        """
+        初始化 ProgramCache 对象。
+
+        :param cache_dir: 缓存目录，默认为 cache/programs
+        :param max_entries: 内存中最多保存的培养方案数
+        """
+        self.cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        self.max_entries = max_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def content_hash(content: bytes) -> str:
+        return hashlib.sha256(content).hexdigest()
+
+    def _entry_path(self, file_hash: str) -> str:
+        return os.path.join(self.cache_dir, f"{file_hash}.v{PARSER_VERSION}.json")
+
+    def get(self, file_hash: str):
+        """
+        读取缓存的培养方案，未命中时返回 None。
+        """
+        with self._lock:
+            program = self._memory.get(file_hash)
+            if program is not None:
+                self._memory.move_to_end(file_hash)
+                return program
+
+        path = self._entry_path(file_hash)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                item = json.load(f)
+            program = ParsedProgram(item['tables'], [CourseInfo(*info) for info in item['credit_info']],
+                                    item['warnings'])
+        except Exception as e:
+            print(f"读取培养方案缓存 {path} 失败: {str(e)}")
+            return None
+        self._remember(file_hash, program)
+        return program
+
+    def put(self, file_hash: str, program: ParsedProgram):
+        """
+        写入缓存。
+        """
+        self._remember(file_hash, program)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump({'tables': program.tables, 'credit_info': program.credit_info,
+                               'warnings': program.warnings}, f, ensure_ascii=False)
+                os.replace(tmp_path, self._entry_path(file_hash))
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+        except (IOError, OSError) as e:
+            print(f"写入培养方案缓存失败: {str(e)}")
+
+    def _remember(self, file_hash: str, program: ParsedProgram):
+        with self._lock:
+            self._memory[file_hash] = program
+            self._memory.move_to_end(file_hash)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def load(self, file_path: str) -> ParsedProgram:
+        """
+        读取并解析培养方案文件，命中缓存时不再解析文档。
+
+        :param file_path: .docx 文件路径
+        :return: ParsedProgram
+        """
+        with open(file_path, 'rb') as file:
+            content = file.read()
+        file_hash = self.content_hash(content)
+
+        program = self.get(file_hash)
+        if program is None:
+            # 只流式读取 word/document.xml，不构造 python-docx 的对象树
+            from degree_process.docx_stream import stream_program
+
+            program = stream_program(BytesIO(content))
+            self.put(file_hash, program)
+        return program
+
+
+_default_cache = None
+
+
+def get_program_cache() -> ProgramCache:
+    """
+    返回进程内共享的培养方案缓存。
+    """
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ProgramCache()
+    return _default_cache
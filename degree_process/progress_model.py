@@ -0,0 +1,250 @@
+"""
+ProgressModel 模块
+
+学位进度的数组模型，不依赖 PyQt6。
+主要功能包括：
+1. 把学位进度数据（config/degree_progress_{学号}.json 的内容）中所有课程的学分、修读状态、所属课程类型保存为数组
+2. 一次向量化计算得到每个课程类型的已修读学分
+3. 成绩修改时只更新受影响的课程、只重新计算受影响的课程类型，并通知监听者，使学位进度窗口随成绩编辑实时刷新
+4. 按与 merge_program 相同的规则（课程号、规范化课程名、近似课程名）把成绩记录对应到课程
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.getcwd())
+
+from degree_process.course_matcher import DEFAULT_THRESHOLD, CourseMatcher, core_course_name, normalize_course_name
+from degree_process.program_parser import DEFAULT_COMPLETED_COURSES, SUBTOTAL_ROW
+
+COMPLETED_STATUS = "已修读"
+NOT_COMPLETED_STATUS = "未修读"
+
+
+def _parse_credit(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        # 学分不能转换为浮点数时不计入
+        return 0.0
+
+
+def _score_values(score: dict) -> tuple:
+    return score.get('总成绩', ''), score.get('绩点', '')
+
+
+class DegreeProgressModel:
+    """
+    DegreeProgressModel 类以数组保存各课程类型的课程学分和修读状态。
+
+    课程按课程类型依次排列，第 t 个课程类型的课程位于 [offsets[t], offsets[t + 1])。
+    表格数据（data）与数组保持同步，修改状态时同时修改表格中的"状态"、"成绩"、"绩点"列。
+    每门课程记录满足它的成绩记录（重修等情况下同一课程有多条成绩），最后一条被删除或改名后才改为未修读。
+
+    属性:
+        data: 学位进度数据，列表形式，每个元素为 {'info': ..., 'table': {'header': ..., 'data': ...}}
+        offsets: 每个课程类型的课程在数组中的起始位置
+        type_ids: 每门课程所属的课程类型序号
+        credits: 每门课程的学分
+        completed: 每门课程是否已修读
+    """
+
+    def __init__(self, data: list, threshold: float = DEFAULT_THRESHOLD):
+        """
+        初始化 DegreeProgressModel 对象。
+
+        :param data: 学位进度数据
+        :param threshold: 近似匹配课程名的相似度阈值，与 merge_program 使用的 CourseMatcher 相同
+        """
+        self.data = data
+        self._listeners = []
+        self._columns = []
+        self._rows_by_number = {}
+        self._rows_by_name = {}
+        self._rows_by_core = {}
+        # 近似匹配：每个不同的规范化课程名一条记录，记录中保存该课程名的全部位置
+        self._matcher = CourseMatcher(threshold=threshold)
+        # 位置 -> 满足该课程的成绩记录的 (成绩, 绩点) 列表，显示最后一条
+        self._matches = {}
+
+        credits, completed, type_ids, offsets = [], [], [], [0]
+        for type_index, item in enumerate(data):
+            header = item['table']['header']
+            rows = item['table']['data']
+            course_numbers = item['table'].get('course_numbers') or [None] * len(rows)
+            columns = {name: header.index(name) if name in header else -1
+                       for name in ("课程名称", "学分", "状态", "成绩", "绩点")}
+            self._columns.append(columns)
+
+            for row, course_no in zip(rows, course_numbers):
+                position = len(credits)
+                credits.append(_parse_credit(row[columns["学分"]]) if columns["学分"] != -1 else 0.0)
+                completed.append(columns["状态"] != -1 and row[columns["状态"]] == COMPLETED_STATUS)
+                type_ids.append(type_index)
+                if columns["课程名称"] != -1:
+                    self._index_course(row[columns["课程名称"]], course_no, position)
+                    # 未调用 set_scores 时，已修读且不是默认已修读的课程视为由一条成绩记录满足
+                    values = tuple(row[columns[column]] if columns[column] != -1 else '' for column in ("成绩", "绩点"))
+                    if completed[-1] and (any(values) or row[columns["课程名称"]] not in DEFAULT_COMPLETED_COURSES):
+                        self._matches[position] = [values]
+            offsets.append(len(credits))
+
+        self.offsets = np.array(offsets, dtype=np.int64)
+        self.type_ids = np.array(type_ids, dtype=np.int64)
+        self.credits = np.array(credits, dtype=np.float64)
+        self.completed = np.array(completed, dtype=bool)
+        self._completed_credits = self._compute_all()
+
+    def _index_course(self, course_name, course_no, position: int):
+        if course_name == SUBTOTAL_ROW:
+            return
+        if course_no not in (None, ''):
+            self._rows_by_number.setdefault(str(course_no).strip(), []).append(position)
+        normalized = normalize_course_name(course_name)
+        if not normalized:
+            return
+        positions = self._rows_by_name.get(normalized)
+        if positions is None:
+            positions = self._rows_by_name[normalized] = []
+            self._matcher.add({'课程名': normalized, 'positions': positions})
+        positions.append(position)
+        self._rows_by_core.setdefault(core_course_name(normalized), []).append(position)
+
+    def __len__(self):
+        return len(self.data)
+
+    def _compute_all(self) -> np.ndarray:
+        return np.bincount(self.type_ids, weights=self.credits * self.completed, minlength=len(self.data))
+
+    def _recompute(self, type_indices):
+        for type_index in type_indices:
+            start, end = self.offsets[type_index], self.offsets[type_index + 1]
+            self._completed_credits[type_index] = self.credits[start:end][self.completed[start:end]].sum()
+
+    def info(self, type_index: int):
+        return self.data[type_index]['info']
+
+    def table(self, type_index: int) -> dict:
+        return self.data[type_index]['table']
+
+    def completed_credits(self, type_index: int = None):
+        """
+        已修读的学分。
+
+        :param type_index: 课程类型序号，None 表示返回所有课程类型的数组
+        """
+        if type_index is None:
+            return self._completed_credits.copy()
+        return float(self._completed_credits[type_index])
+
+    def add_listener(self, callback):
+        """
+        注册监听者，课程状态改变时以受影响的课程类型序号列表调用 callback。
+        """
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _locate(self, position: int):
+        type_index = int(self.type_ids[position])
+        return type_index, position - int(self.offsets[type_index])
+
+    def find_courses(self, course_name, course_no=None) -> list:
+        """
+        查找成绩记录对应的课程在数组中的位置，规则与 merge_program 相同：
+        课程号相同的课程，以及课程名（规范化后，忽略"（双语）"等注释）相同或近似的课程。
+
+        :param course_name: 成绩记录的课程名
+        :param course_no: 成绩记录的课程号，可选
+        """
+        positions = set()
+        if course_no not in (None, ''):
+            positions.update(self._rows_by_number.get(str(course_no).strip(), ()))
+
+        normalized = normalize_course_name(course_name)
+        if not normalized:
+            return sorted(positions)
+        by_name = self._rows_by_name.get(normalized)
+        if by_name is None:
+            by_name = self._rows_by_core.get(core_course_name(normalized))
+        if by_name is None:
+            course = self._matcher.match(normalized)
+            by_name = course['positions'] if course is not None else ()
+        positions.update(by_name)
+        return sorted(positions)
+
+    def find_score_courses(self, score: dict) -> list:
+        return self.find_courses(score.get('课程名'), score.get('课程号'))
+
+    def set_scores(self, scores: list):
+        """
+        由学生的全部成绩记录重新统计每门课程被哪些成绩记录满足，不改变当前的修读状态。
+        之后删除重修课程的其中一条成绩时，课程仍为已修读。
+
+        :param scores: 成绩字典列表
+        """
+        self._matches = {}
+        for score in scores:
+            for position in self.find_score_courses(score):
+                self._matches.setdefault(position, []).append(_score_values(score))
+
+    def _set_course(self, position: int, completed: bool, score, grade_point):
+        type_index, row_index = self._locate(position)
+        columns = self._columns[type_index]
+        row = self.data[type_index]['table']['data'][row_index]
+        if completed:
+            status = COMPLETED_STATUS
+        elif columns["课程名称"] != -1 and row[columns["课程名称"]] in DEFAULT_COMPLETED_COURSES:
+            status, completed, score, grade_point = COMPLETED_STATUS, True, '', ''
+        else:
+            status, score, grade_point = NOT_COMPLETED_STATUS, '', ''
+
+        for column, value in (("状态", status), ("成绩", score), ("绩点", grade_point)):
+            if columns[column] != -1:
+                row[columns[column]] = value
+        self.completed[position] = completed
+        return type_index
+
+    def update_score(self, old_score: dict = None, new_score: dict = None) -> list:
+        """
+        一条成绩记录被修改、新增或删除后，更新对应课程的修读状态和已修读学分。
+
+        修改前的成绩记录不再满足对应的课程，没有其他成绩记录满足时改为未修读；修改后的成绩记录对应的课程
+        改为已修读并显示新的成绩和绩点。只重新计算这些课程所属的课程类型。
+
+        :param old_score: 修改前的成绩记录，新增时为 None
+        :param new_score: 修改后的成绩记录，删除时为 None
+        :return: 受影响的课程类型序号列表
+        """
+        touched = set()
+        if old_score:
+            old_values = _score_values(old_score)
+            for position in self.find_score_courses(old_score):
+                matches = self._matches.get(position)
+                if matches:
+                    # 删除与修改前的成绩相同的一条；初始状态来自学位进度文件时可能对不上，删除最早的一条
+                    matches.remove(old_values if old_values in matches else matches[0])
+                touched.add(position)
+        if new_score:
+            for position in self.find_score_courses(new_score):
+                self._matches.setdefault(position, []).append(_score_values(new_score))
+                touched.add(position)
+
+        affected = set()
+        for position in touched:
+            matches = self._matches.get(position)
+            if matches:
+                affected.add(self._set_course(position, True, *matches[-1]))
+            else:
+                affected.add(self._set_course(position, False, '', ''))
+
+        affected = sorted(affected)
+        if affected:
+            self._recompute(affected)
+            for callback in list(self._listeners):
+                callback(affected)
+        return affected
@@ -0,0 +1,267 @@
+"""
+BackgroundTask 模块
+
+基于 QThreadPool 的后台任务框架，把耗时的解析、保存操作移出界面线程。
+主要功能包括：
+1. 在线程池中执行任务函数，任务函数通过 report_progress 报告进度
+2. 协作式取消：调用 cancel() 后，任务在下一次报告进度时结束，结果被丢弃；
+   任务开始写入磁盘等不能撤销的步骤前调用 disable_cancel()，之后不再响应取消
+3. 进度、结果、错误通过信号送回界面线程，回调都在界面线程中执行
+4. 使用 QProgressDialog 显示进度，点击取消按钮时取消任务
+
+任务函数的参数为任务对象本身：func(task)，其他参数用闭包或 functools.partial 传入。
+"""
+
+import os
+import sys
+import threading
+import traceback
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, Qt, pyqtSignal
+from PyQt6.QtWidgets import QProgressDialog
+
+sys.path.append(os.getcwd())
+
+
+class TaskCancelled(Exception):
+    """
+    任务被取消时由 report_progress / check_cancelled 抛出，任务函数不需要捕获。
+    """
+
+
+class TaskSignals(QObject):
+    """
+    后台任务的信号。信号在工作线程中发出，连接到界面线程中的对象或函数时以队列方式送达。
+    """
+    progress = pyqtSignal(int, int, str)  # 已完成步数, 总步数, 说明
+    finished = pyqtSignal(object)  # 任务函数的返回值
+    failed = pyqtSignal(object)  # 任务函数抛出的异常
+    cancelled = pyqtSignal()
+    cancel_disabled = pyqtSignal()  # 任务进入不能取消的步骤
+
+
+class BackgroundTask(QRunnable):
+    """
+    BackgroundTask 类在线程池中执行一个任务函数。
+
+    属性:
+        func: 任务函数 func(task)
+        signals: 任务信号（TaskSignals）
+        name: 任务名称，用于日志
+    """
+
+    def __init__(self, func, name: str = ""):
+        """
+        初始化 BackgroundTask 对象。
+
+        :param func: 任务函数，参数为任务对象本身
+        :param name: 任务名称
+        """
+        super().__init__()
+        self.func = func
+        self.name = name
+        self.signals = TaskSignals()
+        self._cancelled = False
+        self._cancel_disabled = False
+        self._cancel_lock = threading.Lock()
+        self._done = False
+
+    def cancel(self):
+        """
+        请求取消任务，任务在下一次报告进度（或检查取消）时结束。已调用 disable_cancel() 时不起作用。
+        """
+        with self._cancel_lock:
+            if not self._cancel_disabled:
+                self._cancelled = True
+
+    def disable_cancel(self):
+        """
+        在任务函数中调用，开始不能撤销的步骤（如保存、导出文件）之前确认任务未被取消，之后不再响应取消，
+        任务的结果一定送达 on_finished / on_failed。
+
+        :raises TaskCancelled: 任务已被取消时
+        """
+        with self._cancel_lock:
+            self.check_cancelled()
+            self._cancel_disabled = True
+        self.signals.cancel_disabled.emit()
+
+    def is_cancelled(self) -> bool:
+        return self._cancelled
+
+    def is_done(self) -> bool:
+        return self._done
+
+    def check_cancelled(self):
+        """
+        :raises TaskCancelled: 任务已被取消时
+        """
+        if self._cancelled:
+            raise TaskCancelled()
+
+    def report_progress(self, done: int, total: int, message: str = ""):
+        """
+        在任务函数中调用，报告进度，同时检查是否已取消。
+
+        :param done: 已完成步数
+        :param total: 总步数
+        :param message: 当前步骤的说明
+        :raises TaskCancelled: 任务已被取消时
+        """
+        self.check_cancelled()
+        self.signals.progress.emit(done, total, message)
+
+    def run(self):
+        try:
+            self.check_cancelled()
+            # 任务函数返回后不再检查取消：结果可能已经写入磁盘
+            result = self.func(self)
+        except TaskCancelled:
+            self._done = True
+            self.signals.cancelled.emit()
+        except Exception as e:
+            print(f"Background task {self.name} failed: {str(e)}")
+            traceback.print_exc()
+            self._done = True
+            self.signals.failed.emit(e)
+        else:
+            self._done = True
+            self.signals.finished.emit(result)
+
+
+class TaskRunner(QObject):
+    """
+    TaskRunner 类把任务提交到线程池，并保留运行中任务的引用，直到结果送达界面线程。
+
+    属性:
+        thread_pool: 执行任务的线程池
+        tasks: 运行中的任务
+    """
+
+    def __init__(self, thread_pool: QThreadPool = None, parent=None):
+        """
+        初始化 TaskRunner 对象。
+
+        :param thread_pool: 线程池，默认为 QThreadPool.globalInstance()
+        :param parent: 父对象
+        """
+        super().__init__(parent)
+        self.thread_pool = thread_pool if thread_pool is not None else QThreadPool.globalInstance()
+        self.tasks = set()
+
+    def start(self, func, on_finished=None, on_failed=None, on_progress=None, on_cancelled=None,
+              name: str = "") -> BackgroundTask:
+        """
+        在线程池中执行任务函数，回调都在界面线程中调用。
+
+        :param func: 任务函数 func(task)
+        :param on_finished: 成功结束后调用 on_finished(返回值)
+        :param on_failed: 抛出异常后调用 on_failed(异常)
+        :param on_progress: 报告进度时调用 on_progress(已完成步数, 总步数, 说明)
+        :param on_cancelled: 被取消后调用 on_cancelled()
+        :param name: 任务名称
+        :return: 任务对象，可用于取消
+        """
+        task = BackgroundTask(func, name)
+        # Python 侧的任务对象和信号对象须保持存活，直到结果送达
+        task.setAutoDelete(False)
+        self.tasks.add(task)
+
+        def release(*_):
+            self.tasks.discard(task)
+
+        # 先释放再调用回调，回调中可以立即启动新的任务
+        task.signals.finished.connect(release)
+        task.signals.failed.connect(release)
+        task.signals.cancelled.connect(release)
+        if on_progress:
+            task.signals.progress.connect(on_progress)
+        if on_finished:
+            task.signals.finished.connect(on_finished)
+        if on_failed:
+            task.signals.failed.connect(on_failed)
+        if on_cancelled:
+            task.signals.cancelled.connect(on_cancelled)
+
+        self.thread_pool.start(task)
+        return task
+
+    def cancel_all(self):
+        for task in list(self.tasks):
+            task.cancel()
+
+    def wait(self, timeout_ms: int = -1) -> bool:
+        """
+        等待线程池中的任务全部结束（不处理界面事件，回调在之后的事件循环中执行）。
+
+        :return: 是否在超时前结束
+        """
+        return self.thread_pool.waitForDone(timeout_ms)
+
+
+_default_runner = None
+
+
+def get_task_runner() -> TaskRunner:
+    """
+    返回进程内共享的 TaskRunner（使用全局线程池）。
+    """
+    global _default_runner
+    if _default_runner is None:
+        _default_runner = TaskRunner()
+    return _default_runner
+
+
+def run_with_progress_dialog(parent, title: str, label: str, func, on_finished=None, on_failed=None,
+                             on_cancelled=None, cancellable: bool = True) -> BackgroundTask:
+    """
+    在后台执行任务函数，同时显示窗口模态的进度对话框，任务结束后关闭对话框再调用回调。
+
+    :param parent: 进度对话框的父窗口
+    :param title: 进度对话框标题
+    :param label: 初始说明文字
+    :param func: 任务函数 func(task)
+    :param on_finished: 成功结束后调用 on_finished(返回值)
+    :param on_failed: 抛出异常后调用 on_failed(异常)
+    :param on_cancelled: 被取消后调用 on_cancelled()
+    :param cancellable: 是否显示取消按钮
+    :return: 任务对象
+    """
+    dialog = QProgressDialog(label, "取消", 0, 0, parent)
+    if not cancellable:
+        dialog.setCancelButton(None)
+    dialog.setWindowTitle(title)
+    dialog.setWindowModality(Qt.WindowModality.WindowModal)
+    dialog.setMinimumDuration(0)
+    # 对话框只在任务结束时关闭，不随进度达到最大值自动关闭
+    dialog.setAutoClose(False)
+    dialog.setAutoReset(False)
+
+    def on_progress(done, total, message):
+        dialog.setMaximum(total)
+        dialog.setValue(done)
+        if message:
+            dialog.setLabelText(message)
+
+    def on_cancel_disabled():
+        # 不能取消的步骤开始后不再显示取消按钮
+        if cancellable:
+            dialog.setCancelButton(None)
+
+    def finish(callback):
+        def handler(*args):
+            if cancellable:
+                dialog.canceled.disconnect(task.cancel)
+            dialog.close()
+            dialog.deleteLater()
+            if callback:
+                callback(*args)
+        return handler
+
+    task = get_task_runner().start(func, on_finished=finish(on_finished), on_failed=finish(on_failed),
+                                   on_progress=on_progress, on_cancelled=finish(on_cancelled), name=title)
+    task.signals.cancel_disabled.connect(on_cancel_disabled)
+    if cancellable:
+        dialog.canceled.connect(task.cancel)
+    dialog.show()
+    return task
@@ -0,0 +1,256 @@
+"""
+BatchImport 模块
+
+批量导入一个目录（或一份清单）中的教务成绩文件，无需逐个通过对话框操作。
+主要功能包括：
+1. 从目录中的文件名（如 {学号}_{姓名}.xlsx）或清单 CSV（文件,姓名,学号）生成导入任务
+2. 使用进程池并行解析和转换文件，列处理规则与 FileDealer.import_file 相同
+3. 报告进度，并把每个文件的错误写入错误报告
+4. 记录已完成的文件，中断后可以从该记录继续
+
+该模块不依赖 PyQt6，可以在命令行中直接运行：
+    python -m file_import.batch_import <目录或清单.csv> [--workers N] [--no-resume]
+"""
+
+import argparse
+import csv
+import os
+import re
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+sys.path.append(os.getcwd())
+
+from file_import.score_converter import read_student_record
+from file_import.student_score_analyzer import StudentScoreAnalyzer
+
+BatchJob = namedtuple('BatchJob', ['file_path', 'name', 'student_id'])
+
+TABLE_FILE_EXTENSIONS = ('.xls', '.xlsx')
+MANIFEST_FILE_NAME = "manifest.csv"
+ERROR_REPORT_FILE_NAME = "batch_import_errors.csv"
+COMPLETED_FILE_NAME = "batch_import_completed.txt"
+# 等待子进程时检查是否取消的间隔（秒）
+CANCEL_POLL_INTERVAL = 0.2
+
+# 文件名中的学号为14位数字，其余部分作为姓名，如 "37220222203691_张三.xlsx"
+_STUDENT_ID_PATTERN = re.compile(r'(\d{14})')
+
+
+def jobs_from_directory(directory: str) -> list:
+    """
+    根据目录中的文件名生成导入任务。无法识别学号或姓名的文件对应的字段为空，导入时记入错误报告。
+
+    :param directory: 成绩文件所在目录
+    :return: 导入任务列表
+    """
+    jobs = []
+    for file_name in sorted(os.listdir(directory)):
+        stem, ext = os.path.splitext(file_name)
+        if ext.lower() not in TABLE_FILE_EXTENSIONS or file_name.startswith('~$'):
+            continue
+
+        match = _STUDENT_ID_PATTERN.search(stem)
+        name = (stem[:match.start()] + stem[match.end():]).strip(' _-') if match else ''
+        student_id = match.group(1) if match else ''
+        jobs.append(BatchJob(os.path.join(directory, file_name), name, student_id))
+    return jobs
+
+
+def jobs_from_manifest(manifest_path: str) -> list:
+    """
+    从清单 CSV 生成导入任务。清单的表头为 "文件,姓名,学号"（或 "file,name,student_id"），
+    相对路径相对于清单所在目录。
+
+    :param manifest_path: 清单文件路径
+    :return: 导入任务列表
+    """
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    jobs = []
+    with open(manifest_path, 'r', encoding='utf-8-sig', newline='') as f:
+        for row in csv.DictReader(f):
+            file_path = (row.get('文件') or row.get('file') or '').strip()
+            name = (row.get('姓名') or row.get('name') or '').strip()
+            student_id = (row.get('学号') or row.get('student_id') or '').strip()
+            if not file_path:
+                continue
+            if not os.path.isabs(file_path):
+                file_path = os.path.join(base_dir, file_path)
+            jobs.append(BatchJob(os.path.normpath(file_path), name, student_id))
+    return jobs
+
+
+def load_completed(completed_path: str) -> set:
+    """
+    读取已完成文件的记录。
+
+    :param completed_path: 已完成文件记录的路径
+    :return: 已完成文件的绝对路径集合
+    """
+    if not completed_path or not os.path.exists(completed_path):
+        return set()
+    with open(completed_path, 'r', encoding='utf-8') as f:
+        return {line.strip() for line in f if line.strip()}
+
+
+def convert_job(job: BatchJob):
+    """
+    在子进程中读取并转换一个成绩文件。
+
+    :param job: 导入任务
+    :return: (导入任务, 学生记录, 错误信息)，成功时错误信息为 None
+    """
+    try:
+        if not job.name or not job.student_id:
+            raise ValueError("缺少姓名或学号，请检查文件名或清单")
+        record, _, _ = read_student_record(job.file_path, job.name, job.student_id)
+        return job, record, None
+    except Exception as e:
+        return job, None, f"{type(e).__name__}: {str(e)}"
+
+
+class BatchImporter:
+    """
+    BatchImporter 类在进程池中转换成绩文件，并在主进程中依次保存结果。
+
+    属性:
+        score_store: 成绩存储后端，None 表示按配置选择
+        max_workers: 进程池大小，None 表示使用 CPU 核数
+        progress_callback: 进度回调 callback(已处理数, 总数, 导入任务, 错误信息)
+        should_cancel: 返回是否已取消的函数（如后台任务的 is_cancelled），等待子进程时定期检查
+    """
+
+    def __init__(self, score_store=None, max_workers: int = None, progress_callback=None, should_cancel=None):
+        self.analyzer = StudentScoreAnalyzer(score_store=score_store)
+        self.max_workers = max_workers
+        self.progress_callback = progress_callback
+        self.should_cancel = should_cancel
+        self.cancelled = False
+
+    def cancel(self):
+        """
+        取消批量导入：尚未开始转换的文件不再处理，留待下次继续；正在子进程中转换的文件处理完毕后保存并记录。
+        """
+        self.cancelled = True
+
+    def is_cancelled(self) -> bool:
+        return self.cancelled or (self.should_cancel is not None and self.should_cancel())
+
+    def run(self, jobs: list, error_report_path: str, completed_path: str, resume: bool = True) -> dict:
+        """
+        执行批量导入。
+
+        :param jobs: 导入任务列表
+        :param error_report_path: 错误报告（CSV）路径
+        :param completed_path: 已完成文件记录的路径，每完成一个文件追加一行
+        :param resume: 是否跳过已完成记录中的文件
+        :return: 统计结果 {"total", "skipped", "succeeded", "failed"}
+        """
+        completed = load_completed(completed_path) if resume else set()
+        if not resume and os.path.exists(completed_path):
+            os.remove(completed_path)
+
+        pending = [job for job in jobs if os.path.abspath(job.file_path) not in completed]
+        summary = {"total": len(jobs), "skipped": len(jobs) - len(pending), "succeeded": 0, "failed": 0}
+        if not pending:
+            return summary
+
+        new_report = not resume or not os.path.exists(error_report_path)
+        with open(error_report_path, 'w' if new_report else 'a', encoding='utf-8-sig', newline='') as report_file, \
+                open(completed_path, 'a', encoding='utf-8') as completed_file:
+            report = csv.writer(report_file)
+            if new_report:
+                report.writerow(["文件", "姓名", "学号", "错误", "时间"])
+
+            def save_result(future):
+                job, record, error = future.result()
+                if error is None:
+                    try:
+                        self.analyzer.save_student_record(record)
+                    except Exception as e:
+                        error = f"保存失败: {str(e)}"
+
+                if error is None:
+                    summary["succeeded"] += 1
+                    completed_file.write(os.path.abspath(job.file_path) + "\n")
+                    completed_file.flush()
+                else:
+                    summary["failed"] += 1
+                    report.writerow([job.file_path, job.name, job.student_id, error,
+                                     time.strftime("%Y-%m-%d %H:%M:%S")])
+                    report_file.flush()
+
+                if self.progress_callback:
+                    self.progress_callback(summary["succeeded"] + summary["failed"], len(pending), job, error)
+
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                running = {executor.submit(convert_job, job) for job in pending}
+                # 定时醒来检查是否取消，不必等到下一个文件处理完
+                while running and not self.is_cancelled():
+                    finished, running = wait(running, timeout=CANCEL_POLL_INTERVAL, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        save_result(future)
+
+                if running:
+                    # 取消尚未开始的文件；等待正在转换的文件结束，并和其他文件一样保存、记录
+                    executor.shutdown(wait=True, cancel_futures=True)
+                    for future in running:
+                        if not future.cancelled():
+                            save_result(future)
+
+        return summary
+
+
+def collect_jobs(source: str) -> list:
+    """
+    根据目录或清单文件生成导入任务。目录中存在 manifest.csv 时优先使用清单。
+
+    :param source: 目录或清单文件路径
+    :return: 导入任务列表
+    """
+    if os.path.isdir(source):
+        manifest_path = os.path.join(source, MANIFEST_FILE_NAME)
+        if os.path.exists(manifest_path):
+            return jobs_from_manifest(manifest_path)
+        return jobs_from_directory(source)
+    return jobs_from_manifest(source)
+
+
+def default_report_paths(source: str) -> (str, str):
+    """
+    错误报告和已完成记录默认保存在目录（或清单所在目录）中。
+
+    :param source: 目录或清单文件路径
+    :return: (错误报告路径, 已完成记录路径)
+    """
+    base_dir = source if os.path.isdir(source) else os.path.dirname(os.path.abspath(source))
+    return os.path.join(base_dir, ERROR_REPORT_FILE_NAME), os.path.join(base_dir, COMPLETED_FILE_NAME)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="批量导入教务成绩文件")
+    parser.add_argument("source", help="成绩文件目录，或 文件,姓名,学号 格式的清单 CSV")
+    parser.add_argument("--workers", type=int, default=None, help="进程数，默认为 CPU 核数")
+    parser.add_argument("--report", default=None, help="错误报告路径")
+    parser.add_argument("--completed", default=None, help="已完成文件记录的路径")
+    parser.add_argument("--no-resume", action="store_true", help="忽略已完成记录，重新导入所有文件")
+    args = parser.parse_args()
+
+    jobs = collect_jobs(args.source)
+    default_report, default_completed = default_report_paths(args.source)
+
+    def print_progress(done, total, job, error):
+        status = "失败: " + error if error else "完成"
+        print(f"[{done}/{total}] {job.file_path} {status}")
+
+    importer = BatchImporter(max_workers=args.workers, progress_callback=print_progress)
+    summary = importer.run(jobs, args.report or default_report, args.completed or default_completed,
+                           resume=not args.no_resume)
+    print(f"共 {summary['total']} 个文件，跳过 {summary['skipped']} 个，"
+          f"成功 {summary['succeeded']} 个，失败 {summary['failed']} 个")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+ConfigService 模块
+
+config 目录下 JSON 配置文件的统一读写入口。
+主要功能包括：
+1. 每个配置文件只解析一次，之后的读取直接使用内存中的数据
+2. 每次读取前比较文件的修改时间，文件被外部修改时自动重新加载
+3. 短时间内的多次写入合并为一次延迟的原子写入（写入临时文件后替换），程序退出前写入尚未保存的修改
+
+用法：
+    config = get_config_service()                # config/user_config.json
+    config.get("student_id_input", "")
+    config.set("student_id_input", "37220222203691")
+    get_config_service("menu_config.json").load(required=True)
+"""
+
+import atexit
+import copy
+import json
+import os
+import sys
+import tempfile
+import threading
+
+sys.path.append(os.getcwd())
+
+CONFIG_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'config'))
+USER_CONFIG_FILE_NAME = "user_config.json"
+DEFAULT_FLUSH_DELAY = 0.5
+
+_MISSING = object()
+
+
+class ConfigService:
+    """
+    ConfigService 类缓存一个 JSON 配置文件，并合并写入。
+
+    属性:
+        path: 配置文件路径
+        flush_delay: 最后一次修改后延迟写入的秒数
+    """
+
+    def __init__(self, path: str, flush_delay: float = DEFAULT_FLUSH_DELAY):
+        """
+        初始化 ConfigService 对象，不立即读取文件。
+
+        :param path: 配置文件路径
+        :param flush_delay: 延迟写入的秒数，0 表示每次修改立即写入
+        """
+        self.path = path
+        self.flush_delay = flush_delay
+        self._lock = threading.RLock()
+        self._data = None
+        self._mtime = None
+        # 尚未写入文件的修改，文件被外部修改后重新加载时需要再次应用
+        self._pending = {}
+        self._timer = None
+
+    def _file_mtime(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _ensure_loaded(self, required: bool = False):
+        mtime = self._file_mtime()
+        if self._data is not None and mtime == self._mtime:
+            return
+        if mtime is None:
+            if required:
+                raise FileNotFoundError(f"无法找到配置文件: {self.path}")
+            data = {}
+        else:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except json.JSONDecodeError:
+                if required:
+                    raise ValueError(f"配置文件格式错误: {self.path}")
+                print(f"配置文件格式错误: {self.path}")
+                data = {}
+            except IOError:
+                if required:
+                    raise
+                print(f"读取配置文件时发生错误: {self.path}")
+                data = {}
+        data.update(self._pending)
+        self._data = data
+        self._mtime = mtime
+
+    def load(self, required: bool = False) -> dict:
+        """
+        读取整个配置。返回的是副本，修改它不会影响配置。
+
+        :param required: 为 True 时文件不存在抛出 FileNotFoundError，格式错误抛出 ValueError；
+                         否则按空配置处理
+        :return: 配置字典
+        """
+        with self._lock:
+            self._ensure_loaded(required)
+            return copy.deepcopy(self._data)
+
+    def get(self, key: str, default=None):
+        """
+        读取一个配置项。
+
+        :param key: 配置项名称
+        :param default: 配置项不存在时的返回值
+        """
+        with self._lock:
+            self._ensure_loaded()
+            value = self._data.get(key, _MISSING)
+        return default if value is _MISSING else copy.deepcopy(value)
+
+    def set(self, key: str, value):
+        """
+        修改一个配置项，稍后写入文件。
+        """
+        self.update({key: value})
+
+    def update(self, values: dict):
+        """
+        修改多个配置项，稍后合并写入文件。
+
+        :param values: {配置项名称: 值}
+        """
+        with self._lock:
+            self._ensure_loaded()
+            values = copy.deepcopy(values)
+            self._data.update(values)
+            self._pending.update(values)
+            self._schedule_flush()
+
+    def _schedule_flush(self):
+        if self.flush_delay <= 0:
+            self.flush()
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(self.flush_delay, self.flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def flush(self):
+        """
+        立即把尚未保存的修改原子地写入文件。
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._pending:
+                return
+            # 写入前重新检查文件，保留外部对其他配置项的修改
+            self._ensure_loaded()
+            directory = os.path.dirname(self.path)
+            try:
+                os.makedirs(directory, exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+                try:
+                    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                        json.dump(self._data, f, indent=4, ensure_ascii=False)
+                    os.replace(tmp_path, self.path)
+                finally:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+            except (IOError, OSError) as e:
+                print(f"保存配置文件时发生错误: {str(e)}")
+                return
+            self._pending.clear()
+            self._mtime = self._file_mtime()
+
+
+_services = {}
+_services_lock = threading.Lock()
+
+
+def get_config_service(file_name: str = USER_CONFIG_FILE_NAME) -> ConfigService:
+    """
+    返回 config 目录下某个配置文件的共享 ConfigService，同一个文件在进程内只有一个实例。
+
+    :param file_name: 配置文件名，默认为 user_config.json
+    """
+    path = os.path.join(CONFIG_DIR, file_name)
+    with _services_lock:
+        service = _services.get(path)
+        if service is None:
+            service = _services[path] = ConfigService(path)
+        return service
+
+
+@atexit.register
+def flush_all():
+    """
+    写入所有配置文件中尚未保存的修改。
+    """
+    with _services_lock:
+        services = list(_services.values())
+    for service in services:
+        service.flush()
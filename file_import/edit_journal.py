@@ -0,0 +1,166 @@
+"""
+EditJournal 模块
+
+记录成绩表单元格修改的追加式日志（data/{学号}.journal.jsonl），每行一条修改：
+行号、行标识（课程号或课程名）、列名、旧值、新值。
+
+每条修改写入后立即刷新到磁盘，程序崩溃也不会丢失已记录的修改；
+保存时把日志合并（压缩）进主记录，合并只需处理修改过的单元格。
+"""
+
+import json
+import os
+import sys
+import time
+from collections import namedtuple
+
+sys.path.append(os.getcwd())
+
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'data'))
+
+JournalEntry = namedtuple('JournalEntry', ['row', 'key', 'column', 'old', 'new'])
+
+
+def row_key(score: dict) -> str:
+    """
+    成绩行的标识，用于在合并时校验行号仍然指向同一门课程。
+    """
+    return str(score.get('课程号', score.get('课程名', '')))
+
+
+class EditJournal:
+    """
+    EditJournal 类管理一个学生的修改日志。
+
+    日志分为两个文件：
+    - {学号}.journal.jsonl：正在记录的修改
+    - {学号}.journal.compacting.jsonl：已确认保存、正在合并进主记录的修改
+
+    确认保存时先把前者原子地重命名为后者，合并完成后再删除，
+    因此合并过程中崩溃时，下次加载会重新应用这些修改（应用修改是幂等的）。
+
+    属性:
+        student_id: 学号
+        path: 正在记录的日志文件路径
+        compacting_path: 正在合并的日志文件路径
+    """
+
+    def __init__(self, student_id: str, journal_dir: str = None):
+        """
+        初始化 EditJournal 对象。
+
+        :param student_id: 学号
+        :param journal_dir: 日志目录，默认为 data
+        """
+        journal_dir = journal_dir or DATA_DIR
+        self.student_id = student_id
+        self.path = os.path.join(journal_dir, f"{student_id}.journal.jsonl")
+        self.compacting_path = os.path.join(journal_dir, f"{student_id}.journal.compacting.jsonl")
+
+    def append(self, row: int, key: str, column: str, old, new):
+        """
+        追加一条修改并刷新到磁盘。
+
+        :param row: 成绩在记录中的行号（不含学生信息）
+        :param key: 行标识
+        :param column: 列名
+        :param old: 旧值
+        :param new: 新值
+        """
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        line = json.dumps({"row": row, "key": key, "column": column, "old": old, "new": new, "time": time.time()},
+                          ensure_ascii=False)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(line + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    @staticmethod
+    def _read(path: str) -> list:
+        entries = []
+        if not os.path.exists(path):
+            return entries
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    item = json.loads(line)
+                except json.JSONDecodeError:
+                    # 崩溃时最后一行可能只写了一半，忽略
+                    continue
+                entries.append(JournalEntry(item["row"], item.get("key"), item["column"], item.get("old"),
+                                            item.get("new")))
+        return entries
+
+    def pending_entries(self) -> list:
+        """
+        所有尚未合并进主记录的修改，按记录顺序排列。
+        """
+        return self._read(self.compacting_path) + self._read(self.path)
+
+    def has_pending(self) -> bool:
+        return os.path.exists(self.path) or os.path.exists(self.compacting_path)
+
+    def discard(self):
+        """
+        放弃尚未确认保存的修改。
+        """
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def discard_all(self):
+        """
+        主记录已整体重写（包含全部修改）后调用，删除正在记录的和待合并的日志。
+        """
+        self.discard()
+        self.finish_compaction()
+
+    def begin_compaction(self) -> list:
+        """
+        确认保存：把正在记录的修改移入待合并日志。
+
+        :return: 待合并的全部修改
+        """
+        if os.path.exists(self.path):
+            if os.path.exists(self.compacting_path):
+                # 上一次合并尚未完成，把新的修改追加到待合并日志之后
+                with open(self.path, 'r', encoding='utf-8') as src, \
+                        open(self.compacting_path, 'a', encoding='utf-8') as dst:
+                    dst.write(src.read())
+                    dst.flush()
+                    os.fsync(dst.fileno())
+                os.remove(self.path)
+            else:
+                os.replace(self.path, self.compacting_path)
+        return self._read(self.compacting_path)
+
+    def finish_compaction(self):
+        """
+        合并完成，删除待合并日志。
+        """
+        if os.path.exists(self.compacting_path):
+            os.remove(self.compacting_path)
+
+    @staticmethod
+    def apply(scores: list, entries: list) -> dict:
+        """
+        把修改应用到成绩列表上。
+
+        :param scores: 成绩字典列表，或只包含相关行的 {行号: 成绩字典}，原地修改
+        :param entries: 修改列表
+        :return: {行号: 修改后的成绩行}
+        """
+        changed = {}
+        for entry in entries:
+            if isinstance(scores, dict):
+                score = scores.get(entry.row)
+            else:
+                score = scores[entry.row] if 0 <= entry.row < len(scores) else None
+            if score is None:
+                print(f"Failed to apply edit: row {entry.row} out of range")
+                continue
+            if entry.key is not None and row_key(score) != entry.key:
+                print(f"Failed to apply edit: row {entry.row} no longer matches {entry.key}")
+                continue
+            score[entry.column] = entry.new
+            changed[entry.row] = score
+        return changed
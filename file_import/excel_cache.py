@@ -0,0 +1,239 @@
+"""
+ExcelFrameCache 模块
+
+按工作簿内容哈希和工作表名缓存 pd.read_excel 的解析结果，避免重复解析 xlsx 的 XML。
+主要功能包括：
+1. 以 Feather（列式存储）保存解析后的 DataFrame，无法无损列式存储时退回 pickle
+2. 缓存目录大小超过上限时按最近访问时间淘汰（LRU）
+3. 缓存工作簿的工作表名列表，"总表"不存在时无需重新打开文件即可回退到第一个工作表
+
+缓存不使用集中式索引文件：条目的大小和访问时间直接取自文件本身，多个进程同时读写也是安全的。
+"""
+
+import hashlib
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+
+import pandas as pd
+
+sys.path.append(os.getcwd())
+
+DEFAULT_CACHE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'cache', 'excel'))
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+_HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+
+class ExcelFrameCache:
+    """
+    ExcelFrameCache 类实现了基于内容哈希的工作表缓存。
+
+    属性:
+        cache_dir: 缓存目录
+        max_bytes: 缓存目录的大小上限（字节）
+    """
+
+    def __init__(self, cache_dir: str = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        初始化 ExcelFrameCache 对象。
+
+        :param cache_dir: 缓存目录，默认为 cache/excel
+        :param max_bytes: 缓存目录的大小上限（字节）
+        """
+        self.cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def content_hash(file_path: str) -> str:
+        """
+        计算文件内容的 SHA-256 哈希。
+
+        :param file_path: 文件路径
+        :return: 十六进制哈希字符串
+        """
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    @staticmethod
+    def _sheet_key(sheet_name) -> str:
+        # 工作表名可能包含文件名中不允许的字符，使用其哈希作为文件名的一部分
+        return hashlib.sha1(str(sheet_name).encode('utf-8')).hexdigest()[:16]
+
+    def _entry_path(self, file_hash: str, sheet_name, suffix: str) -> str:
+        return os.path.join(self.cache_dir, f"{file_hash}_{self._sheet_key(sheet_name)}{suffix}")
+
+    def _sheet_names_path(self, file_hash: str) -> str:
+        return os.path.join(self.cache_dir, f"{file_hash}.sheets.json")
+
+    @staticmethod
+    def _touch(path: str):
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+
+    def _atomic_write(self, path: str, writer):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        os.close(fd)
+        try:
+            writer(tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    @staticmethod
+    def _is_columnar_safe(df: pd.DataFrame) -> bool:
+        """
+        判断 DataFrame 能否无损地保存为 Feather。
+
+        Feather 要求默认索引和字符串列名；混合类型或含缺失值的 object 列在读回时会改变取值（如 NaN 变为 None），
+        这类数据改用 pickle 保存，以保证缓存命中和直接解析得到的结果完全一致。
+        """
+        if not _HAS_PYARROW:
+            return False
+        if not isinstance(df.index, pd.RangeIndex) or df.index.start != 0 or df.index.step != 1:
+            return False
+        if not all(isinstance(col, str) for col in df.columns) or df.columns.has_duplicates:
+            return False
+        for col in df.columns:
+            series = df[col]
+            if series.dtype == object and not series.map(type).eq(str).all():
+                return False
+        return True
+
+    def get(self, file_hash: str, sheet_name):
+        """
+        读取缓存的工作表。
+
+        :param file_hash: 工作簿内容哈希
+        :param sheet_name: 工作表名
+        :return: DataFrame，未命中时返回 None
+        """
+        for suffix, reader in (('.feather', pd.read_feather), ('.pkl', pd.read_pickle)):
+            path = self._entry_path(file_hash, sheet_name, suffix)
+            if os.path.exists(path):
+                try:
+                    df = reader(path)
+                except Exception as e:
+                    print(f"读取缓存 {path} 失败: {str(e)}")
+                    continue
+                self._touch(path)
+                return df
+        return None
+
+    def put(self, file_hash: str, sheet_name, df: pd.DataFrame):
+        """
+        写入工作表缓存，并在超过大小上限时淘汰最久未访问的条目。
+
+        :param file_hash: 工作簿内容哈希
+        :param sheet_name: 工作表名
+        :param df: 解析得到的 DataFrame
+        """
+        try:
+            if self._is_columnar_safe(df):
+                self._atomic_write(self._entry_path(file_hash, sheet_name, '.feather'), df.to_feather)
+            else:
+                self._atomic_write(self._entry_path(file_hash, sheet_name, '.pkl'), df.to_pickle)
+        except Exception as e:
+            print(f"写入缓存失败: {str(e)}")
+            return
+        self.evict()
+
+    def get_sheet_names(self, file_hash: str):
+        path = self._sheet_names_path(file_hash)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                sheet_names = json.load(f)
+        except (IOError, json.JSONDecodeError):
+            return None
+        self._touch(path)
+        return sheet_names
+
+    def put_sheet_names(self, file_hash: str, sheet_names):
+        def write(tmp_path):
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump([str(name) for name in sheet_names], f, ensure_ascii=False)
+
+        try:
+            self._atomic_write(self._sheet_names_path(file_hash), write)
+        except IOError as e:
+            print(f"写入缓存失败: {str(e)}")
+
+    def evict(self):
+        """
+        按最近访问时间淘汰缓存条目，直到缓存目录大小不超过上限。
+        """
+        try:
+            entries = []
+            with os.scandir(self.cache_dir) as it:
+                for entry in it:
+                    if entry.is_file() and not entry.name.endswith('.tmp'):
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+        except OSError:
+            return
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+    def read_sheet(self, file_path: str, sheet_name, fallback_to_first: bool = False, engine: str = None):
+        """
+        读取工作表，命中缓存时不再解析工作簿。
+
+        :param file_path: 工作簿路径
+        :param sheet_name: 工作表名
+        :param fallback_to_first: 工作表不存在时是否读取第一个工作表
+        :param engine: 缓存未命中时使用的解析引擎，默认由 pandas 选择
+        :return: (DataFrame, 实际读取的工作表名)
+        :raises ValueError: 工作表不存在且不回退时
+        """
+        file_hash = self.content_hash(file_path)
+
+        sheet_names = self.get_sheet_names(file_hash)
+        if sheet_names is not None:
+            resolved = resolve_sheet_name(sheet_names, sheet_name, fallback_to_first)
+            df = self.get(file_hash, resolved)
+            if df is not None:
+                return df, resolved
+
+        # 缓存未命中：只打开一次工作簿，同时取得工作表名列表和工作表内容
+        with pd.ExcelFile(file_path, engine=engine) as xl:
+            sheet_names = [str(name) for name in xl.sheet_names]
+            self.put_sheet_names(file_hash, sheet_names)
+            resolved = resolve_sheet_name(sheet_names, sheet_name, fallback_to_first)
+            df = xl.parse(resolved)
+
+        self.put(file_hash, resolved, df)
+        return df, resolved
+
+
+def resolve_sheet_name(sheet_names, sheet_name, fallback_to_first: bool = False):
+    """
+    确定实际读取的工作表名。
+
+    :param sheet_names: 工作簿中的工作表名列表
+    :param sheet_name: 期望读取的工作表名
+    :param fallback_to_first: 工作表不存在时是否回退到第一个工作表
+    :return: 实际读取的工作表名
+    :raises ValueError: 工作表不存在且不回退时
+    """
+    if sheet_name in sheet_names:
+        return sheet_name
+    if fallback_to_first and sheet_names:
+        return sheet_names[0]
+    raise ValueError(f"Worksheet named '{sheet_name}' not found")
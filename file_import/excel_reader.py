@@ -0,0 +1,257 @@
+"""
+ExcelReader 模块
+
+为成绩导入提供可选择引擎的 Excel 读取层。
+主要功能包括：
+1. 根据文件类型和大小自动选择解析引擎（calamine / xlrd / openpyxl / openpyxl 流式读取）
+2. 对大型 xlsx 文件以只读模式逐行读取，按块生成 DataFrame，峰值内存与文件大小无关
+3. 流式读取得到的每一块与 pd.read_excel 整表读取的取值和类型保持一致
+
+流式读取分两遍进行：第一遍统计每列的类型（是否全为数值、是否含缺失值、是否全为日期），
+第二遍按统计结果把每一块转换为整表读取时会得到的类型，避免不同块推断出不同的列类型。
+"""
+
+import datetime
+import importlib.util
+import os
+import sys
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+from pandas.io.parsers import TextParser
+
+sys.path.append(os.getcwd())
+
+STREAM_ENGINE = "openpyxl-stream"
+DEFAULT_CHUNK_SIZE = 5000
+DEFAULT_STREAM_THRESHOLD = 8 * 1024 * 1024
+
+
+def _pandas_supports_calamine() -> bool:
+    try:
+        major, minor = (int(part) for part in pd.__version__.split('.')[:2])
+    except ValueError:
+        return False
+    return (major, minor) >= (2, 2) and importlib.util.find_spec("python_calamine") is not None
+
+
+_HAS_CALAMINE = _pandas_supports_calamine()
+
+ColumnProfile = namedtuple('ColumnProfile', ['numeric', 'floating', 'datetime'])
+
+
+class ExcelReader:
+    """
+    ExcelReader 类负责选择引擎并读取工作表。
+
+    属性:
+        chunk_size: 流式读取时每块的行数
+        stream_threshold: xlsx 文件大小超过该值（字节）时使用流式读取
+    """
+
+    def __init__(self, chunk_size: int = DEFAULT_CHUNK_SIZE, stream_threshold: int = DEFAULT_STREAM_THRESHOLD):
+        """
+        初始化 ExcelReader 对象。
+
+        :param chunk_size: 流式读取时每块的行数
+        :param stream_threshold: 使用流式读取的文件大小阈值（字节）
+        """
+        self.chunk_size = chunk_size
+        self.stream_threshold = stream_threshold
+
+    def select_engine(self, file_path: str) -> str:
+        """
+        根据文件类型和大小选择解析引擎。
+
+        - 大型 xlsx：openpyxl 只读模式流式读取，内存占用有上限
+        - 已安装 python-calamine（pandas >= 2.2）：calamine，解析速度最快
+        - xls：xlrd（xls 为二进制格式，openpyxl 无法读取）
+        - 其他：openpyxl
+
+        :param file_path: 工作簿路径
+        :return: 引擎名称，流式读取时为 STREAM_ENGINE
+        """
+        ext = os.path.splitext(file_path)[1].lower()
+        if ext in ('.xlsx', '.xlsm') and os.path.getsize(file_path) >= self.stream_threshold:
+            return STREAM_ENGINE
+        if _HAS_CALAMINE:
+            return "calamine"
+        if ext == '.xls':
+            return "xlrd"
+        return "openpyxl"
+
+    @staticmethod
+    def sheet_names(file_path: str) -> list:
+        """
+        以只读模式读取工作表名列表，不解析工作表内容。
+        """
+        import openpyxl
+
+        workbook = openpyxl.load_workbook(file_path, read_only=True)
+        try:
+            return list(workbook.sheetnames)
+        finally:
+            workbook.close()
+
+    @staticmethod
+    def _convert_cell(cell):
+        # 与 pandas 的 openpyxl 读取器保持一致：空单元格为 ""，错误值为 NaN，整数值的浮点数转为 int
+        from openpyxl.cell.cell import TYPE_ERROR, TYPE_NUMERIC
+
+        if cell.value is None:
+            return ""
+        if cell.data_type == TYPE_ERROR:
+            return np.nan
+        if cell.data_type == TYPE_NUMERIC:
+            value = int(cell.value)
+            if value == cell.value:
+                return value
+            return float(cell.value)
+        return cell.value
+
+    def _iter_raw_rows(self, file_path: str, sheet_name):
+        """
+        逐行读取工作表，去除每行末尾的空单元格和工作表末尾的空行。
+        """
+        import openpyxl
+
+        workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            sheet = workbook[sheet_name]
+            blank_rows = 0
+            for row in sheet.rows:
+                converted = [self._convert_cell(cell) for cell in row]
+                while converted and converted[-1] == "":
+                    converted.pop()
+                if not converted:
+                    # 空行只有在后面还有数据时才输出
+                    blank_rows += 1
+                    continue
+                for _ in range(blank_rows):
+                    yield []
+                blank_rows = 0
+                yield converted
+        finally:
+            workbook.close()
+
+    def _iter_raw_chunks(self, file_path: str, sheet_name):
+        """
+        按块读取原始行，第一块之前先输出表头。
+
+        :return: 生成器，第一个元素为表头行，之后每个元素为一块数据行
+        """
+        rows = self._iter_raw_rows(file_path, sheet_name)
+        header = next(rows, None)
+        if header is None:
+            return
+        yield header
+
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    @staticmethod
+    def _parse_chunk(header: list, rows: list, width: int) -> pd.DataFrame:
+        def pad(row):
+            return row + [""] * (width - len(row))
+
+        parser = TextParser([pad(header)] + [pad(row) for row in rows], header=0, dtype=object,
+                            skip_blank_lines=False)
+        try:
+            return parser.read()
+        finally:
+            parser.close()
+
+    def _profile_columns(self, file_path: str, sheet_name):
+        """
+        第一遍读取：统计表格宽度和每列的类型。
+
+        :return: (表头行, 宽度, {列名: ColumnProfile})，工作表为空时返回 (None, 0, {})
+        """
+        chunks = self._iter_raw_chunks(file_path, sheet_name)
+        header = next(chunks, None)
+        if header is None:
+            return None, 0, {}
+
+        width = len(header)
+        stats = {}
+        first_chunk = True
+        for rows in chunks:
+            width = max(width, max((len(row) for row in rows), default=0))
+            df = self._parse_chunk(header, rows, width)
+            for col in df.columns:
+                series = df[col]
+                na_mask = series.isna()
+                # 比表头更宽的列可能在之后的块中才出现，之前的行在整表中为缺失值
+                numeric, floating, all_datetime = stats.get(col, (True, not first_chunk, True))
+                if numeric:
+                    converted = pd.to_numeric(series, errors='coerce')
+                    if (converted.isna() != na_mask).any():
+                        numeric = False
+                    elif na_mask.any() or converted.dtype.kind == 'f':
+                        floating = True
+                if all_datetime:
+                    all_datetime = series[~na_mask].map(lambda v: isinstance(v, datetime.datetime)).all()
+                stats[col] = (numeric, floating, bool(all_datetime))
+            first_chunk = False
+
+        if first_chunk:
+            # 只有表头：整表读取得到的空列为 object 类型
+            return header, width, {}
+        return header, width, {col: ColumnProfile(*values) for col, values in stats.items()}
+
+    @staticmethod
+    def _apply_profile(df: pd.DataFrame, profiles: dict) -> pd.DataFrame:
+        for col in df.columns:
+            profile = profiles.get(col)
+            if profile is None:
+                continue
+            if profile.numeric:
+                converted = pd.to_numeric(df[col])
+                df[col] = converted.astype('float64' if profile.floating else 'int64')
+            elif profile.datetime:
+                df[col] = pd.to_datetime(df[col])
+            elif df[col].dtype != object:
+                df[col] = df[col].astype(object)
+        return df
+
+    def iter_chunks(self, file_path: str, sheet_name):
+        """
+        流式读取工作表，按块生成 DataFrame。
+
+        :param file_path: 工作簿路径
+        :param sheet_name: 工作表名
+        :return: DataFrame 生成器，每块最多 chunk_size 行
+        """
+        header, width, profiles = self._profile_columns(file_path, sheet_name)
+        if header is None:
+            return
+
+        chunks = self._iter_raw_chunks(file_path, sheet_name)
+        next(chunks)
+        produced = False
+        for rows in chunks:
+            produced = True
+            yield self._apply_profile(self._parse_chunk(header, rows, width), profiles)
+        if not produced:
+            yield self._parse_chunk(header, [], width)
+
+    def read_sheet(self, file_path: str, sheet_name, engine: str = None) -> pd.DataFrame:
+        """
+        整表读取工作表。
+
+        :param file_path: 工作簿路径
+        :param sheet_name: 工作表名
+        :param engine: 解析引擎，默认自动选择；流式引擎会把各块拼接为整表
+        :return: DataFrame
+        """
+        engine = engine or self.select_engine(file_path)
+        if engine == STREAM_ENGINE:
+            return pd.concat(list(self.iter_chunks(file_path, sheet_name)), ignore_index=True)
+        return pd.read_excel(file_path, sheet_name=sheet_name, engine=engine)
@@ -0,0 +1,158 @@
+"""
+FilterIndex 模块
+
+成绩表格的列过滤索引，不依赖 PyQt6。
+主要功能包括：
+1. 为每列预先计算 取值 -> 行位集（按位压缩的 numpy 数组），第一次过滤该列时建立
+2. 一列的过滤结果为所选取值位集的并集（所选取值多于一半时改为未选取值的补集），多列过滤为各列结果的交集
+3. 单元格修改时只更新该单元格对应的位，并重新判断这一行是否通过过滤
+
+取值很多的列（如课程名）不建立位集，过滤时直接比较分类编码。
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.getcwd())
+
+# 不同取值多于此数的列不建立位集
+MAX_BITSET_VALUES = 1024
+
+
+def _set_bit(bitset: np.ndarray, row: int, value: bool):
+    # np.packbits 默认高位在前
+    mask = np.uint8(0x80 >> (row & 7))
+    if value:
+        bitset[row >> 3] |= mask
+    else:
+        bitset[row >> 3] &= ~mask
+
+
+class FilterIndex:
+    """
+    FilterIndex 类维护成绩表格各列的过滤条件和通过过滤的行。
+
+    属性:
+        table: 成绩表格（ScoreTable）
+        accepted: 每行是否通过全部过滤条件（bool 数组，按成绩表格的行号）
+    """
+
+    def __init__(self, table):
+        """
+        初始化 FilterIndex 对象，并监听成绩表格的单元格修改。
+
+        :param table: 成绩表格（ScoreTable）
+        """
+        self.table = table
+        self.accepted = np.ones(table.row_count, dtype=bool)
+        self._bitsets = {}
+        self._filters = {}
+        self._masks = {}
+        self._listeners = []
+        table.add_listener(self.on_cell_changed)
+
+    def add_listener(self, callback):
+        """
+        注册监听者，过滤条件改变（accepted 重新计算）后调用 callback()。
+        """
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _column_bitsets(self, column: int):
+        """
+        列的 取值编码 -> 行位集 列表，取值过多时返回 None。
+        """
+        if column not in self._bitsets:
+            column_data = self.table.columns[column]
+            if len(column_data.categories) > MAX_BITSET_VALUES:
+                self._bitsets[column] = None
+            else:
+                row_count = self.table.row_count
+                order = np.argsort(column_data.codes, kind='stable')
+                counts = np.bincount(column_data.codes, minlength=len(column_data.categories))
+                bitsets = []
+                for rows in np.split(order, np.cumsum(counts)[:-1]):
+                    bits = np.zeros(row_count, dtype=bool)
+                    bits[rows] = True
+                    bitsets.append(np.packbits(bits))
+                self._bitsets[column] = bitsets
+        return self._bitsets[column]
+
+    def _union(self, bitsets: list, codes: list) -> np.ndarray:
+        row_count = self.table.row_count
+        if not codes:
+            return np.zeros(row_count, dtype=bool)
+        packed = np.bitwise_or.reduce([bitsets[code] for code in codes])
+        return np.unpackbits(packed, count=row_count).astype(bool)
+
+    def _column_mask(self, column: int, values: set) -> np.ndarray:
+        column_data = self.table.columns[column]
+        selected = [code for code, text in enumerate(column_data.categories) if text in values]
+        bitsets = self._column_bitsets(column)
+        if bitsets is None:
+            return np.isin(column_data.codes, selected)
+        if len(selected) * 2 > len(bitsets):
+            selected_codes = set(selected)
+            return ~self._union(bitsets, [code for code in range(len(bitsets)) if code not in selected_codes])
+        return self._union(bitsets, selected)
+
+    def _combine(self):
+        accepted = np.ones(self.table.row_count, dtype=bool)
+        for mask in self._masks.values():
+            accepted &= mask
+        self.accepted = accepted
+        for callback in list(self._listeners):
+            callback()
+
+    def set_filter(self, column: int, values):
+        """
+        设置一列的过滤条件，只显示取值在 values 中的行；values 为空时不显示任何行。
+
+        :param column: 列号
+        :param values: 选中的取值（显示文本）
+        """
+        values = set(values)
+        self._filters[column] = values
+        self._masks[column] = self._column_mask(column, values)
+        self._combine()
+
+    def clear_filter(self, column: int):
+        """
+        取消一列的过滤条件。
+        """
+        self._filters.pop(column, None)
+        self._masks.pop(column, None)
+        self._combine()
+
+    def accepts(self, row: int) -> bool:
+        """
+        成绩表格的第 row 行是否通过全部过滤条件。
+        """
+        return bool(self.accepted[row])
+
+    def accepted_rows(self) -> np.ndarray:
+        return np.flatnonzero(self.accepted)
+
+    def on_cell_changed(self, row: int, column: int, old_text: str, new_text: str):
+        """
+        成绩表格单元格修改后，更新位集和这一行的过滤结果。
+        """
+        bitsets = self._bitsets.get(column)
+        if bitsets is not None:
+            column_data = self.table.columns[column]
+            if len(column_data.categories) > MAX_BITSET_VALUES:
+                self._bitsets[column] = None
+            else:
+                while len(bitsets) < len(column_data.categories):
+                    bitsets.append(np.zeros((self.table.row_count + 7) // 8, dtype=np.uint8))
+                _set_bit(bitsets[column_data.code_of(old_text)], row, False)
+                _set_bit(bitsets[column_data.code_of(new_text)], row, True)
+
+        if column in self._filters:
+            self._masks[column][row] = new_text in self._filters[column]
+            self.accepted[row] = all(mask[row] for mask in self._masks.values())
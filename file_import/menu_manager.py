@@ -1,9 +1,8 @@
-import os
-import json
 from PyQt6.QtWidgets import QMenu, QMessageBox
 from PyQt6.QtGui import QAction
 from .table_file_dealer import FileDealer
 from .action_creator import ActionCreator
+from .config_service import get_config_service
 
 class MenuManager:
     def __init__(self, parent):
@@ -11,19 +10,13 @@ class MenuManager:
         self.file_dealer = FileDealer(self.parent)
         self._actions = {}
         self._action_connections = {
-            'import': self.file_dealer.import_file
+            'import': self.file_dealer.import_file,
+            'batch_import': self.file_dealer.batch_import
         }
 
-        # 获取当前脚本的目录
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-
-        # 构建配置文件的绝对路径
-        actions_config_path = os.path.join(current_dir, '..', 'config', 'actions_config.json')
-        menu_config_path = os.path.join(current_dir, '..', 'config', 'menu_config.json')
-
         try:
-            self._action_config = self._load_config(actions_config_path)
-            self._menu_config = self._load_config(menu_config_path)
+            self._action_config = self._load_config('actions_config.json')
+            self._menu_config = self._load_config('menu_config.json')
         except FileNotFoundError as e:
             QMessageBox.critical(self.parent, "Error", f"配置文件未找到: {str(e)}")
             raise
@@ -31,13 +24,8 @@ class MenuManager:
         self._create_actions()
 
     def _load_config(self, filename):
-        try:
-            with open(filename, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            raise FileNotFoundError(f"无法找到配置文件: {filename}")
-        except json.JSONDecodeError:
-            raise ValueError(f"配置文件格式错误: {filename}")
+        # 文件不存在时抛出 FileNotFoundError，格式错误时抛出 ValueError
+        return get_config_service(filename).load(required=True)
 
     def _create_actions(self):
         for action_config in self._action_config['actions']:
@@ -0,0 +1,76 @@
+"""
+Preload 模块
+
+在后台线程中提前导入启动时延迟加载的重量级模块，不依赖 PyQt6 的界面对象。
+主要功能包括：
+1. 维护延迟导入的模块列表（pandas、成绩转换、成绩窗口、学位进度窗口等）
+2. 在守护线程中依次导入这些模块，进程内只启动一次
+3. 记录每个模块的导入耗时，供启动基准测试查看
+
+主窗口在用户开始输入学号时调用 start_preload()；之后第一次打开成绩窗口或导入文件时，
+函数内的 import 直接取到已加载的模块。预加载尚未完成时，Python 的模块导入锁保证
+界面线程等待同一模块导入完成，而不会重复导入。
+"""
+
+import importlib
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.getcwd())
+
+# 按依赖顺序排列，前面的模块导入后，后面的模块只需导入自身
+PRELOAD_MODULES = (
+    "numpy",
+    "pandas",
+    "file_import.excel_cache",
+    "file_import.score_converter",
+    "file_import.score_table",
+    "file_import.filter_index",
+    "my_window.StudentInfoWindow",
+    "degree_process.progress_model",
+    "my_window.DegreeProgressShow",
+)
+
+_preload_thread = None
+_preload_lock = threading.Lock()
+# 模块名 -> 导入耗时（秒），已在预加载之前导入的模块耗时为 0
+preload_timings = {}
+
+
+def preload_modules(modules=PRELOAD_MODULES) -> dict:
+    """
+    依次导入 modules，单个模块导入失败时跳过（第一次使用时会再次抛出同样的错误）。
+
+    :param modules: 模块名列表
+    :return: 模块名 -> 导入耗时（秒）
+    """
+    for name in modules:
+        start = time.perf_counter()
+        try:
+            importlib.import_module(name)
+        except Exception as e:
+            print(f"Preloading {name} failed: {str(e)}")
+            continue
+        preload_timings[name] = time.perf_counter() - start
+    return preload_timings
+
+
+def start_preload(modules=PRELOAD_MODULES) -> threading.Thread:
+    """
+    在守护线程中预加载模块，立即返回。重复调用时返回第一次启动的线程。
+
+    :param modules: 模块名列表
+    :return: 执行预加载的线程
+    """
+    global _preload_thread
+    with _preload_lock:
+        if _preload_thread is None:
+            _preload_thread = threading.Thread(target=preload_modules, args=(modules,), name="preload", daemon=True)
+            _preload_thread.start()
+        return _preload_thread
+
+
+def is_preloaded(modules=PRELOAD_MODULES) -> bool:
+    return all(name in sys.modules for name in modules)
@@ -0,0 +1,145 @@
+"""
+ScoreConverter 模块
+
+把教务成绩表（DataFrame）转换为 [学生信息, 成绩1, 成绩2, ...] 格式的学生记录。
+单个导入（FileDealer.import_file）和批量导入共用这里的列处理规则。
+"""
+
+import os
+import sys
+from itertools import repeat
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.getcwd())
+
+from file_import.excel_cache import ExcelFrameCache, resolve_sheet_name
+from file_import.excel_reader import STREAM_ENGINE, ExcelReader
+
+# 特殊处理的列
+SPECIAL_COLUMNS = ['总成绩', '学分', '学时', '绩点', '等级成绩']
+
+
+def convert_to_float_or_string(value):
+    if pd.isna(value):
+        return -1.0
+    if isinstance(value, str) and value.strip() == '合格':
+        return '合格'
+    try:
+        return float(value)
+    except ValueError:
+        return value  # 如果无法转换为float，则返回原始值
+
+
+def convert_special_column(series: pd.Series) -> list:
+    """
+    对整列执行 convert_to_float_or_string，结果与 series.apply(convert_to_float_or_string).tolist() 完全一致。
+
+    - 数值列：整列转为 float64，缺失值替换为 -1.0
+    - object / 字符串列：用 pd.factorize 对整列编码，每个不同取值只转换一次，再按编码批量取回结果，
+      缺失值的编码为 -1，对应 -1.0。成绩列的不同取值很少，转换次数与行数无关。
+      相等的取值（如 90、90.0 和 '合格'、'合格'）转换结果必然相同，因此按取值合并不会改变输出。
+      字符串不使用 pd.to_numeric，因为它与 float() 对 '1_000'、全角数字、'nan' 等写法的处理不同
+    - 其他类型（如日期）逐个单元格转换，保持原有行为
+
+    :param series: 特殊处理的列
+    :return: 转换后的取值列表
+    """
+    if series.dtype.kind in 'iufb':
+        values = series.to_numpy(dtype='float64', na_value=np.nan)
+        return np.where(np.isnan(values), -1.0, values).tolist()
+
+    if series.dtype != object and not pd.api.types.is_string_dtype(series.dtype):
+        return series.apply(convert_to_float_or_string).tolist()
+
+    codes, uniques = pd.factorize(series.to_numpy(dtype=object))
+    # 最后一个位置存放缺失值的结果，编码 -1 恰好取到它
+    lookup = np.empty(len(uniques) + 1, dtype=object)
+    lookup[:-1] = [convert_to_float_or_string(value) for value in uniques]
+    lookup[-1] = -1.0
+    return lookup[codes].tolist()
+
+
+def convert_score_frame(df: pd.DataFrame, from_scraper: bool = False) -> list:
+    """
+    按列处理规则转换成绩表。
+
+    :param df: 成绩表
+    :param from_scraper: 是否为爬虫生成的文件，爬虫文件直接按行输出原始数据
+    :return: 成绩字典列表
+    """
+    # 爬虫生成的文件不做转换，直接按行输出
+    if from_scraper:
+        return df.to_dict('records')
+
+    # 处理所有列
+    data = {}
+    for col in df.columns:
+        if col in SPECIAL_COLUMNS:
+            # 特殊处理这些列
+            data[col] = convert_special_column(df[col])
+        else:
+            # 其他列保持原样，但空值转为空字符串
+            data[col] = df[col].fillna('').astype(str).tolist()
+
+    # 整体按行组装字典，map 在 C 层循环，避免逐行执行 Python 代码
+    keys = list(data.keys())
+    return list(map(dict, map(zip, repeat(keys), zip(*data.values()))))
+
+
+def build_student_record(df: pd.DataFrame, name: str, student_id: str, from_scraper: bool = False) -> list:
+    """
+    生成学生记录，学生信息位于记录开头。
+
+    :param df: 成绩表
+    :param name: 姓名
+    :param student_id: 学号
+    :param from_scraper: 是否为爬虫生成的文件
+    :return: [学生信息, 成绩1, 成绩2, ...]
+    """
+    records = convert_score_frame(df, from_scraper=from_scraper)
+
+    # 创建用户信息字典
+    user_info = {
+        "姓名": name,
+        "学号": student_id
+    }
+
+    # 将用户信息添加到数据的开头
+    records.insert(0, user_info)
+    return records
+
+
+def read_student_record(file_path: str, name: str, student_id: str, sheet_name: str = '总表',
+                        fallback_to_first: bool = True, from_scraper: bool = False,
+                        cache: ExcelFrameCache = None, reader: ExcelReader = None):
+    """
+    读取成绩文件并生成学生记录。
+
+    普通文件经缓存整表读取；需要流式读取的大文件逐块读取、逐块转换，不保留整张 DataFrame。
+
+    :param file_path: 成绩文件路径
+    :param name: 姓名
+    :param student_id: 学号
+    :param sheet_name: 工作表名
+    :param fallback_to_first: 工作表不存在时是否读取第一个工作表
+    :param from_scraper: 是否为爬虫生成的文件
+    :param cache: 工作表缓存
+    :param reader: Excel 读取器
+    :return: (学生记录, 列名列表, 实际读取的工作表名)
+    """
+    cache = cache or ExcelFrameCache()
+    reader = reader or ExcelReader()
+
+    engine = reader.select_engine(file_path)
+    if engine != STREAM_ENGINE:
+        df, resolved = cache.read_sheet(file_path, sheet_name, fallback_to_first=fallback_to_first, engine=engine)
+        return build_student_record(df, name, student_id, from_scraper=from_scraper), list(df.columns), resolved
+
+    resolved = resolve_sheet_name(reader.sheet_names(file_path), sheet_name, fallback_to_first)
+    records, columns = [{"姓名": name, "学号": student_id}], []
+    for chunk in reader.iter_chunks(file_path, resolved):
+        columns = list(chunk.columns)
+        records.extend(convert_score_frame(chunk, from_scraper=from_scraper))
+    return records, columns, resolved
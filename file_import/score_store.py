@@ -0,0 +1,323 @@
+"""
+ScoreStore 模块
+
+基于 SQLite 的成绩存储后端，用于替代 data/{学号}.json 的"一个学生一个文件"布局。
+主要功能包括：
+1. 以 students / scores 两张表保存学生信息和成绩记录
+2. 按学号、课程号、学年学期建立索引，支持跨学生查询
+3. 一次性从现有 JSON 文件迁移数据
+4. 学生索引表（student_catalog）保存在同一个数据库中，保存、删除学生时在同一个事务中更新
+
+JSON 记录的格式为 [学生信息, 成绩1, 成绩2, ...]，存储后端的读写接口与之保持一致。
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+from contextlib import closing
+from typing import Dict, List, Optional, Union
+
+sys.path.append(os.getcwd())
+
+from file_import.config_service import get_config_service
+from file_import.student_catalog import CATALOG_SCHEMA, StudentCatalog, remove_entry, upsert_entry
+
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'data'))
+DEFAULT_DB_PATH = os.path.join(DATA_DIR, 'scores.db')
+
+# user_config.json 中用于选择存储后端的键，取值为 "json" 或 "sqlite"
+STORAGE_BACKEND_KEY = "score_storage_backend"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS students (
+    student_id   TEXT PRIMARY KEY,          -- 学号
+    name         TEXT NOT NULL,             -- 姓名
+    info         TEXT NOT NULL,             -- 完整的学生信息（JSON）
+    updated_at   REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS scores (
+    student_id   TEXT NOT NULL REFERENCES students(student_id) ON DELETE CASCADE,
+    seq          INTEGER NOT NULL,          -- 成绩在原记录中的顺序
+    course_no    TEXT,                      -- 课程号
+    course_name  TEXT,                      -- 课程名
+    term         TEXT,                      -- 学年学期
+    data         TEXT NOT NULL,             -- 完整的成绩行（JSON）
+    PRIMARY KEY (student_id, seq)
+);
+
+CREATE INDEX IF NOT EXISTS idx_scores_course_no ON scores(course_no);
+CREATE INDEX IF NOT EXISTS idx_scores_term ON scores(term);
+CREATE INDEX IF NOT EXISTS idx_scores_course_name ON scores(course_name);
+"""
+
+ScoreRecord = Dict[str, Union[Dict[str, str], List[Dict[str, Union[str, float]]]]]
+
+
+class ScoreStore:
+    """
+    ScoreStore 类封装了成绩数据库的读写操作。
+
+    每次操作都会打开独立的连接，因此同一个 ScoreStore 对象可以在多个线程中使用。
+
+    属性:
+        db_path: SQLite 数据库文件路径
+    """
+
+    def __init__(self, db_path: str = None):
+        """
+        初始化 ScoreStore 对象，必要时创建数据库文件和表结构。
+
+        :param db_path: 数据库文件路径，默认为 data/scores.db
+        """
+        self.db_path = db_path or DEFAULT_DB_PATH
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA + CATALOG_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    @staticmethod
+    def _score_row_params(student_id: str, seq: int, score: dict):
+        def text_or_none(value):
+            return None if value is None else str(value)
+
+        return (student_id, seq, text_or_none(score.get('课程号')), text_or_none(score.get('课程名')),
+                text_or_none(score.get('学年学期')), json.dumps(score, ensure_ascii=False))
+
+    def save_student(self, student_info: dict, scores: list) -> None:
+        """
+        保存（或覆盖）一个学生的全部成绩，并在同一个事务中更新学生索引。
+
+        :param student_info: 学生信息字典，必须包含 "姓名" 和 "学号"
+        :param scores: 成绩字典列表
+        """
+        student_id = str(student_info["学号"])
+        info = json.dumps(student_info, ensure_ascii=False)
+        score_rows = [self._score_row_params(student_id, seq, score) for seq, score in enumerate(scores)]
+        # 记录大小按学生信息和各成绩行序列化后的大小计算
+        size = len(info.encode('utf-8')) + sum(len(row[-1].encode('utf-8')) for row in score_rows)
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM scores WHERE student_id = ?", (student_id,))
+            conn.execute(
+                "INSERT OR REPLACE INTO students (student_id, name, info, updated_at) VALUES (?, ?, ?, ?)",
+                (student_id, str(student_info["姓名"]), info, time.time())
+            )
+            conn.executemany(
+                "INSERT INTO scores (student_id, seq, course_no, course_name, term, data) VALUES (?, ?, ?, ?, ?, ?)",
+                score_rows
+            )
+            upsert_entry(conn, student_id, student_info["姓名"], self.db_path, size, len(scores))
+
+    def save_record(self, record: list) -> None:
+        """
+        以 JSON 文件的格式 [学生信息, 成绩1, ...] 保存一个学生。
+
+        :param record: 学生记录列表
+        """
+        self.save_student(record[0], record[1:])
+
+    def load_student(self, student_id: str) -> Optional[ScoreRecord]:
+        """
+        读取一个学生的信息和成绩。
+
+        :param student_id: 学号
+        :return: {"student_info": ..., "scores": [...]}，学生不存在时返回 None
+        """
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT info FROM students WHERE student_id = ?", (str(student_id),)).fetchone()
+            if row is None:
+                return None
+            scores = [json.loads(data) for (data,) in conn.execute(
+                "SELECT data FROM scores WHERE student_id = ? ORDER BY seq", (str(student_id),))]
+        return {
+            "student_info": json.loads(row[0]),
+            "scores": scores
+        }
+
+    def load_scores_by_seq(self, student_id: str, seqs) -> Dict[int, dict]:
+        """
+        只读取指定行号的成绩。
+
+        :param student_id: 学号
+        :param seqs: 行号集合
+        :return: {行号: 成绩字典}
+        """
+        seqs = sorted(set(seqs))
+        result = {}
+        with closing(self._connect()) as conn:
+            # SQLite 对参数个数有上限，分批查询
+            for start in range(0, len(seqs), 500):
+                batch = seqs[start:start + 500]
+                placeholders = ", ".join("?" * len(batch))
+                for seq, data in conn.execute(
+                        f"SELECT seq, data FROM scores WHERE student_id = ? AND seq IN ({placeholders})",
+                        (str(student_id), *batch)):
+                    result[seq] = json.loads(data)
+        return result
+
+    def update_scores(self, student_id: str, changed_scores: dict) -> None:
+        """
+        只更新修改过的成绩行。
+
+        :param student_id: 学号
+        :param changed_scores: {行号: 修改后的成绩字典}
+        """
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(
+                "UPDATE scores SET course_no = ?, course_name = ?, term = ?, data = ? "
+                "WHERE student_id = ? AND seq = ?",
+                ((*self._score_row_params(str(student_id), seq, score)[2:], str(student_id), seq)
+                 for seq, score in changed_scores.items())
+            )
+            conn.execute("UPDATE students SET updated_at = ? WHERE student_id = ?", (time.time(), str(student_id)))
+
+    def has_student(self, student_id: str) -> bool:
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT 1 FROM students WHERE student_id = ?", (str(student_id),)).fetchone()
+        return row is not None
+
+    def delete_student(self, student_id: str) -> bool:
+        """
+        删除一个学生及其全部成绩，并在同一个事务中删除索引项。
+
+        :param student_id: 学号
+        :return: 是否删除了数据
+        """
+        with closing(self._connect()) as conn, conn:
+            cursor = conn.execute("DELETE FROM students WHERE student_id = ?", (str(student_id),))
+            remove_entry(conn, student_id)
+        return cursor.rowcount > 0
+
+    def list_students(self) -> List[Dict[str, str]]:
+        """
+        列出所有学生的学号和姓名。
+        """
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT student_id, name FROM students ORDER BY student_id").fetchall()
+        return [{"学号": student_id, "姓名": name} for student_id, name in rows]
+
+    def query_scores(self, course_no: str = None, term: str = None, course_name: str = None) -> List[dict]:
+        """
+        跨学生查询成绩，每条结果额外带有 "学号" 字段。
+
+        :param course_no: 课程号
+        :param term: 学年学期
+        :param course_name: 课程名
+        :return: 成绩字典列表
+        """
+        conditions, params = [], []
+        for column, value in (("course_no", course_no), ("term", term), ("course_name", course_name)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(str(value))
+        sql = "SELECT student_id, data FROM scores"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY student_id, seq"
+
+        results = []
+        with closing(self._connect()) as conn:
+            for student_id, data in conn.execute(sql, params):
+                score = json.loads(data)
+                score.setdefault("学号", student_id)
+                results.append(score)
+        return results
+
+    def migrate_from_json(self, data_dir: str = None) -> (int, List[str]):
+        """
+        将 data 目录下的 {学号}.json 文件一次性导入数据库。
+
+        :param data_dir: JSON 文件所在目录，默认为 data
+        :return: (成功迁移的学生数, 迁移失败的文件列表)
+        """
+        data_dir = data_dir or DATA_DIR
+        migrated, failed = 0, []
+        if not os.path.isdir(data_dir):
+            return migrated, failed
+
+        for file_name in sorted(os.listdir(data_dir)):
+            if not file_name.endswith('.json'):
+                continue
+            file_path = os.path.join(data_dir, file_name)
+            try:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    record = json.load(f)
+                if not isinstance(record, list) or len(record) < 2:
+                    raise ValueError("Invalid data structure")
+                if "姓名" not in record[0] or "学号" not in record[0]:
+                    raise ValueError("Missing student information")
+                self.save_record(record)
+                migrated += 1
+            except Exception as e:
+                print(f"迁移 {file_path} 失败: {str(e)}")
+                failed.append(file_path)
+
+        return migrated, failed
+
+
+def load_storage_backend() -> str:
+    """
+    从 user_config.json 中读取成绩存储后端的设置。
+
+    :return: "sqlite" 或 "json"
+    """
+    return get_config_service().get(STORAGE_BACKEND_KEY, "json")
+
+
+def save_storage_backend(backend: str) -> None:
+    config = get_config_service()
+    config.set(STORAGE_BACKEND_KEY, backend)
+    # 迁移脚本随后就会退出，立即写入
+    config.flush()
+
+
+def get_default_score_store() -> Optional[ScoreStore]:
+    """
+    根据配置返回默认的成绩存储对象。
+
+    :return: 配置为 sqlite 时返回 ScoreStore，否则返回 None（表示使用 JSON 文件）
+    """
+    if load_storage_backend() == "sqlite":
+        return ScoreStore()
+    return None
+
+
+def migrate_json_to_sqlite(data_dir: str = None, db_path: str = None, switch_backend: bool = True) -> (int, List[str]):
+    """
+    一次性迁移：把 JSON 成绩文件导入 SQLite，并在全部成功后切换默认存储后端，
+    同时按数据库重建学生索引，索引中的存储位置不再指向 JSON 文件。
+
+    :param data_dir: JSON 文件所在目录
+    :param db_path: 数据库文件路径
+    :param switch_backend: 迁移全部成功后是否把 user_config.json 切换为 sqlite
+    :return: (成功迁移的学生数, 迁移失败的文件列表)
+    """
+    store = ScoreStore(db_path)
+    migrated, failed = store.migrate_from_json(data_dir)
+    if switch_backend and not failed:
+        save_storage_backend("sqlite")
+    StudentCatalog(store.db_path).rebuild(score_store=store)
+    return migrated, failed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="将 data/*.json 成绩文件迁移到 SQLite 数据库")
+    parser.add_argument("--data-dir", default=None, help="JSON 文件所在目录，默认为 data")
+    parser.add_argument("--db", default=None, help="数据库文件路径，默认为 data/scores.db")
+    parser.add_argument("--keep-backend", action="store_true", help="迁移后不切换默认存储后端")
+    args = parser.parse_args()
+
+    count, failures = migrate_json_to_sqlite(args.data_dir, args.db, switch_backend=not args.keep_backend)
+    print(f"成功迁移 {count} 个学生")
+    if failures:
+        print("以下文件迁移失败：")
+        for failure in failures:
+            print(f"  {failure}")
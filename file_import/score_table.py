@@ -0,0 +1,393 @@
+"""
+ScoreTable 模块
+
+成绩表格的列式存储，不依赖 PyQt6，供学生信息窗口的表格模型使用。
+主要功能包括：
+1. 每列的文本以分类编码（codes + categories）保存，重复的取值（课程性质、学年学期、成绩等级等）只保存一次
+2. 数值列（学分、绩点、成绩等）另外保存为浮点数组，计算时不再反复把字符串转换为数字
+3. 单元格修改时只更新对应的编码和数值
+4. 按分类编码排序，不需要逐次比较字符串；每列的不同取值及其行数随修改增量更新
+5. 按列向量化计算加权绩点和加权分数，并在单元格修改、过滤条件改变时增量更新
+
+单元格的显示文本与原来的 str(score.get(header, "")) 完全一致。
+"""
+
+import math
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.getcwd())
+
+CREDIT_COLUMN = "学分"
+GPA_COLUMNS = ["GPA", "绩点"]
+SCORE_COLUMNS = ["总成绩", "学分成绩"]
+COURSE_TYPE_COLUMN = "课程性质"
+# 不参与加权计算的课程性质和成绩
+EXCLUDED_COURSE_TYPE = "校选"
+PASS_ONLY_SCORE = "合格"
+
+
+def to_float(text) -> float:
+    """
+    与原来的 float(value or 0) 一致：空字符串视为 0，无法转换时返回 NaN。
+    """
+    try:
+        return float(text or 0)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+class ScoreColumn:
+    """
+    ScoreColumn 类保存成绩表格的一列。
+
+    属性:
+        name: 列名
+        codes: 每行取值在 categories 中的编号（int32 数组）
+        categories: 不同的取值（字符串列表）
+        values: 数值列的浮点数组（无法转换的单元格为 NaN），文本列为 None
+    """
+
+    def __init__(self, name: str, texts: list):
+        """
+        初始化 ScoreColumn 对象。
+
+        :param name: 列名
+        :param texts: 每行的显示文本
+        """
+        self.name = name
+        codes, uniques = pd.factorize(pd.Series(texts, dtype=object), sort=False)
+        self.codes = codes.astype(np.int32)
+        self.categories = list(uniques)
+        self._ids = {text: code for code, text in enumerate(self.categories)}
+        # 每个取值出现的行数，单元格修改时增量更新
+        self.counts = np.bincount(self.codes, minlength=len(self.categories)).astype(np.int64)
+        # 按文本排序的取值编号，出现新的取值时重新排序
+        self._sorted_codes = None
+
+        # 每个取值对应的浮点数，出现新的取值时重新计算
+        self._category_values = np.array([to_float(text) for text in self.categories], dtype=np.float64)
+
+        # 一半以上的非空单元格可以转换为数字时视为数值列
+        category_values = self._category_values
+        non_empty = np.array([text != "" for text in self.categories], dtype=bool)
+        numeric_rows = self.counts[non_empty & ~np.isnan(category_values)].sum()
+        if numeric_rows * 2 >= self.counts[non_empty].sum() and numeric_rows > 0:
+            self.values = category_values[self.codes] if len(self.codes) else np.zeros(0, dtype=np.float64)
+        else:
+            self.values = None
+
+    def __len__(self):
+        return len(self.codes)
+
+    @property
+    def is_numeric(self) -> bool:
+        return self.values is not None
+
+    def text(self, row: int) -> str:
+        return self.categories[self.codes[row]]
+
+    def code_of(self, text: str) -> int:
+        """
+        取值的编号，不存在时返回 -1。
+        """
+        return self._ids.get(text, -1)
+
+    def category_values(self) -> np.ndarray:
+        """
+        每个取值对应的浮点数（无法转换的取值为 NaN），按取值编号排列。
+        """
+        if self._category_values is None:
+            self._category_values = np.array([to_float(text) for text in self.categories], dtype=np.float64)
+        return self._category_values
+
+    def floats(self, rows=None) -> np.ndarray:
+        """
+        浮点数组；文本列（如成绩中含"合格"）按取值编号查表，只转换所需的行。
+
+        :param rows: 行号数组，None 表示整列
+        """
+        if self.values is not None:
+            return self.values if rows is None else self.values[rows]
+        codes = self.codes if rows is None else self.codes[rows]
+        return self.category_values()[codes] if len(codes) else np.zeros(0, dtype=np.float64)
+
+    def set(self, row: int, text: str) -> str:
+        """
+        修改一个单元格。
+
+        :return: 修改前的文本
+        """
+        old_code = self.codes[row]
+        old_text = self.categories[old_code]
+        code = self._ids.get(text)
+        if code is None:
+            code = len(self.categories)
+            self.categories.append(text)
+            self._ids[text] = code
+            self.counts = np.append(self.counts, 0)
+            self._sorted_codes = None
+            self._category_values = None
+        self.codes[row] = code
+        self.counts[old_code] -= 1
+        self.counts[code] += 1
+        if self.values is not None:
+            self.values[row] = to_float(text)
+        return old_text
+
+    def sorted_codes(self) -> np.ndarray:
+        """
+        按文本排序的取值编号（包括已不再出现的取值）。
+        """
+        if self._sorted_codes is None:
+            self._sorted_codes = np.array(sorted(range(len(self.categories)), key=self.categories.__getitem__),
+                                          dtype=np.int64)
+        return self._sorted_codes
+
+    def value_counts(self):
+        """
+        当前出现的不同取值及其行数，按文本排序。
+
+        :return: (取值列表, 行数列表)
+        """
+        codes = self.sorted_codes()
+        codes = codes[self.counts[codes] > 0]
+        return [self.categories[code] for code in codes], self.counts[codes].tolist()
+
+
+class ScoreTable:
+    """
+    ScoreTable 类以列的形式保存一个成绩表格。
+
+    属性:
+        headers: 列名列表
+        columns: ScoreColumn 列表，与 headers 一一对应
+    """
+
+    def __init__(self, scores: list, headers: list = None):
+        """
+        初始化 ScoreTable 对象。
+
+        :param scores: 成绩字典列表
+        :param headers: 列名，默认为第一条成绩的键
+        """
+        if headers is None:
+            headers = list(scores[0].keys()) if scores else []
+        self.headers = list(headers)
+        self.row_count = len(scores)
+        self.columns = [ScoreColumn(header, [str(score.get(header, "")) for score in scores])
+                        for header in self.headers]
+        self._listeners = []
+
+    @property
+    def column_count(self) -> int:
+        return len(self.headers)
+
+    def column_index(self, name: str) -> int:
+        """
+        列名对应的列号，不存在时返回 -1。
+        """
+        return self.headers.index(name) if name in self.headers else -1
+
+    def last_column_index(self, names) -> int:
+        """
+        候选列名中最后出现的列的列号（与原来逐列扫描的结果一致），不存在时返回 -1。
+        """
+        index = -1
+        for column, header in enumerate(self.headers):
+            if header in names:
+                index = column
+        return index
+
+    def text(self, row: int, column: int) -> str:
+        return self.columns[column].text(row)
+
+    def add_listener(self, callback):
+        """
+        注册监听者，单元格修改后以 (行号, 列号, 旧文本, 新文本) 调用 callback。
+        """
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def set_text(self, row: int, column: int, text: str) -> str:
+        """
+        修改一个单元格，并通知监听者。
+
+        :return: 修改前的文本
+        """
+        old_text = self.columns[column].set(row, text)
+        if old_text != text:
+            for callback in list(self._listeners):
+                callback(row, column, old_text, text)
+        return old_text
+
+    def sorted_rows(self, column: int, descending: bool = False) -> np.ndarray:
+        """
+        按列的显示文本排序后的行号（稳定排序，与按字符串比较的结果一致）。
+
+        只需对不同的取值排序一次，再按编码对行排序。
+        """
+        column_data = self.columns[column]
+        ranks = np.empty(len(column_data.categories), dtype=np.int64)
+        ranks[column_data.sorted_codes()] = np.arange(len(column_data.categories))
+        keys = ranks[column_data.codes]
+        return np.argsort(-keys if descending else keys, kind='stable')
+
+    def distinct_values(self, column: int) -> list:
+        """
+        列中当前出现的不同取值，已排序。
+        """
+        return self.columns[column].value_counts()[0]
+
+    def value_counts(self, column: int):
+        """
+        列中当前出现的不同取值及其行数，按文本排序，不需要遍历表格。
+
+        :return: (取值列表, 行数列表)
+        """
+        return self.columns[column].value_counts()
+
+    def row_contributions(self, rows=None):
+        """
+        每行对加权绩点和加权分数的贡献。
+
+        规则与原来逐行计算一致：跳过课程性质为"校选"和成绩为"合格"的课程；
+        成绩无法转换为数字的课程不计入；绩点无法转换为数字时只不计入绩点；没有成绩列时不计入学分。
+
+        :param rows: 行号数组，None 表示全部行
+        :return: 形状为 (行数, 3) 的数组，各列为 学分、学分×绩点、学分×成绩；没有学分列时返回 None
+        """
+        credit_index = self.column_index(CREDIT_COLUMN)
+        if credit_index == -1:
+            return None
+        gpa_index = self.last_column_index(GPA_COLUMNS)
+        score_index = self.last_column_index(SCORE_COLUMNS)
+        course_type_index = self.column_index(COURSE_TYPE_COLUMN)
+
+        rows = np.arange(self.row_count) if rows is None else np.asarray(rows, dtype=np.int64)
+        contributions = np.zeros((len(rows), 3), dtype=np.float64)
+        if score_index == -1:
+            return contributions
+
+        included = np.ones(len(rows), dtype=bool)
+        if course_type_index != -1:
+            column = self.columns[course_type_index]
+            included &= column.codes[rows] != column.code_of(EXCLUDED_COURSE_TYPE)
+
+        credits = np.nan_to_num(self.columns[credit_index].floats(rows))
+        column = self.columns[score_index]
+        scores = column.floats(rows)
+        included &= (column.codes[rows] != column.code_of(PASS_ONLY_SCORE)) & ~np.isnan(scores)
+        contributions[included, 0] = credits[included]
+        contributions[included, 2] = scores[included] * credits[included]
+
+        if gpa_index != -1:
+            gpas = self.columns[gpa_index].floats(rows)
+            valid = included & ~np.isnan(gpas)
+            contributions[valid, 1] = gpas[valid] * credits[valid]
+        return contributions
+
+    def weighted_totals(self, rows=None):
+        """
+        计算加权绩点和加权分数的累计量，规则见 row_contributions。
+
+        :param rows: 参与计算的行号数组，None 表示全部行
+        :return: (学分合计, 学分×绩点合计, 学分×成绩合计)，没有学分列时返回 None
+        """
+        contributions = self.row_contributions(rows)
+        if contributions is None:
+            return None
+        total_credits, total_gpa_points, total_score_points = contributions.sum(axis=0)
+        return float(total_credits), float(total_gpa_points), float(total_score_points)
+
+
+class WeightedAggregates:
+    """
+    WeightedAggregates 类维护当前显示的行的加权绩点和加权分数累计量（Σ学分、Σ学分×绩点、Σ学分×成绩）。
+
+    单元格修改时只重新计算这一行的贡献，过滤条件改变时只加减显示状态改变的行，
+    不再在每次修改或过滤后遍历整个表格。
+
+    需要在 FilterIndex 之后创建，使单元格修改时过滤结果已经更新。
+
+    属性:
+        table: 成绩表格（ScoreTable）
+        filter_index: 过滤索引，None 表示显示全部行
+    """
+
+    # 学分合计的绝对值小于此值时视为 0，避免反复加减后的舍入误差
+    EPSILON = 1e-9
+
+    def __init__(self, table: ScoreTable, filter_index=None):
+        """
+        初始化 WeightedAggregates 对象，并监听单元格修改和过滤条件改变。
+
+        :param table: 成绩表格
+        :param filter_index: 过滤索引
+        """
+        self.table = table
+        self.filter_index = filter_index
+        self._relevant_columns = {table.column_index(CREDIT_COLUMN), table.last_column_index(GPA_COLUMNS),
+                                  table.last_column_index(SCORE_COLUMNS), table.column_index(COURSE_TYPE_COLUMN)}
+        self._contributions = table.row_contributions()
+        self.recompute()
+        table.add_listener(self.on_cell_changed)
+        if filter_index is not None:
+            filter_index.add_listener(self.on_filter_changed)
+
+    def _current_visible(self) -> np.ndarray:
+        if self.filter_index is None:
+            return np.ones(self.table.row_count, dtype=bool)
+        return self.filter_index.accepted
+
+    def recompute(self):
+        """
+        按当前显示的行重新计算累计量。
+        """
+        self._visible = self._current_visible().copy()
+        if self._contributions is not None:
+            self._totals = self._contributions[self._visible].sum(axis=0)
+
+    def totals(self):
+        """
+        :return: (学分合计, 学分×绩点合计, 学分×成绩合计)，没有学分列时返回 None
+        """
+        if self._contributions is None:
+            return None
+        total_credits, total_gpa_points, total_score_points = (float(value) for value in self._totals)
+        if abs(total_credits) < self.EPSILON:
+            total_credits = 0.0
+        return total_credits, total_gpa_points, total_score_points
+
+    def on_cell_changed(self, row: int, column: int, old_text: str, new_text: str):
+        if self._contributions is None:
+            return
+        visible = bool(self._current_visible()[row])
+        if column not in self._relevant_columns and visible == self._visible[row]:
+            return
+
+        if self._visible[row]:
+            self._totals -= self._contributions[row]
+        if column in self._relevant_columns:
+            self._contributions[row] = self.table.row_contributions([row])[0]
+        if visible:
+            self._totals += self._contributions[row]
+        self._visible[row] = visible
+
+    def on_filter_changed(self):
+        if self._contributions is None:
+            return
+        visible = self._current_visible()
+        changed = np.flatnonzero(visible != self._visible)
+        if len(changed) == 0:
+            return
+        shown = changed[visible[changed]]
+        hidden = changed[~visible[changed]]
+        self._totals += self._contributions[shown].sum(axis=0) - self._contributions[hidden].sum(axis=0)
+        self._visible[changed] = visible[changed]
@@ -0,0 +1,294 @@
+"""
+StudentCatalog 模块
+
+所有已导入学生的索引，记录学号、姓名、存储位置、最近导入时间和记录大小。
+主要功能包括：
+1. SQLite 后端的索引表与成绩保存在同一个数据库（data/scores.db）中，ScoreStore 在保存、删除成绩的同一个事务中更新索引
+2. JSON 后端的索引保存在 data/catalog.db 中，学生文件写入（os.replace）或删除成功之后才更新索引
+3. 不打开单个学生文件即可判断学生是否存在、按学号或姓名列出和搜索学生
+4. 记录索引对应的存储后端，索引不存在或存储后端改变时从 data 目录（或成绩数据库）重建
+
+索引只是已保存数据的摘要，随时可以删除后用 rebuild 重建；JSON 后端在写入文件后、更新索引前中断时，
+重建同样可以修复索引。
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+from contextlib import closing
+from typing import Dict, List, Optional
+
+sys.path.append(os.getcwd())
+
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'data'))
+DEFAULT_CATALOG_PATH = os.path.join(DATA_DIR, 'catalog.db')
+
+CATALOG_SCHEMA = """
+CREATE TABLE IF NOT EXISTS catalog (
+    student_id   TEXT PRIMARY KEY,          -- 学号
+    name         TEXT NOT NULL,             -- 姓名
+    location     TEXT NOT NULL,             -- 存储位置（JSON 文件路径或成绩数据库路径）
+    imported_at  REAL NOT NULL,             -- 最近导入时间
+    size         INTEGER NOT NULL,          -- 记录大小（字节）
+    score_count  INTEGER NOT NULL           -- 成绩条数
+);
+
+CREATE INDEX IF NOT EXISTS idx_catalog_name ON catalog(name);
+
+CREATE TABLE IF NOT EXISTS catalog_meta (
+    key          TEXT PRIMARY KEY,
+    value        TEXT NOT NULL
+);
+"""
+
+_COLUMNS = ("student_id", "name", "location", "imported_at", "size", "score_count")
+_UPSERT_SQL = ("INSERT OR REPLACE INTO catalog (student_id, name, location, imported_at, size, score_count) "
+               "VALUES (?, ?, ?, ?, ?, ?)")
+# catalog_meta 中记录索引对应的存储后端的键
+SOURCE_KEY = "source"
+
+
+def catalog_source(score_store=None, data_dir: str = None) -> str:
+    """
+    索引对应的存储后端的标识，如 "sqlite:/.../data/scores.db" 或 "json:/.../data"。
+    """
+    if score_store is not None:
+        return f"sqlite:{os.path.abspath(score_store.db_path)}"
+    return f"json:{os.path.abspath(data_dir or DATA_DIR)}"
+
+
+def upsert_entry(conn: sqlite3.Connection, student_id, name, location: str, size: int, score_count: int,
+                 imported_at: float = None) -> None:
+    """
+    在调用者的事务中新增或覆盖一个学生的索引项（ScoreStore 保存成绩时使用）。
+    """
+    conn.execute(_UPSERT_SQL, (str(student_id), str(name), location, imported_at or time.time(), int(size),
+                               int(score_count)))
+
+
+def remove_entry(conn: sqlite3.Connection, student_id) -> int:
+    """
+    在调用者的事务中删除一个学生的索引项。
+
+    :return: 删除的行数
+    """
+    return conn.execute("DELETE FROM catalog WHERE student_id = ?", (str(student_id),)).rowcount
+
+
+class StudentCatalog:
+    """
+    StudentCatalog 类封装了学生索引的读写操作。
+
+    与 ScoreStore 相同，每次操作都会打开独立的连接，可以在多个线程中使用。
+
+    属性:
+        db_path: 索引数据库文件路径
+    """
+
+    def __init__(self, db_path: str = None):
+        """
+        初始化 StudentCatalog 对象，必要时创建索引数据库。
+
+        :param db_path: 索引数据库文件路径，默认为 data/catalog.db；SQLite 后端使用成绩数据库的路径
+        """
+        self.db_path = db_path or DEFAULT_CATALOG_PATH
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(CATALOG_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    @staticmethod
+    def _row_to_dict(row) -> Dict[str, object]:
+        return dict(zip(_COLUMNS, row))
+
+    def upsert(self, student_id: str, name: str, location: str, size: int, score_count: int,
+               imported_at: float = None) -> None:
+        """
+        新增或覆盖一个学生的索引项。
+
+        :param student_id: 学号
+        :param name: 姓名
+        :param location: 存储位置
+        :param size: 记录大小（字节）
+        :param score_count: 成绩条数
+        :param imported_at: 导入时间，默认为当前时间
+        """
+        with closing(self._connect()) as conn, conn:
+            upsert_entry(conn, student_id, name, location, size, score_count, imported_at)
+
+    def record_saved(self, record: list, location: str, size: int = None) -> None:
+        """
+        根据 [学生信息, 成绩1, ...] 格式的记录更新索引。
+
+        :param record: 学生记录列表
+        :param location: 存储位置
+        :param size: 记录大小（字节），默认为记录序列化后的大小
+        """
+        if size is None:
+            size = len(json.dumps(record, ensure_ascii=False).encode('utf-8'))
+        self.upsert(record[0]["学号"], record[0]["姓名"], location, size, len(record) - 1)
+
+    def update_size(self, student_id: str, size: int) -> None:
+        """
+        修改成绩后更新记录大小，不改变导入时间。
+        """
+        with closing(self._connect()) as conn, conn:
+            conn.execute("UPDATE catalog SET size = ? WHERE student_id = ?", (int(size), str(student_id)))
+
+    def remove(self, student_id: str) -> bool:
+        """
+        删除一个学生的索引项。
+
+        :param student_id: 学号
+        :return: 是否删除了索引项
+        """
+        with closing(self._connect()) as conn, conn:
+            return remove_entry(conn, student_id) > 0
+
+    def exists(self, student_id: str) -> bool:
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT 1 FROM catalog WHERE student_id = ?", (str(student_id),)).fetchone()
+        return row is not None
+
+    def get(self, student_id: str) -> Optional[Dict[str, object]]:
+        """
+        读取一个学生的索引项，不存在时返回 None。
+        """
+        with closing(self._connect()) as conn:
+            row = conn.execute(f"SELECT {', '.join(_COLUMNS)} FROM catalog WHERE student_id = ?",
+                               (str(student_id),)).fetchone()
+        return None if row is None else self._row_to_dict(row)
+
+    def source(self) -> Optional[str]:
+        """
+        索引对应的存储后端（见 catalog_source），没有记录时返回 None。
+        """
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT value FROM catalog_meta WHERE key = ?", (SOURCE_KEY,)).fetchone()
+        return None if row is None else row[0]
+
+    def count(self) -> int:
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT COUNT(*) FROM catalog").fetchone()[0]
+
+    def list_students(self, offset: int = 0, limit: int = None) -> List[Dict[str, object]]:
+        """
+        按学号顺序分页列出学生。
+
+        :param offset: 起始位置
+        :param limit: 最多返回的条数，None 表示全部
+        """
+        with closing(self._connect()) as conn:
+            rows = conn.execute(f"SELECT {', '.join(_COLUMNS)} FROM catalog ORDER BY student_id LIMIT ? OFFSET ?",
+                                (-1 if limit is None else int(limit), int(offset))).fetchall()
+        return [self._row_to_dict(row) for row in rows]
+
+    def search(self, text: str, limit: int = 100) -> List[Dict[str, object]]:
+        """
+        按学号前缀或姓名搜索学生。学号前缀和姓名前缀的匹配可以使用索引，姓名中间的匹配需要扫描索引表。
+
+        :param text: 搜索文本
+        :param limit: 最多返回的条数
+        """
+        text = str(text).strip()
+        if not text:
+            return self.list_students(limit=limit)
+        # 转义 LIKE 的通配符
+        escaped = text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM catalog "
+                "WHERE student_id LIKE ? ESCAPE '\\' OR name LIKE ? ESCAPE '\\' "
+                "ORDER BY (student_id = ?) DESC, (name = ?) DESC, student_id LIMIT ?",
+                (escaped + '%', '%' + escaped + '%', text, text, int(limit))
+            ).fetchall()
+        return [self._row_to_dict(row) for row in rows]
+
+    def rebuild(self, data_dir: str = None, score_store=None) -> int:
+        """
+        清空索引并从已有数据重建，同时记录索引对应的存储后端。
+
+        :param data_dir: JSON 文件所在目录，默认为 data
+        :param score_store: 成绩存储后端，不为 None 时从数据库读取学生列表
+        :return: 索引中的学生数
+        """
+        entries = []
+        if score_store is not None:
+            for student in score_store.list_students():
+                record = score_store.load_student(student["学号"])
+                scores = record["scores"] if record else []
+                size = len(json.dumps(record, ensure_ascii=False).encode('utf-8')) if record else 0
+                entries.append((student["学号"], student["姓名"], score_store.db_path, time.time(), size,
+                                len(scores)))
+        else:
+            data_dir = data_dir or DATA_DIR
+            if os.path.isdir(data_dir):
+                with os.scandir(data_dir) as it:
+                    for entry in it:
+                        # 只索引 {学号}.json，跳过修改日志等其他文件
+                        student_id, ext = os.path.splitext(entry.name)
+                        if ext != '.json' or not student_id.isdigit():
+                            continue
+                        try:
+                            with open(entry.path, 'r', encoding='utf-8') as f:
+                                record = json.load(f)
+                            stat = entry.stat()
+                            entries.append((str(record[0]["学号"]), str(record[0]["姓名"]), entry.path,
+                                            stat.st_mtime, stat.st_size, len(record) - 1))
+                        except Exception as e:
+                            print(f"索引 {entry.path} 失败: {str(e)}")
+
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM catalog")
+            conn.executemany(_UPSERT_SQL, entries)
+            conn.execute("INSERT OR REPLACE INTO catalog_meta (key, value) VALUES (?, ?)",
+                         (SOURCE_KEY, catalog_source(score_store, data_dir)))
+        return len(entries)
+
+
+_default_catalogs = {}
+
+
+def get_default_catalog(score_store=None) -> StudentCatalog:
+    """
+    返回存储后端对应的学生索引：SQLite 后端为成绩数据库中的索引表，JSON 后端为 data/catalog.db。
+    索引是新建的，或者上次重建时对应的是其他存储后端（如迁移、切换后端之前建立的索引）时，从已有数据重建。
+
+    :param score_store: 成绩存储后端，None 表示使用 data/{学号}.json
+    """
+    key = None if score_store is None else score_store.db_path
+    catalog = _default_catalogs.get(key)
+    if catalog is None:
+        catalog = StudentCatalog(score_store.db_path if score_store is not None else None)
+        _default_catalogs[key] = catalog
+    if catalog.source() != catalog_source(score_store):
+        catalog.rebuild(score_store=score_store)
+    return catalog
+
+
+if __name__ == "__main__":
+    from file_import.score_store import get_default_score_store
+
+    parser = argparse.ArgumentParser(description="学生索引")
+    parser.add_argument("--rebuild", action="store_true", help="从已有数据重建索引")
+    parser.add_argument("--search", default=None, help="按学号前缀或姓名搜索")
+    parser.add_argument("--limit", type=int, default=50, help="最多显示的条数")
+    args = parser.parse_args()
+
+    default_store = get_default_score_store()
+    student_catalog = get_default_catalog(default_store)
+    if args.rebuild:
+        print(f"已索引 {student_catalog.rebuild(score_store=default_store)} 个学生")
+
+    results = student_catalog.search(args.search, args.limit) if args.search is not None \
+        else student_catalog.list_students(limit=args.limit)
+    for item in results:
+        print(f"{item['student_id']}  {item['name']}  {item['score_count']} 条成绩  "
+              f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(item['imported_at']))}  {item['location']}")
+    print(f"共 {student_catalog.count()} 个学生")
@@ -1,17 +1,52 @@
 import json
 import sys
 import os
+import tempfile
+import threading
 from typing import Dict, Union, List
 
 sys.path.append(os.getcwd())
 
+from file_import.edit_journal import EditJournal, row_key
+from file_import.score_store import ScoreStore, get_default_score_store
+from file_import.student_catalog import StudentCatalog, get_default_catalog
+
+# 每个学生的日志合并串行执行，避免两次保存同时合并同一份日志
+_compaction_locks = {}
+_compaction_locks_guard = threading.Lock()
+
+
+def _compaction_lock(student_id) -> threading.Lock:
+    with _compaction_locks_guard:
+        return _compaction_locks.setdefault(str(student_id), threading.Lock())
+
 
 class StudentScoreAnalyzer():
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, score_store: ScoreStore = None, catalog: StudentCatalog = None):
         self.parent = parent
         self.score_data = None
+        # 未指定存储后端时按 user_config.json 的配置选择，None 表示使用 data/{学号}.json
+        self.score_store = score_store if score_store is not None else get_default_score_store()
+        # 学生索引，导入、覆盖、删除时同步更新
+        self.catalog = catalog if catalog is not None else get_default_catalog(self.score_store)
+        # 加载时从修改日志中恢复的修改数（上次未保存或合并未完成的修改）
+        self.recovered_edits = 0
 
     def load_score_data(self, student_id: str) -> Dict[str, Union[Dict[str, str], List[Dict[str, Union[str, float]]]]]:
+        score_data = self._load_score_data(student_id)
+        if score_data is not None:
+            # 重新应用尚未合并进主记录的修改
+            entries = EditJournal(student_id).pending_entries()
+            if entries:
+                EditJournal.apply(score_data["scores"], entries)
+                self.recovered_edits = len(entries)
+                print(f"Recovered {len(entries)} journaled edits for {student_id}")
+        return score_data
+
+    def _load_score_data(self, student_id: str):
+        if self.score_store is not None:
+            return self._load_score_data_from_store(student_id)
+
         data_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'data'))
         file_path = os.path.join(data_dir, f"{student_id}.json")
 
@@ -51,11 +86,40 @@ class StudentScoreAnalyzer():
             print(f"An error occurred while loading data: {str(e)}")
             return None
 
+    def _load_score_data_from_store(self, student_id: str):
+        try:
+            score_data = self.score_store.load_student(student_id)
+            if score_data is None:
+                print(f"Student not found in database: {student_id}")
+                return None
+            if not score_data["scores"]:
+                raise ValueError("Invalid data structure")
+
+            self.score_data = score_data
+            return self.score_data
+
+        except ValueError as e:
+            print(f"Data validation error: {str(e)}")
+            return None
+        except Exception as e:
+            print(f"An error occurred while loading data: {str(e)}")
+            return None
+
     import os
     import json
     from typing import Dict, Union, List
 
     def save_score_data(self, score_data, student_id) -> bool:
+        if self.score_store is not None:
+            try:
+                # 学生索引与成绩在同一个事务中更新
+                self.score_store.save_student(self.score_data["student_info"], self.score_data["scores"])
+                print(f"Data successfully saved to {self.score_store.db_path}")
+                return True
+            except Exception as e:
+                print(f"An error occurred while saving data: {str(e)}")
+                return False
+
         data_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'data'))
         file_path = os.path.join(data_dir, f"{student_id}.json")
 
@@ -66,9 +130,9 @@ class StudentScoreAnalyzer():
             # 确保目录存在
             os.makedirs(os.path.dirname(file_path), exist_ok=True)
 
-            # 写入文件
-            with open(file_path, 'w', encoding='utf-8') as file:
-                json.dump(data_to_save, file, ensure_ascii=False, indent=4)
+            # 原子地写入文件，写入成功后再更新索引
+            self._write_json(file_path, data_to_save)
+            self.catalog.record_saved(data_to_save, file_path, os.path.getsize(file_path))
 
             print(f"Data successfully saved to {file_path}")
             return True
@@ -76,3 +140,134 @@ class StudentScoreAnalyzer():
         except Exception as e:
             print(f"An error occurred while saving data: {str(e)}")
             return False
+
+    def save_student_record(self, record: list) -> str:
+        """
+        保存 [学生信息, 成绩1, 成绩2, ...] 格式的学生记录（如新导入的成绩），返回保存位置。
+        旧记录的修改日志对新导入的成绩不再适用，先删除，否则下次加载时会覆盖新导入的成绩。
+        SQLite 后端的索引与成绩在同一个事务中更新；JSON 后端在文件替换成功后才更新索引，
+        两步之间中断时重建索引即可修复
+        """
+        self.discard_all_edits(record[0]['学号'])
+        if self.score_store is not None:
+            self.score_store.save_record(record)
+            return self.score_store.db_path
+
+        data_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'data'))
+        file_path = os.path.join(data_dir, f"{record[0]['学号']}.json")
+
+        # 确保目录存在
+        os.makedirs(data_dir, exist_ok=True)
+
+        self._write_json(file_path, record)
+        self.catalog.record_saved(record, file_path, os.path.getsize(file_path))
+        return file_path
+
+    def student_exists(self, student_id) -> bool:
+        """
+        通过学生索引判断学生数据是否存在，不访问学生文件
+        """
+        return self.catalog.exists(student_id)
+
+    def delete_student_record(self, student_id):
+        """
+        删除学生成绩数据、未合并的修改日志和索引项。SQLite 后端在删除成绩的同一个事务中删除索引项；
+        JSON 后端在文件删除成功后才删除索引项
+        """
+        if self.score_store is not None:
+            self.score_store.delete_student(student_id)
+        else:
+            file_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'data', f"{student_id}.json"))
+            if os.path.exists(file_path):
+                os.remove(file_path)
+            self.catalog.remove(student_id)
+        self.discard_all_edits(student_id)
+
+    def record_edit(self, student_id, row: int, column: str, new_value):
+        """
+        在修改 score_data 之前调用，把单元格修改追加到修改日志并立即写入磁盘
+        """
+        score = self.score_data["scores"][row]
+        EditJournal(student_id).append(row, row_key(score), column, score.get(column), new_value)
+
+    def discard_edits(self, student_id):
+        """
+        放弃尚未确认保存的修改
+        """
+        EditJournal(student_id).discard()
+
+    def discard_all_edits(self, student_id):
+        """
+        整体保存成功后调用：删除修改日志和上次未完成合并留下的待合并日志，
+        否则下次加载时会用其中较旧的值覆盖刚保存的数据。与日志合并互斥执行
+        """
+        with _compaction_lock(student_id):
+            EditJournal(student_id).discard_all()
+
+    def commit_edits(self, student_id, on_finished=None) -> threading.Thread:
+        """
+        确认保存修改：在后台线程中把修改日志合并进主记录，立即返回。
+        修改已经在日志中持久化，合并失败或程序退出时下次加载会重新应用。
+
+        :param student_id: 学号
+        :param on_finished: 合并结束后在后台线程中调用 on_finished(是否成功)
+        :return: 执行合并的线程
+        """
+        def run():
+            succeeded = self.compact_edits(student_id)
+            if on_finished:
+                on_finished(succeeded)
+
+        thread = threading.Thread(target=run, name=f"compact-{student_id}")
+        thread.start()
+        return thread
+
+    def compact_edits(self, student_id) -> bool:
+        """
+        把修改日志合并进主记录。SQLite 后端只更新修改过的行；JSON 后端整体原子地重写文件
+        """
+        journal = EditJournal(student_id)
+        with _compaction_lock(student_id):
+            try:
+                entries = journal.begin_compaction()
+                if entries:
+                    if self.score_store is not None:
+                        scores = self.score_store.load_scores_by_seq(student_id, (entry.row for entry in entries))
+                        self.score_store.update_scores(student_id, EditJournal.apply(scores, entries))
+                    else:
+                        file_path = self._compact_json(student_id, entries)
+                        self.catalog.update_size(student_id, os.path.getsize(file_path))
+                journal.finish_compaction()
+                print(f"Compacted {len(entries)} edits for {student_id}")
+                return True
+            except Exception as e:
+                print(f"An error occurred while compacting edits: {str(e)}")
+                return False
+
+    @staticmethod
+    def _compact_json(student_id, entries):
+        data_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'data'))
+        file_path = os.path.join(data_dir, f"{student_id}.json")
+
+        with open(file_path, 'r', encoding='utf-8') as file:
+            record = json.load(file)
+        # record[1:] 与 record 共享成绩字典，原地修改即可
+        EditJournal.apply(record[1:], entries)
+        StudentScoreAnalyzer._write_json(file_path, record)
+        return file_path
+
+    @staticmethod
+    def _write_json(file_path, record):
+        """
+        先写入同目录的临时文件并刷到磁盘，再用 os.replace 替换，中断时不会留下写了一半的文件
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(file_path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as file:
+                json.dump(record, file, ensure_ascii=False, indent=4)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(tmp_path, file_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
@@ -4,43 +4,71 @@ import subprocess
 import sys
 import traceback
 
-import pandas as pd
 from PyQt6.QtWidgets import QFileDialog, QMessageBox, QInputDialog, QLineEdit, QDialog, QVBoxLayout, QLabel, \
     QPushButton, QHBoxLayout
 
-from my_window.StudentInfoWindow import StudentInfoWindow
+from file_import.background_task import TaskCancelled, run_with_progress_dialog
+from file_import.config_service import get_config_service
+from file_import.score_store import get_default_score_store
+from file_import.student_score_analyzer import StudentScoreAnalyzer
+
+# pandas（excel_cache、score_converter、batch_import）和成绩窗口在第一次使用时才导入，
+# 主窗口启动时不加载；file_import.preload 会在用户输入学号时在后台提前导入
 
 
 class FileDealer:
-    def __init__(self, parent):
+    def __init__(self, parent, score_store=None):
         self.file_from_scraper = False
         self.student_score_analyzer = None
         self.parent = parent
+        # 成绩存储后端，None 表示使用 data/{学号}.json
+        self.score_store = score_store if score_store is not None else get_default_score_store()
+        # 已解析工作表的缓存，重复导入同一文件时跳过 Excel 解析；第一次导入时创建
+        self._excel_cache = None
+
+    @property
+    def excel_cache(self):
+        if self._excel_cache is None:
+            from file_import.excel_cache import ExcelFrameCache
+            self._excel_cache = ExcelFrameCache()
+        return self._excel_cache
+
+    @staticmethod
+    def student_json_path(student_id):
+        data_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'data'))
+        return os.path.join(data_dir, f"{student_id}.json")
+
+    def student_data_exists(self, student_id):
+        """
+        判断学生成绩数据是否已存在（查询学生索引，不访问学生文件）
+        """
+        return StudentScoreAnalyzer(self.parent, score_store=self.score_store).student_exists(student_id)
+
+    def delete_student_data(self, student_id):
+        """
+        删除学生成绩数据
+        """
+        StudentScoreAnalyzer(self.parent, score_store=self.score_store).delete_student_record(student_id)
+
+    def save_student_record(self, record):
+        """
+        保存 [学生信息, 成绩1, 成绩2, ...] 格式的学生记录，返回保存位置
+        """
+        return StudentScoreAnalyzer(self.parent, score_store=self.score_store).save_student_record(record)
 
     def set_default_student_id(self, student_id_input: QLineEdit):
         """
         从配置文件中读取上一次输入的学号信息
         """
-        data_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'config'))
-        config_file = os.path.join(data_dir, "user_config.json")
+        config = get_config_service()
         default_id = ""
 
-        if os.path.exists(config_file):
-            try:
-                with open(config_file, 'r') as f:
-                    config = json.load(f)
-                    stored_id = config.get("student_id_input", "")
-                    if len(stored_id) == 14 and stored_id.isdigit():
-                        default_id = stored_id
-                    else:
-                        # 重置配置文件中的 student_id_input
-                        config["student_id_input"] = ""
-                        with open(config_file, 'w') as f:
-                            json.dump(config, f, indent=4)
-            except json.JSONDecodeError:
-                print("配置文件格式错误")
-            except IOError:
-                print("读取配置文件时发生错误")
+        stored_id = config.get("student_id_input", "")
+        if isinstance(stored_id, str) and len(stored_id) == 14 and stored_id.isdigit():
+            default_id = stored_id
+        elif stored_id:
+            # 重置配置文件中的 student_id_input
+            config.set("student_id_input", "")
 
         student_id_input.setText(default_id)
 
@@ -56,10 +84,7 @@ class FileDealer:
         # 保存当前输入的学号到配置文件
         self.save_student_id_to_config(student_id)
 
-        data_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'data'))
-        file_path = os.path.join(data_dir, f"{student_id}.json")
-
-        if os.path.exists(file_path):
+        if self.student_data_exists(student_id):
             msg_box = QMessageBox()
             msg_box.setWindowTitle("学生数据已存在")
             msg_box.setText(f"找到学生数据: {student_id}\n请选择操作：")
@@ -75,16 +100,16 @@ class FileDealer:
             if reply == QMessageBox.StandardButton.Open:
                 self.load_and_display_student_data(student_id)
             elif reply == QMessageBox.StandardButton.Save:
-                if not self.import_file(student_id_input=student_id):
-                    return  # 如果导入被取消，直接返回
-                QMessageBox.information(self.parent, "成功", "数据已成功覆盖")
+                # 导入在后台执行，完成后再提示；导入被取消时不提示
+                self.import_file(student_id_input=student_id,
+                                 on_imported=lambda _: QMessageBox.information(self.parent, "成功", "数据已成功覆盖"))
             elif reply == QMessageBox.StandardButton.Discard:
                 confirm = QMessageBox.question(self.parent, "确认删除",
                                                "确定要删除该学生数据吗？此操作不可撤销。",
                                                QMessageBox.StandardButton.Yes |
                                                QMessageBox.StandardButton.No)
                 if confirm == QMessageBox.StandardButton.Yes:
-                    os.remove(file_path)
+                    self.delete_student_data(student_id)
                     QMessageBox.information(self.parent, "成功", "学生数据已删除")
             else:  # Cancel
                 return
@@ -94,16 +119,19 @@ class FileDealer:
                                          QMessageBox.StandardButton.Yes |
                                          QMessageBox.StandardButton.No)
             if reply == QMessageBox.StandardButton.Yes:
-                if not self.import_file(student_id_input=student_id):
-                    return  # 如果导入被取消，直接返回
-                QMessageBox.information(self.parent, "成功", "新学生数据已导入")
-                self.load_and_display_student_data(student_id)
+                self.import_file(student_id_input=student_id, on_imported=self.on_new_student_imported)
+
+    def on_new_student_imported(self, student_id):
+        QMessageBox.information(self.parent, "成功", "新学生数据已导入")
+        self.load_and_display_student_data(student_id)
 
     def load_and_display_student_data(self, student_id):
         # QMessageBox.information(self.parent, "加载数据", f"已加载学生 {student_id} 的数据")
 
+        from my_window.StudentInfoWindow import StudentInfoWindow
+
         # 创建新窗口
-        self.student_info_window = StudentInfoWindow(student_id=student_id)
+        self.student_info_window = StudentInfoWindow(student_id=student_id, score_store=self.score_store)
 
         # 设置新窗口为模态：在新窗口退出前不可编辑主窗口（可选）
         self.student_info_window.setModal(False)
@@ -118,27 +146,7 @@ class FileDealer:
         """
         将新输入的学号保存到user_config.json
         """
-        data_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'config'))
-        config_file = os.path.join(data_dir, "user_config.json")
-        config = {}
-
-        if os.path.exists(config_file):
-            try:
-                with open(config_file, 'r') as f:
-                    config = json.load(f)
-            except json.JSONDecodeError:
-                print("配置文件格式错误，将创建新的配置")
-            except IOError:
-                print("读取配置文件时发生错误，将创建新的配置")
-
-        config["student_id_input"] = student_id
-
-        try:
-            os.makedirs(os.path.dirname(config_file), exist_ok=True)
-            with open(config_file, 'w') as f:
-                json.dump(config, f, indent=4)
-        except IOError:
-            print("保存配置文件时发生错误")
+        get_config_service().set("student_id_input", student_id)
 
     def input_student_info(self, name_input: str = None, student_id_input: str = None):
         """
@@ -174,19 +182,21 @@ class FileDealer:
 
         return None, None
 
-    def import_file(self, student_id_input: str = None, name_input: str = None):
+    def import_file(self, student_id_input: str = None, name_input: str = None, on_imported=None):
         """
-        导入教务成绩文件
+        导入教务成绩文件。输入和文件选择在界面线程中完成，解析和保存在后台线程中执行。
+
+        :param student_id_input: 学号，None 时弹出输入框
+        :param name_input: 姓名，None 时弹出输入框
+        :param on_imported: 导入成功后在界面线程中调用 on_imported(学号)
+        :return: 导入任务，操作被取消时返回 None 或 False
         """
         name, student_id = self.input_student_info(student_id_input=student_id_input, name_input=name_input)
         if not name or not student_id:
             return
 
         # 检查是否存在同名文件
-        data_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'data'))
-        json_file_name = os.path.join(data_dir, f"{student_id}.json")
-
-        if os.path.exists(json_file_name):
+        if self.student_data_exists(student_id):
             reply = QMessageBox.question(self.parent, '文件已存在',
                                          f"学号 {student_id} 的文件已存在。是否覆盖？",
                                          QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
@@ -247,13 +257,10 @@ class FileDealer:
 
         if self.file_from_scraper:
             # 读取爬虫生成的文件
-            scraper_file = os.path.abspath(
+            file_name = os.path.abspath(
                 os.path.join(os.path.dirname(__file__), '..', 'scraper', 'table_contents', 'all_tables_content.xlsx'))
-            try:
-                df = pd.read_excel(scraper_file, sheet_name='总表')
-            except Exception as e:
-                QMessageBox.critical(self.parent, "Error", f"无法读取爬虫生成的文件: {str(e)}")
-                return
+            read_kwargs = {'fallback_to_first': False, 'from_scraper': True}
+            error_title = "无法读取爬虫生成的文件"
         else:
             # 原有的文件选择逻辑
             file_name, _ = QFileDialog.getOpenFileName(
@@ -266,74 +273,117 @@ class FileDealer:
             if not file_name:
                 QMessageBox.information(self.parent, "Information", "导入已取消")
                 return
+            read_kwargs = {}
+            error_title = "无法导入文件"
+
+        from_scraper = self.file_from_scraper
+
+        def read_and_save(task):
+            # 在后台线程中执行：解析 Excel 并保存，不访问界面
+            from file_import.score_converter import read_student_record
+            task.report_progress(0, 2, f"正在读取 {os.path.basename(file_name)}...")
+            # 尝试读取名为"总表"的工作表，如果"总表"不存在，读取第一个工作表
+            # 按列处理规则转换成绩表，用户信息位于记录开头
+            transposed_data, columns, sheet_name = read_student_record(file_name, name, student_id,
+                                                                       cache=self.excel_cache, **read_kwargs)
+            # 开始覆盖学生数据后不能再取消
+            task.disable_cancel()
+            task.report_progress(1, 2, "正在保存成绩数据...")
+            saved_location = self.save_student_record(transposed_data)
+            task.report_progress(2, 2, "导入完成")
+            return columns, sheet_name, saved_location
+
+        def on_finished(result):
+            from file_import.score_converter import SPECIAL_COLUMNS
+            columns, sheet_name, saved_location = result
+            if not from_scraper and sheet_name != '总表':
+                QMessageBox.information(self.parent, "Information",
+                                        f"未找到'总表'工作表，已导入第一个工作表：'{sheet_name}'")
+
+            # 显示成功消息
+            success_message = f"成功导入文件并保存。\n保存位置：{saved_location}\n导入的列：{', '.join(map(str, columns))}\n特殊处理的列：{', '.join(SPECIAL_COLUMNS)}\n用户信息已添加到文件开头。"
+            QMessageBox.information(self.parent, "Success", success_message)
+            if on_imported:
+                on_imported(student_id)
+
+        def on_failed(error):
+            QMessageBox.critical(self.parent, "Error", f"{error_title}: {str(error)}")
+
+        def on_cancelled():
+            QMessageBox.information(self.parent, "操作取消", "导入操作已取消。")
+
+        return run_with_progress_dialog(self.parent, "导入成绩文件", "正在导入成绩文件...", read_and_save,
+                                        on_finished=on_finished, on_failed=on_failed, on_cancelled=on_cancelled)
+
+    def batch_import(self):
+        """
+        批量导入一个目录中的教务成绩文件。选择目录在界面线程中完成，转换和保存在后台执行。
 
-            try:
-                # 尝试读取名为"总表"的工作表
-                try:
-                    df = pd.read_excel(file_name, sheet_name='总表')
-                except ValueError:
-                    # 如果"总表"不存在，读取第一个工作表
-                    xl = pd.ExcelFile(file_name)
-                    first_sheet_name = xl.sheet_names[0]
-                    df = pd.read_excel(file_name, sheet_name=first_sheet_name)
-                    QMessageBox.information(self.parent, "Information",
-                                            f"未找到'总表'工作表，已导入第一个工作表：'{first_sheet_name}'")
-            except Exception as e:
-                QMessageBox.critical(self.parent, "Error", f"无法导入文件: {str(e)}")
-                return
-
-        # 特殊处理的列
-        special_columns = ['总成绩', '学分', '学时', '绩点', '等级成绩']
-
-        def convert_to_float_or_string(value):
-            if pd.isna(value):
-                return -1.0
-            if isinstance(value, str) and value.strip() == '合格':
-                return '合格'
-            try:
-                return float(value)
-            except ValueError:
-                return value  # 如果无法转换为float，则返回原始值
-
-        # 处理所有列
-        data = {}
-        for col in df.columns:
-            if col in special_columns:
-                # 特殊处理这些列
-                if col in ['总成绩', '等级成绩']:
-                    data[col] = df[col].apply(convert_to_float_or_string).tolist()
-                else:
-                    data[col] = df[col].apply(convert_to_float_or_string).tolist()
-            else:
-                # 其他列保持原样，但空值转为空字符串
-                data[col] = df[col].fillna('').astype(str).tolist()
-
-        # 根据数据来源决定是否转置数据
-        if not self.file_from_scraper:
-            transposed_data = [dict(zip(data.keys(), row)) for row in zip(*data.values())]
-        else:
-            transposed_data = df.to_dict('records')
+        :return: 批量导入任务，操作被取消时返回 None
+        """
+        from file_import.batch_import import BatchImporter, collect_jobs, default_report_paths
 
-        # 对特殊列进行排序
-        # for col in special_columns:
-        #     if col in data:
-        #         transposed_data.sort(key=lambda x: x.get(col, -1), reverse=True)
+        directory = QFileDialog.getExistingDirectory(self.parent, "选择成绩文件目录（文件名包含学号和姓名，或包含 manifest.csv）")
+        if not directory:
+            QMessageBox.information(self.parent, "Information", "批量导入已取消")
+            return
 
-        # 创建用户信息字典
-        user_info = {
-            "姓名": name,
-            "学号": student_id
-        }
+        try:
+            jobs = collect_jobs(directory)
+        except Exception as e:
+            QMessageBox.critical(self.parent, "Error", f"无法读取导入清单: {str(e)}")
+            return
 
-        # 将用户信息添加到数据的开头
-        transposed_data.insert(0, user_info)
+        if not jobs:
+            QMessageBox.information(self.parent, "Information", "目录中没有找到成绩文件")
+            return
 
-        # 确保 '../data' 目录存在
-        os.makedirs(data_dir, exist_ok=True)
+        error_report_path, completed_path = default_report_paths(directory)
+        resume = True
+        if os.path.exists(completed_path):
+            reply = QMessageBox.question(self.parent, "继续批量导入",
+                                         "检测到上次批量导入的记录，是否跳过已导入的文件？",
+                                         QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+                                         QMessageBox.StandardButton.Yes)
+            resume = reply == QMessageBox.StandardButton.Yes
 
-        with open(json_file_name, 'w', encoding='utf-8') as f:
-            json.dump(transposed_data, f, ensure_ascii=False, indent=4)
+        score_store = self.score_store
+        # 取消时已处理的文件仍会保存并记录，on_cancelled 中报告这部分结果
+        progress = {"succeeded": 0, "failed": 0}
 
-        # 显示成功消息
-        success_message = f"成功导入文件并保存为JSON。\n保存位置：{json_file_name}\n导入的列：{', '.join(df.columns)}\n特殊处理的列：{', '.join(special_columns)}\n用户信息已添加到文件开头。"
-        QMessageBox.information(self.parent, "Success", success_message)
+        def run_batch(task):
+            # 在后台线程中执行：子进程转换文件，本线程依次保存；点击取消后不再等待尚未开始的文件
+            def on_progress(done, total, job, error):
+                progress["failed" if error else "succeeded"] += 1
+                try:
+                    task.report_progress(done, total, f"已处理 {done}/{total}：{os.path.basename(job.file_path)}")
+                except TaskCancelled:
+                    # 取消后正在转换的文件仍在保存，不中断导入
+                    pass
+
+            importer = BatchImporter(score_store=score_store, progress_callback=on_progress,
+                                     should_cancel=task.is_cancelled)
+            summary = importer.run(jobs, error_report_path, completed_path, resume=resume)
+            # 取消时已导入的文件已经保存并记录，on_cancelled 如实报告这部分结果
+            task.check_cancelled()
+            return summary
+
+        def on_finished(summary):
+            message = (f"共 {summary['total']} 个文件，跳过已导入的 {summary['skipped']} 个，"
+                       f"成功 {summary['succeeded']} 个，失败 {summary['failed']} 个。")
+            if summary['failed']:
+                message += f"\n错误报告：{error_report_path}"
+            QMessageBox.information(self.parent, "批量导入完成", message)
+
+        def on_failed(error):
+            QMessageBox.critical(self.parent, "Error", f"批量导入失败: {str(error)}")
+
+        def on_cancelled():
+            message = (f"批量导入已取消。已导入 {progress['succeeded']} 个文件，失败 {progress['failed']} 个，"
+                       f"再次批量导入该目录时可以跳过已导入的文件。")
+            if progress['failed']:
+                message += f"\n错误报告：{error_report_path}"
+            QMessageBox.information(self.parent, "批量导入", message)
+
+        return run_with_progress_dialog(self.parent, "批量导入", "正在导入成绩文件...", run_batch,
+                                        on_finished=on_finished, on_failed=on_failed, on_cancelled=on_cancelled)
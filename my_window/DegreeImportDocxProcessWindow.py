@@ -2,21 +2,24 @@
 这个模块实现了一个Word文档导入工具的图形用户界面。
 主要功能包括：
 1. 提供一个用户界面来导入和处理Word文档
-2. 使用DocxProcess类来处理导入的文档
+2. 使用DocxProcess类来处理导入的文档（不依赖界面的 degree_api），并把错误显示为对话框
+3. 文档在后台线程中处理，处理期间显示进度，可以取消
 
 该模块使用PyQt6来创建图形界面。
 """
 
 from PyQt6.QtCore import Qt, pyqtSignal
 from PyQt6.QtWidgets import QMainWindow, QApplication, QHBoxLayout, QLabel, QPushButton, QMessageBox, QVBoxLayout, \
-    QWidget
+    QWidget, QFileDialog
 import sys
 import os
 
 # 将当前工作目录添加到系统路径
 sys.path.append(os.getcwd())
 
+from degree_process.degree_api import ScoresNotFoundError
 from degree_process.docx_process import DocxProcess
+from file_import.background_task import run_with_progress_dialog
 
 
 class DegreeImportDocxProcessMainWindow(QMainWindow):
@@ -38,6 +41,8 @@ class DegreeImportDocxProcessMainWindow(QMainWindow):
         # print(f"DegreeImportDocxProcessMainWindow.__init__ 被调用，学生ID: {student_id}")
         self.student_id = student_id
         self.docx_processor = DocxProcess(self)
+        # 正在后台处理的任务，None 表示空闲
+        self.import_task = None
         self.initUI()
         # print("DegreeImportDocxProcessMainWindow 初始化完成")
         # print(f"窗口大小: {self.size()}")
@@ -87,18 +92,91 @@ class DegreeImportDocxProcessMainWindow(QMainWindow):
         """
         处理导入按钮点击事件。
 
-        调用DocxProcess对象的import_docx方法来导入和处理Word文档。
-        如果导入成功，发出import_finished信号并关闭窗口。
-        如果导入失败，显示错误消息。
+        选择培养方案文件，在后台线程中调用DocxProcess对象的process_file方法来处理Word文档。
+        处理结果由 on_import_succeeded / on_import_failed 在界面线程中处理。
         """
-        result = self.docx_processor.import_docx(student_id=self.student_id)
-        if result is not None:
-            self.import_finished.emit()
-            self.close()
+        if self.import_task is not None:
+            return
+
+        file_name = self.choose_file()
+        if not file_name:
+            QMessageBox.information(self, "提示", "导入已取消")
+            return
+
+        self.file_label.setText(os.path.basename(file_name))
+        self.import_button.setEnabled(False)
+
+        def process(task):
+            def report(done, total, message):
+                task.report_progress(done, total, message)
+                if done == total - 1:
+                    # 最后一步写入学位进度文件，开始后不能再取消
+                    task.disable_cancel()
+
+            return self.docx_processor.process_file(file_name, student_id=self.student_id, progress_callback=report)
+
+        self.import_task = run_with_progress_dialog(
+            self, "导入培养方案", f"正在处理 {os.path.basename(file_name)}...", process,
+            on_finished=lambda progress: self.on_import_succeeded(file_name, progress),
+            on_failed=self.on_import_failed,
+            on_cancelled=self.on_import_cancelled)
+
+    def on_import_succeeded(self, file_name, progress):
+        """
+        文档处理成功：显示提示，发出import_finished信号并关闭窗口。
+        """
+        self.import_task = None
+        self.docx_processor.save_last_file_path(file_name)
+        for warning in progress.warnings:
+            QMessageBox.warning(self, "提示", warning)
+        QMessageBox.information(self, "成功", f"成功导入文件: {file_name}")
+        self.import_finished.emit()
+        self.close()
+
+    def on_import_failed(self, error):
+        """
+        文档处理失败：显示错误消息，可以重新选择文件。
+        """
+        self.import_task = None
+        self.import_button.setEnabled(True)
+        if isinstance(error, ScoresNotFoundError):
+            QMessageBox.warning(self, "警告", str(error))
         else:
-            QMessageBox.critical(self, "导入失败", "文档导入失败，请检查文件格式或重试。")
+            QMessageBox.critical(self, "导入失败", f"导入文件时发生错误: {str(error)}")
+
+    def on_import_cancelled(self):
+        self.import_task = None
+        self.import_button.setEnabled(True)
+        self.file_label.setText("未选择文件")
+
+    def choose_file(self):
+        """
+        选择培养方案文件，优先询问是否使用上次导入的文件。
+
+        :return: 文件路径，取消时返回空字符串
+        """
+        last_file_path = self.docx_processor.last_file_path
+        if last_file_path and os.path.exists(last_file_path):
+            reply = QMessageBox.question(self, '使用上次文件',
+                                         f"是否使用上次导入的文件?\n{last_file_path}",
+                                         QMessageBox.StandardButton.Yes |
+                                         QMessageBox.StandardButton.No,
+                                         QMessageBox.StandardButton.No)
+            if reply == QMessageBox.StandardButton.Yes:
+                return last_file_path
+
+        file_name, _ = QFileDialog.getOpenFileName(
+            self,
+            "导入 Word 文档",
+            "",
+            "Word 文档 (*.docx)"
+        )
+        return file_name
 
     def closeEvent(self, event):
+        if self.import_task is not None:
+            # 窗口关闭后不再需要处理结果
+            self.import_task.cancel()
         self.import_finished.emit()
         event.accept()
 
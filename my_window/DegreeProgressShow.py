@@ -3,14 +3,16 @@ import os.path
 import sys
 import traceback
 
-from PyQt6.QtCore import Qt, QTimer, pyqtSignal
+from PyQt6.QtCore import Qt, QTimer, pyqtSignal, QAbstractTableModel, QModelIndex
 from PyQt6.QtGui import QColor
 from PyQt6.QtWidgets import (QProgressBar,
                              QLabel, QMessageBox, QHBoxLayout)
-from PyQt6.QtWidgets import (QTableWidget, QTableWidgetItem, QHeaderView, QSizePolicy,
+from PyQt6.QtWidgets import (QTableView, QHeaderView, QSizePolicy,
                              QDialog, QVBoxLayout, QPushButton, QScrollArea, QWidget,
                              QFrame, QApplication)
 
+from degree_process.program_parser import DEFAULT_COMPLETED_COURSES
+from degree_process.progress_model import DegreeProgressModel
 from my_window.DegreeImportDocxProcessWindow import DegreeImportDocxProcessMainWindow
 
 
@@ -23,12 +25,12 @@ class CourseInfoWidget(QWidget):
     包括课程类型、必修学分、选修学分和完成进度条。
     """
 
-    def __init__(self, info, table_data):
+    def __init__(self, info, completed_credits):
         """
         初始化CourseInfoWidget。
 
         :param info: 包含课程类型、必修学分和选修学分的元组，例如：("公共基础课", 10, 6)
-        :param table_data: 课程详细信息，字典形式，包含 'header' 和 'data' 两个键
+        :param completed_credits: 已修读的学分（由 DegreeProgressModel 计算）
         """
         super().__init__()
 
@@ -43,53 +45,134 @@ class CourseInfoWidget(QWidget):
         # 添加选修学分标签
         layout.addWidget(QLabel(f"选修学分: {elective}"))
 
-        # 计算已修读的学分
-        completed_credits = self.calculate_completed_credits(table_data)
-
-        progress = QProgressBar()  # 创建进度条
-        progress.setMaximum(required + elective)  # 设置进度条最大值
-        progress.setValue(completed_credits)  # 设置进度条当前值为已修读的学分
-        layout.addWidget(progress)  # 添加进度条到布局
+        self.progress = QProgressBar()  # 创建进度条
+        self.progress.setMaximum(required + elective)  # 设置进度条最大值
+        layout.addWidget(self.progress)  # 添加进度条到布局
 
         # 添加已修读学分标签
-        layout.addWidget(QLabel(f"已修读学分: {completed_credits}"))
+        self.completed_label = QLabel()
+        layout.addWidget(self.completed_label)
+
+        self.set_completed_credits(completed_credits)
 
         self.setLayout(layout)  # 将布局应用到小部件
 
-    def calculate_completed_credits(self, table_data):
+    def set_completed_credits(self, completed_credits):
         """
-        计算已修读的学分总和。
+        更新已修读的学分。
 
-        :param table_data: 课程详细信息，字典形式，包含 'header' 和 'data' 两个键
-        :return: 已修读的学分总和
+        :param completed_credits: 已修读的学分总和
         """
-        headers = table_data['header']
-        data = table_data['data']
+        self.progress.setValue(int(completed_credits))  # 设置进度条当前值为已修读的学分
+        self.completed_label.setText(f"已修读学分: {completed_credits:g}")
 
-        # 找到"学分"和"修读状态"列的索引
-        credit_index = headers.index("学分") if "学分" in headers else -1
-        status_index = headers.index("状态") if "状态" in headers else -1
 
-        completed_credits = 0
+class CourseTableModel(QAbstractTableModel):
+    """
+    直接读取内存中 header/data 列表的课程表格模型，不为每个单元格创建对象。
+
+    对齐方式和特殊课程的黄色背景由 data() 的角色提供；排序只调整行的顺序，不复制数据。
+
+    属性:
+        header: 表格头部
+        rows: 表格数据（与学位进度数据共享同一个列表，修改后调用 refresh）
+    """
+
+    HIGHLIGHT_COLOR = QColor(255, 255, 0)  # 黄色背景
 
-        if credit_index != -1 and status_index != -1:
-            for row in data:
-                if row[status_index] == "已修读":
-                    try:
-                        completed_credits += float(row[credit_index])
-                    except ValueError:
-                        # 如果学分不能转换为浮点数，就忽略这一行
-                        pass
+    def __init__(self, header, data, highlight_courses=(), parent=None):
+        """
+        初始化 CourseTableModel。
 
-        return completed_credits
+        :param header: 表格头部
+        :param data: 表格数据，二维列表
+        :param highlight_courses: 需要标记为黄色背景的课程（课程名包含其中之一）
+        :param parent: 父对象
+        """
+        super().__init__(parent)
+        self.header = header
+        self.rows = data
+        self.highlight_courses = tuple(highlight_courses)
+        self._order = list(range(len(data)))
+        self._course_name_index = header.index("课程名称") if "课程名称" in header else -1
+        self._highlighted = self._find_highlighted()
+        self._line_counts = self._find_line_counts()
+
+    def _find_line_counts(self):
+        # 只记录存在换行符的行及其行数
+        line_counts = {}
+        for row, row_data in enumerate(self.rows):
+            text = '\t'.join(map(str, row_data))
+            if '\n' in text:
+                line_counts[row] = max(str(cell).count('\n') for cell in row_data) + 1
+        return line_counts
+
+    def _find_highlighted(self):
+        if self._course_name_index == -1 or not self.highlight_courses:
+            return frozenset()
+        return frozenset(row for row, row_data in enumerate(self.rows)
+                         if any(course in str(row_data[self._course_name_index]) for course in self.highlight_courses))
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._order)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.header)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        source_row = self._order[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return str(self.rows[source_row][index.column()])
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            return Qt.AlignmentFlag.AlignCenter  # 文本居中
+        if role == Qt.ItemDataRole.BackgroundRole and source_row in self._highlighted:
+            return self.HIGHLIGHT_COLOR
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return self.header[section]
+        return str(section + 1)
 
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        self.layoutAboutToBeChanged.emit()
+        self._order.sort(key=lambda row: str(self.rows[row][column]),
+                         reverse=order == Qt.SortOrder.DescendingOrder)
+        self.layoutChanged.emit()
 
-class CourseTableWidget(QTableWidget):
+    def line_counts(self):
+        """
+        按当前显示顺序返回 (行号, 行数)，只包含存在换行符的行。
+        """
+        if not self._line_counts:
+            return
+        for row, source_row in enumerate(self._order):
+            if source_row in self._line_counts:
+                yield row, self._line_counts[source_row]
+
+    def refresh(self):
+        """
+        表格数据在外部被修改后通知视图刷新。
+        """
+        self._highlighted = self._find_highlighted()
+        self._line_counts = self._find_line_counts()
+        if self.rows and self.header:
+            self.dataChanged.emit(self.index(0, 0), self.index(len(self._order) - 1, len(self.header) - 1))
+
+
+class CourseTableWidget(QTableView):
     """
     显示课程详细信息的表格小部件。
     """
 
-    def __init__(self, header, data):
+    # 计算列宽时最多参考的行数，使大表格的列宽计算时间不随行数增长
+    RESIZE_PRECISION = 200
+
+    def __init__(self, header, data, highlight_courses=()):
         """
         初始化 CourseTableWidget。
 
@@ -99,41 +182,53 @@ class CourseTableWidget(QTableWidget):
                          ["00001", "高等数学", 5, "90"],
                          ["00002", "大学英语", 4, "85"]
                      ]
+        :param highlight_courses: 需要标记为黄色背景的课程
         """
         super().__init__()
 
-        self.setColumnCount(len(header))  # 设置列数
-        self.setHorizontalHeaderLabels(header)  # 设置表头
-
-        self.setRowCount(len(data))  # 设置行数
-        for row, row_data in enumerate(data):  # 遍历数据，填充表格
-            has_newline = False  # 用于标记该行是否存在换行符
-            for col, cell_data in enumerate(row_data):
-                item = QTableWidgetItem(str(cell_data))  # 创建表格项
-                item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)  # 设置文本居中
-                self.setItem(row, col, item)  # 将表格项添加到表格
-
-                # 检查是否存在换行符
-                if '\n' in str(cell_data):
-                    has_newline = True
-
-            # 只对存在换行符的行应用自动行高
-            if has_newline:
-                self.resizeRowToContents(row)
+        self.table_model = CourseTableModel(header, data, highlight_courses, self)
+        self.setModel(self.table_model)
+        self._tall_rows = []
 
         self.setSortingEnabled(True)  # 启用排序功能
-        self.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)  # 禁止编辑表格
+        self.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)  # 禁止编辑表格
 
         self.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Interactive)  # 设置表头可交互调整大小
+        self.horizontalHeader().setResizeContentsPrecision(self.RESIZE_PRECISION)
         self.setMinimumHeight(150)  # 设置最小高度
         self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)  # 设置大小策略，使其可以扩展
 
+        # 只对存在换行符的行按行数设置行高，排序后重新设置
+        self.table_model.layoutChanged.connect(self.update_row_heights)
+        self.update_row_heights()
+
         # 调整列宽以适应内容
         self.resizeColumnsToContents()
 
         # 设置自动换行
         self.setWordWrap(True)
 
+    def columnCount(self):
+        return self.table_model.columnCount()
+
+    def rowCount(self):
+        return self.table_model.rowCount()
+
+    def update_row_heights(self):
+        """
+        按行中最多的换行数设置行高，不需要逐行测量内容。
+        """
+        default_height = self.verticalHeader().defaultSectionSize()
+        for row in self._tall_rows:
+            self.setRowHeight(row, default_height)
+
+        line_spacing = self.fontMetrics().lineSpacing()
+        padding = max(0, default_height - line_spacing)
+        self._tall_rows = []
+        for row, lines in self.table_model.line_counts():
+            self.setRowHeight(row, lines * line_spacing + padding)
+            self._tall_rows.append(row)
+
 
 class TableDialog(QDialog):
     """
@@ -222,7 +317,12 @@ class DegreeProgressShowMainWindow(QWidget):
         scroll_content = QWidget()  # 创建滚动区域内容部件
         scroll_layout = QVBoxLayout(scroll_content)  # 使用垂直布局
 
-        self.table_dialogs = {}  # 使用字典存储对话框，避免重复创建
+        self.table_dialogs = {}  # 详情对话框在第一次打开时创建，之后复用
+        self.info_widgets = []  # 每个课程类型的课程信息小部件
+
+        # 学分和修读状态保存在数组模型中，成绩修改时只重新计算受影响的课程类型
+        self.progress_model = DegreeProgressModel(data)
+        self.progress_model.add_listener(self.on_progress_changed)
 
         for i, item in enumerate(data):  # 遍历课程数据
             frame = QFrame()  # 创建框架，用于包含每个课程类型的信息
@@ -230,7 +330,8 @@ class DegreeProgressShowMainWindow(QWidget):
             frame.setFrameShadow(QFrame.Shadow.Raised)  # 设置框架阴影
             frame_layout = QVBoxLayout(frame)  # 使用垂直布局
 
-            info_widget = CourseInfoWidget(item['info'], item['table'])  # 创建课程信息小部件
+            info_widget = CourseInfoWidget(item['info'], self.progress_model.completed_credits(i))  # 创建课程信息小部件
+            self.info_widgets.append(info_widget)
             frame_layout.addWidget(info_widget)  # 将课程信息小部件添加到框架布局
 
             # 获取表格头部和数据
@@ -267,26 +368,9 @@ class DegreeProgressShowMainWindow(QWidget):
             show_details_button = QPushButton(f"显示{item['info'][0]}详情")  # 创建显示详情按钮
             frame_layout.addWidget(show_details_button)  # 将按钮添加到框架布局
 
-            table_widget = CourseTableWidget(headers, table_data)  # 创建课程表格
-
-            # 定义需要标记为黄色背景的课程
-            special_courses = ["体育", "大学英语", "跨学科基本课程", "形势与政策", "新时代中国特色社会主义劳动教育"]
-
-            # 如果有特殊课程，将其标记为黄色背景
-            if course_name_index != -1:
-                for row in range(table_widget.rowCount()):
-                    course_name = table_widget.item(row, course_name_index).text()
-                    if any(special_course in course_name for special_course in special_courses):
-                        for col in range(table_widget.columnCount()):
-                            table_widget.item(row, col).setBackground(QColor(255, 255, 0))  # 黄色背景
-
-            # 创建对话框并存储
-            table_dialog = TableDialog(self, table_widget, item['info'][0])
-            self.table_dialogs[item['info'][0]] = table_dialog
-
             # 连接按钮的点击信号到显示对话框的槽函数
             show_details_button.clicked.connect(
-                lambda checked, course_type=item['info'][0]: self.show_table_dialog(course_type)
+                lambda checked, type_index=i: self.show_table_dialog(type_index)
             )
 
             scroll_layout.addWidget(frame)  # 将框架添加到滚动区域布局
@@ -318,18 +402,64 @@ class DegreeProgressShowMainWindow(QWidget):
 
         self.setLayout(main_layout)  # 将主布局应用到窗口
 
-    def show_table_dialog(self, course_type):
-        """显示对应课程类型的表格对话框"""
-        if course_type in self.table_dialogs:
-            self.table_dialogs[course_type].show()
+    def create_table_dialog(self, type_index):
+        """
+        创建课程类型的详情对话框，默认已修读的特殊课程标记为黄色背景。
+
+        :param type_index: 课程类型序号
+        :return: TableDialog 实例
+        """
+        item = self.progress_model.data[type_index]
+        # 默认已修读的特殊课程标记为黄色背景
+        table_widget = CourseTableWidget(item['table']['header'], item['table']['data'],
+                                         highlight_courses=DEFAULT_COMPLETED_COURSES)  # 创建课程表格
+
+        return TableDialog(self, table_widget, item['info'][0])
+
+    def update_score(self, old_score=None, new_score=None):
+        """
+        成绩记录修改后更新学位进度。
+
+        :param old_score: 修改前的成绩记录，新增时为 None
+        :param new_score: 修改后的成绩记录，删除时为 None
+        """
+        self.progress_model.update_score(old_score, new_score)
+
+    def set_scores(self, scores):
+        """
+        设置学生的全部成绩记录，用于判断删除或修改一条成绩后课程是否仍由其他成绩记录（如重修）满足。
+
+        :param scores: 成绩字典列表
+        """
+        self.progress_model.set_scores(scores)
+
+    def on_progress_changed(self, type_indices):
+        """
+        课程状态改变后刷新受影响的课程类型：更新已修读学分，并刷新已创建的详情表格，
+        未打开过的详情在第一次打开时按最新数据创建。
+
+        :param type_indices: 受影响的课程类型序号列表
+        """
+        for type_index in type_indices:
+            self.info_widgets[type_index].set_completed_credits(self.progress_model.completed_credits(type_index))
+
+            # 详情表格直接读取学位进度数据，只需通知刷新
+            dialog = self.table_dialogs.get(self.progress_model.info(type_index)[0])
+            if dialog is not None:
+                dialog.table_widget.table_model.refresh()
+                dialog.table_widget.update_row_heights()
 
-    def show_table_dialog(self, course_type):
+    def show_table_dialog(self, type_index):
         """
-        显示对应课程类型的对话框。
+        显示对应课程类型的对话框，第一次显示时才创建表格和对话框。
 
-        :param course_type: 课程类型
+        :param type_index: 课程类型序号
         """
-        dialog = self.table_dialogs[course_type]  # 获取对应的对话框
+        course_type = self.progress_model.info(type_index)[0]
+        dialog = self.table_dialogs.get(course_type)  # 获取对应的对话框
+        if dialog is None:
+            dialog = self.create_table_dialog(type_index)
+            self.table_dialogs[course_type] = dialog
         dialog.show()  # 显示对话框
 
 
@@ -405,14 +535,16 @@ class DegreeProgressWidget(QWidget):
     """
     import_finished = pyqtSignal()  # 定义导入完成信号
 
-    def __init__(self, student_id, parent=None):
+    def __init__(self, student_id, parent=None, on_window_created=None):
         """
         初始化 DegreeProgressWidget。
 
         :param student_id: 学生ID
         :param parent: 父窗口
+        :param on_window_created: 学位进度窗口创建后调用 on_window_created(窗口)，包括导入培养方案之后才创建的窗口
         """
         super().__init__(parent)
+        self.on_window_created = on_window_created
         self.data_manager = DataManager()  # 创建 DataManager 实例
         self.setup_data_manager(student_id=student_id)  # 设置数据文件路径
         self.progress_window = None  # 学位进度窗口
@@ -461,6 +593,8 @@ class DegreeProgressWidget(QWidget):
         """
         if self.data_manager.load_data():
             self.progress_window = DegreeProgressShowMainWindow(self.data_manager.get_data())
+            if self.on_window_created:
+                self.on_window_created(self.progress_window)
             self.progress_window.show()
             return self.progress_window
         else:
@@ -492,15 +626,17 @@ class DegreeProgressWidget(QWidget):
             return self.show_degree_progress()
 
 
-def create_degree_progress_window(student_id, parent=None):
+def create_degree_progress_window(student_id, parent=None, on_window_created=None):
     """
     创建并返回学位进度窗口，可以从其他地方调用而不会导致事件循环冲突。
 
     :param student_id: 学分进度对应的学号
     :param parent: 父窗口，默认为None
+    :param on_window_created: 窗口创建后调用 on_window_created(窗口)；需要先导入培养方案时，返回值为 None，
+                              窗口在导入完成后创建，同样会调用
     :return: DegreeProgressShowMainWindow实例或None
     """
-    widget = DegreeProgressWidget(parent=parent, student_id=student_id)
+    widget = DegreeProgressWidget(parent=parent, student_id=student_id, on_window_created=on_window_created)
     return widget.start(student_id=student_id)
 
 
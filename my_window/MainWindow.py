@@ -7,13 +7,13 @@ import json
 from PyQt6.QtWidgets import QMainWindow, QLabel, QStatusBar, QMenu, QFileDialog, QMessageBox, QApplication, QListWidget, \
     QPushButton, QVBoxLayout, QWidget, QHBoxLayout, QLineEdit
 from PyQt6.QtGui import QIcon, QIntValidator, QValidator
-from PyQt6.QtCore import Qt, QSize
+from PyQt6.QtCore import Qt, QSize, QTimer
 from PyQt6.QtGui import QAction
-import pandas as pd
 
 from file_import.action_creator import ActionCreator
 from file_import.table_file_dealer import FileDealer
 from file_import.menu_manager import MenuManager
+from file_import.preload import start_preload
 
 
 class MainWindow(QMainWindow):
@@ -47,6 +47,10 @@ class MainWindow(QMainWindow):
         self.student_id_input.setMaxLength(14)  # 设置最大长度为14
         self.student_id_input.setValidator(StudentIDValidator())  # 只允许输入14位数字
         self.file_dealer.set_default_student_id(self.student_id_input)  # 设置默认学号
+        # 用户输入学号时在后台预加载成绩窗口等模块；已有默认学号时用户可能直接确认，窗口显示后立即预加载
+        self.student_id_input.textEdited.connect(lambda: start_preload())
+        if self.student_id_input.text():
+            QTimer.singleShot(0, start_preload)
         self.student_id_input.returnPressed.connect(lambda: self.file_dealer.process_student_id(self.student_id_input))
 
         # 创建确认按钮
@@ -5,51 +5,219 @@ sys.path.append(os.getcwd())
 
 from PyQt6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QTableView, QLabel,
-    QHeaderView, QScrollArea, QWidget, QApplication, QPushButton, QListWidget, QCheckBox, QListWidgetItem, QMessageBox
+    QHeaderView, QScrollArea, QWidget, QApplication, QPushButton, QListView, QLineEdit, QCheckBox, QMessageBox
 )
-from PyQt6.QtCore import Qt, QSortFilterProxyModel
-from PyQt6.QtGui import QStandardItemModel, QStandardItem, QFont
+from PyQt6.QtCore import Qt, QSortFilterProxyModel, QAbstractTableModel, QAbstractListModel, QModelIndex
+from PyQt6.QtGui import QFont
 
+from file_import.background_task import run_with_progress_dialog
+from file_import.filter_index import FilterIndex
+from file_import.score_table import GPA_COLUMNS, SCORE_COLUMNS, ScoreTable, WeightedAggregates
 from file_import.student_score_analyzer import StudentScoreAnalyzer
-from .DegreeProgressShow import create_degree_progress_window
 
 
 class CustomSortFilterProxyModel(QSortFilterProxyModel):
     def __init__(self):
         super().__init__()
         self.column_filters = {}
+        # 各列的 取值 -> 行位集 索引，过滤时只需求位集的交集
+        self.filter_index = None
 
         # 设置全局字体
         font = QFont()
         font.setPointSize(16)  # 设置字体大小
         font.setBold(True)  # 设置字体粗细
 
+    def setSourceModel(self, source_model):
+        self.filter_index = FilterIndex(source_model.score_table)
+        super().setSourceModel(source_model)
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        # 排序交给源模型按分类编码完成，避免每次比较都调用 data()
+        self.sourceModel().sort(column, order)
+
     def setColumnFilter(self, column, values):
         self.column_filters[column] = values
+        self.filter_index.set_filter(column, values)
         self.invalidateFilter()
 
     def filterAcceptsRow(self, source_row, source_parent):
-        for column, values in self.column_filters.items():
-            index = self.sourceModel().index(source_row, column, source_parent)
-            if index.isValid():
-                if not values:  # 如果过滤列表为空，不显示任何行
-                    return False
-                if self.sourceModel().data(index) not in values:
-                    return False
-            else:
-                return False
+        return self.filter_index.accepts(self.sourceModel().table_row(source_row))
+
+
+class ScoreTableModel(QAbstractTableModel):
+    """
+    以列式存储（ScoreTable）为数据源的成绩表格模型，不为每个单元格创建 QStandardItem。
+
+    模型的第 row 行对应成绩表格的第 table_row(row) 行，排序只改变这个对应关系。
+
+    属性:
+        score_table: 成绩表格的列式存储
+    """
+
+    def __init__(self, score_table: ScoreTable, parent=None):
+        super().__init__(parent)
+        self.score_table = score_table
+        self._order = list(range(score_table.row_count))
+
+    def table_row(self, row: int) -> int:
+        """
+        模型行号对应的成绩表格行号（即 score_data["scores"] 中的下标）。
+        """
+        return self._order[row]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.score_table.row_count
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.score_table.column_count
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            return self.score_table.text(self._order[index.row()], index.column())
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            return Qt.AlignmentFlag.AlignCenter
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return self.score_table.headers[section]
+        return str(section + 1)
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+        return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable | Qt.ItemFlag.ItemIsEditable
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if not index.isValid() or role != Qt.ItemDataRole.EditRole:
+            return False
+        text = "" if value is None else str(value)
+        table_row = self._order[index.row()]
+        if self.score_table.text(table_row, index.column()) == text:
+            return True
+        self.score_table.set_text(table_row, index.column(), text)
+        self.dataChanged.emit(index, index, [Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole])
         return True
 
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        if not 0 <= column < self.score_table.column_count:
+            return
+        self.layoutAboutToBeChanged.emit()
+        persistent = self.persistentIndexList()
+        persistent_rows = [self._order[index.row()] for index in persistent]
+
+        self._order = self.score_table.sorted_rows(column, order == Qt.SortOrder.DescendingOrder).tolist()
+        positions = {table_row: row for row, table_row in enumerate(self._order)} if persistent else {}
+        self.changePersistentIndexList(persistent, [self.index(positions[table_row], index.column())
+                                                    for index, table_row in zip(persistent, persistent_rows)])
+        self.layoutChanged.emit()
+
+
+class FilterValueListModel(QAbstractListModel):
+    """
+    过滤对话框的取值列表模型：显示列中的不同取值及其行数，可勾选、可搜索。
+
+    勾选状态以未选中的取值集合保存（与窗口的 column_filter_states 共享），不为每个取值创建列表项。
+
+    属性:
+        values: 不同取值（已排序）
+        counts: 每个取值的行数
+        unchecked: 未选中的取值集合
+    """
+
+    def __init__(self, values, counts, unchecked: set, parent=None):
+        super().__init__(parent)
+        self.values = values
+        self.counts = counts
+        self.unchecked = unchecked
+        # 当前显示的取值在 values 中的下标，None 表示全部显示
+        self._shown = None
+
+    def _value_index(self, row: int) -> int:
+        return row if self._shown is None else self._shown[row]
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.values) if self._shown is None else len(self._shown)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        value_index = self._value_index(index.row())
+        value = self.values[value_index]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return f"{value}  ({self.counts[value_index]})"
+        if role == Qt.ItemDataRole.UserRole:
+            return value
+        if role == Qt.ItemDataRole.CheckStateRole:
+            return Qt.CheckState.Unchecked if value in self.unchecked else Qt.CheckState.Checked
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+        return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable | Qt.ItemFlag.ItemIsUserCheckable
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if not index.isValid() or role != Qt.ItemDataRole.CheckStateRole:
+            return False
+        text = self.values[self._value_index(index.row())]
+        if Qt.CheckState(value) == Qt.CheckState.Checked:
+            self.unchecked.discard(text)
+        else:
+            self.unchecked.add(text)
+        self.dataChanged.emit(index, index, [Qt.ItemDataRole.CheckStateRole])
+        return True
+
+    def set_search_text(self, text: str):
+        """
+        只显示包含 text 的取值（不区分大小写），text 为空时显示全部取值。
+        """
+        self.beginResetModel()
+        text = text.strip().lower()
+        self._shown = None if not text else [i for i, value in enumerate(self.values) if text in value.lower()]
+        self.endResetModel()
+
+    def set_all_checked(self, checked: bool):
+        """
+        选中或取消选中当前显示的全部取值。
+        """
+        shown = (self.values if self._shown is None else [self.values[i] for i in self._shown])
+        if checked:
+            self.unchecked.difference_update(shown)
+        else:
+            self.unchecked.update(shown)
+        if self.rowCount():
+            self.dataChanged.emit(self.index(0), self.index(self.rowCount() - 1), [Qt.ItemDataRole.CheckStateRole])
+
+    def selected_values(self) -> list:
+        """
+        选中的取值（包括被搜索隐藏的取值）。
+        """
+        return [value for value in self.values if value not in self.unchecked]
+
 
 class StudentInfoWindow(QDialog):
-    def __init__(self, student_id):
+    def __init__(self, student_id, score_store=None):
         super().__init__()
 
         self.data_modified = False
+        # 修改日志写入失败时，关闭窗口保存时退回到整体重写
+        self.journal_failed = False
+        # 正在后台整体保存成绩数据的任务，None 表示空闲
+        self.save_task = None
         self.score_data = None
-        self.student_score_analyzer = StudentScoreAnalyzer(self)
+        self.student_score_analyzer = StudentScoreAnalyzer(self, score_store=score_store)
         self.column_filter_states = {}
         self.student_id = student_id
+        # 已打开的学位进度窗口，成绩修改时同步更新
+        self.progress_window = None
 
         self.setWindowTitle("学生信息")
         self.resize(1400, 800)
@@ -69,22 +237,16 @@ class StudentInfoWindow(QDialog):
         info_label = QLabel(f"姓名: {student_info.get('姓名', 'N/A')}  学号: {student_info.get('学号', 'N/A')}")
         main_layout.addWidget(info_label)
 
-        self.model = QStandardItemModel()
-        self.proxy_model = CustomSortFilterProxyModel()
-        self.proxy_model.setSourceModel(self.model)
-
         scores = self.score_data.get("scores", [])
         if scores:
-            # 动态获取所有列名
-            headers = list(scores[0].keys())
-            self.model.setHorizontalHeaderLabels(headers)
-
-            for score in scores:
-                row_items = [QStandardItem(str(score.get(header, ""))) for header in headers]
-                # 设置每个单元格的对齐方式
-                for item in row_items:
-                    item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                self.model.appendRow(row_items)
+            # 动态获取所有列名，按列保存：文本为分类编码，数值列另存为浮点数组
+            self.score_table = ScoreTable(scores)
+            headers = self.score_table.headers
+            self.model = ScoreTableModel(self.score_table)
+            self.proxy_model = CustomSortFilterProxyModel()
+            self.proxy_model.setSourceModel(self.model)
+            # 当前显示的行的加权累计量，修改单元格或过滤时增量更新
+            self.weighted_aggregates = WeightedAggregates(self.score_table, self.proxy_model.filter_index)
 
             filter_layout = QHBoxLayout()
             self.filter_buttons = []
@@ -124,6 +286,10 @@ class StudentInfoWindow(QDialog):
 
             # 初始计算并显示加权绩点和加权分数
             self.update_weighted_calculations()
+
+            # 上次未保存的修改已从修改日志中恢复，关闭时需要确认是否保存
+            if self.student_score_analyzer.recovered_edits:
+                self.data_modified = True
         else:
             error_label = QLabel("没有成绩数据")
             main_layout.addWidget(error_label)
@@ -161,25 +327,48 @@ class StudentInfoWindow(QDialog):
         self.setLayout(main_layout)
 
     def show_degree_progress(self):
-        progress_window = create_degree_progress_window(student_id=self.student_id, parent=self)
-        if progress_window:
-            progress_window.show()
+        # 学位进度窗口（numpy、培养方案解析）在第一次打开时才导入
+        from .DegreeProgressShow import create_degree_progress_window
+
+        # 需要先导入培养方案时，窗口在导入完成后才创建，同样通过回调记录
+        create_degree_progress_window(student_id=self.student_id, parent=self,
+                                      on_window_created=self.set_progress_window)
+
+    def set_progress_window(self, progress_window):
+        """
+        记录已打开的学位进度窗口，之后的成绩修改同步到该窗口。
+        """
+        self.progress_window = progress_window
+        progress_window.set_scores(self.score_data["scores"])
 
     def on_table_view_data_changed(self, top_left, bottom_right, roles):
         for row in range(top_left.row(), bottom_right.row() + 1):
             for column in range(top_left.column(), bottom_right.column() + 1):
                 index = self.model.index(row, column)
-                item = self.model.itemFromIndex(index)
-                if item:
+                if index.isValid():
                     column_name = self.model.headerData(column, Qt.Orientation.Horizontal)
-                    value = item.text()
+                    value = self.model.data(index)
+                    # 模型行号（排序后）对应 score_data 中的下标
+                    score_row = self.model.table_row(index.row())
 
                     # 更新 score_data 中的值
-                    if 0 <= row < len(self.score_data["scores"]):
-                        self.score_data["scores"][row][column_name] = value
-                        print(f"Data updated in score_data: row {row}, column {column_name}, value {value}")
+                    if 0 <= score_row < len(self.score_data["scores"]):
+                        if self.score_data["scores"][score_row].get(column_name) == value:
+                            continue
+                        old_score = dict(self.score_data["scores"][score_row])
+                        try:
+                            # 先写入修改日志，再修改内存中的数据
+                            self.student_score_analyzer.record_edit(self.student_id, score_row, column_name, value)
+                        except (IOError, OSError) as e:
+                            print(f"Failed to journal edit: {str(e)}")
+                            self.journal_failed = True
+                        self.score_data["scores"][score_row][column_name] = value
+                        if self.progress_window is not None:
+                            # 学位进度只重新计算这门课程所属的课程类型
+                            self.progress_window.update_score(old_score, self.score_data["scores"][score_row])
+                        print(f"Data updated in score_data: row {score_row}, column {column_name}, value {value}")
                     else:
-                        print(f"Failed to update data: row {row} out of range")
+                        print(f"Failed to update data: row {score_row} out of range")
 
         # 设置一个标志，表示数据已被修改
         self.data_modified = True
@@ -200,57 +389,43 @@ class StudentInfoWindow(QDialog):
         button_layout.addWidget(select_none_button)
         layout.addLayout(button_layout)
 
-        list_widget = QListWidget()
-        unique_values = sorted(set(self.model.item(row, column).text() for row in range(self.model.rowCount()) if
-                                   self.model.item(row, column) is not None))
+        # 搜索框，只显示包含搜索文本的取值
+        search_edit = QLineEdit()
+        search_edit.setPlaceholderText("搜索")
+        search_edit.setClearButtonEnabled(True)
+        layout.addWidget(search_edit)
 
-        # 如果这个列还没有保存的状态，初始化为全选
+        # 如果这个列还没有保存的状态，初始化为全选（保存未选中的取值）
         if column not in self.column_filter_states:
-            self.column_filter_states[column] = {}
-
-        # 添加所有选项到列表中，根据保存的状态设置选中状态
-        for value in unique_values:
-            item = QListWidgetItem(value)
-            item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
-            # 如果值不在字典中，默认设置为选中状态
-            if value not in self.column_filter_states[column]:
-                self.column_filter_states[column][value] = True
-            item.setCheckState(
-                Qt.CheckState.Checked if self.column_filter_states[column][value] else Qt.CheckState.Unchecked)
-            list_widget.addItem(item)
+            self.column_filter_states[column] = set()
+
+        # 不同取值及其行数直接从列索引读取，列表只绘制可见的行
+        values, counts = self.score_table.value_counts(column)
+        list_model = FilterValueListModel(values, counts, self.column_filter_states[column], dialog)
+        list_view = QListView()
+        list_view.setUniformItemSizes(True)
+        list_view.setModel(list_model)
+
+        search_edit.textChanged.connect(list_model.set_search_text)
 
         # 连接全选按钮
-        select_all_button.clicked.connect(lambda: self.set_all_items(list_widget, True, column))
+        select_all_button.clicked.connect(lambda: list_model.set_all_checked(True))
 
         # 连接全不选按钮
-        select_none_button.clicked.connect(lambda: self.set_all_items(list_widget, False, column))
-
-        # 连接itemChanged信号到更新字典的函数
-        list_widget.itemChanged.connect(lambda item: self.update_filter_state(column, item))
+        select_none_button.clicked.connect(lambda: list_model.set_all_checked(False))
 
-        layout.addWidget(list_widget)
+        layout.addWidget(list_view)
 
         apply_button = QPushButton("应用")
-        apply_button.clicked.connect(lambda: self.apply_filter(column, list_widget, dialog))
+        apply_button.clicked.connect(lambda: self.apply_filter(column, list_model, dialog))
         layout.addWidget(apply_button)
 
         dialog.setLayout(layout)
         dialog.exec()
 
-    def set_all_items(self, list_widget, checked, column):
-        for i in range(list_widget.count()):
-            item = list_widget.item(i)
-            item.setCheckState(Qt.CheckState.Checked if checked else Qt.CheckState.Unchecked)
-            self.column_filter_states[column][item.text()] = checked
-
-    def update_filter_state(self, column, item):
-        # 更新字典中的状态
-        self.column_filter_states[column][item.text()] = (item.checkState() == Qt.CheckState.Checked)
-
-    def apply_filter(self, column, list_widget, dialog):
+    def apply_filter(self, column, list_model, dialog):
         # 获取所有选中的值
-        selected_values = [list_widget.item(i).text() for i in range(list_widget.count())
-                           if list_widget.item(i).checkState() == Qt.CheckState.Checked]
+        selected_values = list_model.selected_values()
 
         # 应用过滤器
         self.proxy_model.setColumnFilter(column, selected_values)
@@ -261,6 +436,11 @@ class StudentInfoWindow(QDialog):
         dialog.accept()
 
     def closeEvent(self, event):
+        if self.save_task is not None:
+            # 正在保存，保存结束后窗口会自动关闭
+            event.ignore()
+            return
+
         if self.data_modified:
             reply = QMessageBox.question(
                 self,
@@ -270,74 +450,54 @@ class StudentInfoWindow(QDialog):
             )
 
             if reply == QMessageBox.StandardButton.Yes:
-                if self.student_score_analyzer.save_score_data(student_id=self.student_id, score_data=self.score_data):
-                    event.accept()  # 保存成功，允许关闭窗口
+                if self.journal_failed:
+                    # 修改日志不完整，只能整体重写；在后台保存，保存成功后再关闭窗口
+                    self.save_score_data_in_background()
+                    event.ignore()
                 else:
-                    QMessageBox.warning(self, "保存失败", "保存数据时发生错误。")
-                    event.ignore()  # 保存失败，不关闭窗口
+                    # 修改已在日志中持久化，后台合并进主记录，窗口立即关闭
+                    self.student_score_analyzer.commit_edits(self.student_id)
+                    event.accept()
             elif reply == QMessageBox.StandardButton.No:
+                self.student_score_analyzer.discard_edits(self.student_id)
                 event.accept()  # 不保存，允许关闭窗口
             else:  # Cancel
                 event.ignore()  # 取消关闭操作
         else:
             event.accept()  # 如果数据没有被修改，直接关闭窗口
 
+    def save_score_data_in_background(self):
+        """
+        在后台线程中整体保存成绩数据，保存期间显示进度对话框（窗口模态，不能编辑表格）。
+        """
+        def save(task):
+            return self.student_score_analyzer.save_score_data(student_id=self.student_id, score_data=self.score_data)
+
+        self.save_task = run_with_progress_dialog(self, "保存更改", "正在保存成绩数据...", save,
+                                                  on_finished=self.on_save_finished,
+                                                  on_failed=lambda error: self.on_save_finished(False),
+                                                  cancellable=False)
+
+    def on_save_finished(self, succeeded):
+        self.save_task = None
+        if succeeded:
+            self.student_score_analyzer.discard_all_edits(self.student_id)
+            self.data_modified = False
+            self.close()  # 保存成功，关闭窗口
+        else:
+            QMessageBox.warning(self, "保存失败", "保存数据时发生错误。")  # 保存失败，不关闭窗口
+
     def update_weighted_calculations(self):
-        total_credits = 0
-        total_gpa_points = 0
-        total_score_points = 0
-
-        # 找到对应的列索引
-        credit_index = -1
-        gpa_index = -1
-        score_index = -1
-        course_type_index = -1
-
-        for col in range(self.model.columnCount()):
-            header = self.model.headerData(col, Qt.Orientation.Horizontal)
-            if header == "学分":
-                credit_index = col
-            elif header in ["GPA", "绩点"]:
-                gpa_index = col
-            elif header in ["总成绩", "学分成绩"]:
-                score_index = col
-            elif header == "课程性质":
-                course_type_index = col
-
-        if credit_index == -1:
+        totals = self.weighted_aggregates.totals()
+
+        if totals is None:
             self.gpa_label.setText("加权绩点: 未找到学分列")
             self.weighted_score_label.setText("加权分数: 未找到学分列")
             return
 
-        for row in range(self.proxy_model.rowCount()):
-            # 检查课程性质
-            if course_type_index != -1:
-                course_type = self.proxy_model.data(self.proxy_model.index(row, course_type_index))
-                if course_type == "校选":
-                    continue  # 跳过校选课程
-
-            credit = float(self.proxy_model.data(self.proxy_model.index(row, credit_index)) or 0)
-
-            if score_index != -1:
-                score = self.proxy_model.data(self.proxy_model.index(row, score_index))
-                if score == "合格":
-                    continue  # 跳过成绩为"合格"的课程
-                try:
-                    score = float(score or 0)
-                    total_score_points += score * credit
-                    total_credits += credit
-                except ValueError:
-                    # 如果成绩无法转换为浮点数，跳过这门课程
-                    continue
-
-            if gpa_index != -1:
-                gpa = self.proxy_model.data(self.proxy_model.index(row, gpa_index))
-                try:
-                    gpa = float(gpa or 0)
-                    total_gpa_points += gpa * credit
-                except ValueError:
-                    # 如果GPA无法转换为浮点数，跳过GPA计算
-                    pass
+        total_credits, total_gpa_points, total_score_points = totals
+        gpa_index = self.score_table.last_column_index(GPA_COLUMNS)
+        score_index = self.score_table.last_column_index(SCORE_COLUMNS)
 
         if total_credits > 0:
             weighted_gpa = total_gpa_points / total_credits if gpa_index != -1 else None
@@ -0,0 +1,405 @@
+"""
+GradeClient 模块
+
+直接请求 jwapp 成绩查询（cjcx）页面加载数据所用的 JSON 接口获取全部成绩，不驱动浏览器读取表格。
+主要功能包括：
+1. 读写 Cookie 文件（Mozilla/Netscape 格式），浏览器只用于登录并导出 Cookie，Cookie 有效时不打开浏览器
+2. 长连接（keep-alive）连接池，多个请求复用同一批 TCP/TLS 连接
+3. 以接口允许的最大每页条数分页，第一页得到总条数后并发请求其余各页
+4. 把接口字段转换为成绩页面表格的列（学年学期、课程名……），按学年学期分表
+
+该模块不依赖 selenium 和 PyQt6，可以配合 stub_grade_server 离线运行：
+    python -m scraper.stub_grade_server --port 8765
+    python -m scraper.grade_client --base-url http://127.0.0.1:8765 --stub-login
+"""
+
+import argparse
+import http.client
+import http.cookiejar
+import json
+import math
+import os
+import queue
+import sys
+import threading
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.getcwd())
+
+DEFAULT_BASE_URL = "https://jw.xmu.edu.cn"
+# 成绩查询页面（cjcx）加载"全部成绩"表格时请求的接口
+GRADE_API_PATH = "/jwapp/sys/cjcx/modules/cjcx/xscjcx.do"
+GRADE_DATASET = "xscjcx"
+# 接口允许的最大每页条数；服务器限制更小时按实际返回的条数计算页数
+MAX_PAGE_SIZE = 1000
+# 全部成绩：不加查询条件，按学年学期倒序
+DEFAULT_QUERY_SETTING = []
+DEFAULT_ORDER = "-XNXQDM,-KCH,-KXH"
+DEFAULT_MAX_CONNECTIONS = 4
+DEFAULT_COOKIE_JAR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'cache', 'jwapp_cookies.txt'))
+
+# 接口字段 -> 成绩页面表格的列，顺序与 GradeScraper.valid_column_headers 相同
+GRADE_FIELDS = [
+    ("XNXQDM_DISPLAY", "学年学期"), ("KCM", "课程名"), ("KCH", "课程号"), ("ZCJ", "总成绩"), ("KXH", "课序号"),
+    ("KCLBDM_DISPLAY", "课程类别"), ("KCXZDM_DISPLAY", "课程性质"), ("XF", "学分"), ("XS", "学时"),
+    ("XDFSDM_DISPLAY", "修读方式"), ("SFZX_DISPLAY", "是否主修"), ("KSSJ", "考试日期"), ("XFJD", "绩点"),
+    ("CXCKDM_DISPLAY", "重修重考"), ("DJCJLXDM_DISPLAY", "等级成绩类型"), ("KSLXDM_DISPLAY", "考试类型"),
+    ("KKDWDM_DISPLAY", "开课单位"), ("SFJG_DISPLAY", "是否及格"), ("SFYX_DISPLAY", "是否有效"),
+]
+GRADE_COLUMNS = [column for _, column in GRADE_FIELDS]
+# 每条成绩必须包含的字段；字段名与实际接口不符时报错，改为在浏览器中读取表格，而不是保存空白的成绩
+REQUIRED_FIELDS = ("KCM", "KCH", "ZCJ")
+TERM_COLUMN = "学年学期"
+
+# 重用连接时服务器可能已关闭空闲连接，出现这些错误时用新连接重试一次
+_STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, http.client.CannotSendRequest, ConnectionResetError,
+                            BrokenPipeError)
+
+
+class GradeApiError(Exception):
+    """
+    成绩接口请求失败或返回了无法识别的数据。
+    """
+
+
+class SessionExpiredError(GradeApiError):
+    """
+    Cookie 缺失或已过期（接口跳转到登录页），需要重新登录。
+    """
+
+
+class ConnectionPool:
+    """
+    ConnectionPool 类维护到同一服务器的一组长连接，请求结束后连接放回池中复用。
+
+    属性:
+        scheme: http 或 https
+        host: 主机名
+        port: 端口，None 表示默认端口
+        created: 已建立的连接数
+    """
+
+    def __init__(self, base_url: str, max_connections: int = DEFAULT_MAX_CONNECTIONS, timeout: float = 30):
+        """
+        初始化 ConnectionPool 对象。
+
+        :param base_url: 服务器地址，如 https://jw.xmu.edu.cn
+        :param max_connections: 最多同时使用的连接数
+        :param timeout: 连接和读取超时（秒）
+        """
+        parts = urllib.parse.urlsplit(base_url)
+        self.scheme = parts.scheme or "https"
+        self.host = parts.hostname
+        self.port = parts.port
+        self.timeout = timeout
+        self.created = 0
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._lock = threading.Lock()
+
+    def _new_connection(self):
+        connection_class = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+        with self._lock:
+            self.created += 1
+        return connection_class(self.host, self.port, timeout=self.timeout)
+
+    def request(self, method: str, path: str, body=None, headers=None):
+        """
+        使用池中的连接发送请求并读取完整响应。
+
+        :return: (状态码, 响应头 HTTPMessage, 响应体 bytes)
+        """
+        with self._slots:
+            try:
+                connection, reused = self._idle.get_nowait(), True
+            except queue.Empty:
+                connection, reused = self._new_connection(), False
+
+            try:
+                try:
+                    response = self._send(connection, method, path, body, headers)
+                except _STALE_CONNECTION_ERRORS:
+                    if not reused:
+                        raise
+                    connection.close()
+                    connection = self._new_connection()
+                    response = self._send(connection, method, path, body, headers)
+                data = response.read()
+            except Exception:
+                connection.close()
+                raise
+
+            if response.will_close:
+                connection.close()
+            else:
+                self._idle.put(connection)
+            return response.status, response.msg, data
+
+    @staticmethod
+    def _send(connection, method, path, body, headers):
+        connection.request(method, path, body=body, headers=headers or {})
+        return connection.getresponse()
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class _CookieResponse:
+    """
+    把 http.client 的响应头包装成 CookieJar.extract_cookies 需要的接口。
+    """
+
+    def __init__(self, message):
+        self._message = message
+
+    def info(self):
+        return self._message
+
+
+class GradeApiClient:
+    """
+    GradeApiClient 类通过成绩查询接口获取全部成绩。
+
+    属性:
+        base_url: 服务器地址
+        cookie_jar: 登录后的 Cookie（请求时发送，响应中的 Set-Cookie 会更新到这里）
+        page_size: 每页请求的条数
+        max_connections: 并发请求（同时使用的连接）数
+        pool: 长连接池
+        request_count: 已发送的请求数
+    """
+
+    def __init__(self, base_url: str = DEFAULT_BASE_URL, cookie_jar: http.cookiejar.CookieJar = None,
+                 page_size: int = MAX_PAGE_SIZE, max_connections: int = DEFAULT_MAX_CONNECTIONS,
+                 timeout: float = 30):
+        """
+        初始化 GradeApiClient 对象。
+
+        :param base_url: 服务器地址
+        :param cookie_jar: 登录后的 Cookie，默认为空
+        :param page_size: 每页条数，默认为接口允许的最大值
+        :param max_connections: 并发请求数
+        :param timeout: 超时（秒）
+        """
+        self.base_url = base_url.rstrip('/')
+        self.cookie_jar = cookie_jar if cookie_jar is not None else http.cookiejar.CookieJar()
+        self.page_size = page_size
+        self.max_connections = max_connections
+        self.pool = ConnectionPool(self.base_url, max_connections=max_connections, timeout=timeout)
+        self.request_count = 0
+        self._cookie_lock = threading.Lock()
+
+    def post_json(self, path: str, fields: dict) -> dict:
+        """
+        以表单方式 POST 到接口，返回解析后的 JSON。
+
+        :raises SessionExpiredError: 未登录或 Cookie 已过期时
+        :raises GradeApiError: 其他错误
+        """
+        url = self.base_url + path
+        cookie_request = urllib.request.Request(url, method="POST")
+        with self._cookie_lock:
+            self.cookie_jar.add_cookie_header(cookie_request)
+            self.request_count += 1
+
+        headers = {
+            "Content-Type": "application/x-www-form-urlencoded; charset=UTF-8",
+            "Accept": "application/json, text/javascript, */*; q=0.01",
+            "X-Requested-With": "XMLHttpRequest",
+            "Connection": "keep-alive",
+        }
+        if cookie_request.has_header("Cookie"):
+            headers["Cookie"] = cookie_request.get_header("Cookie")
+
+        try:
+            status, message, data = self.pool.request("POST", path, urllib.parse.urlencode(fields), headers)
+        except (OSError, http.client.HTTPException) as e:
+            raise GradeApiError(f"请求成绩接口失败: {str(e)}") from e
+
+        with self._cookie_lock:
+            self.cookie_jar.extract_cookies(_CookieResponse(message), cookie_request)
+
+        if status in (301, 302, 303, 307, 401, 403):
+            raise SessionExpiredError(f"登录已失效（HTTP {status}）")
+        if status != 200:
+            raise GradeApiError(f"成绩接口返回 HTTP {status}")
+        try:
+            payload = json.loads(data.decode("utf-8"))
+        except ValueError:
+            # 未登录时接口返回登录页 HTML
+            raise SessionExpiredError("成绩接口没有返回 JSON，登录可能已失效")
+        if str(payload.get("code", "0")) != "0":
+            raise GradeApiError(f"成绩接口返回错误: {payload.get('msg', payload.get('code'))}")
+        return payload
+
+    def fetch_page(self, page_number: int, page_size: int = None):
+        """
+        获取一页成绩。
+
+        :return: (总条数, 本页的成绩字典列表)
+        """
+        payload = self.post_json(GRADE_API_PATH, {
+            "querySetting": json.dumps(DEFAULT_QUERY_SETTING),
+            "*order": DEFAULT_ORDER,
+            "pageSize": page_size or self.page_size,
+            "pageNumber": page_number,
+        })
+        try:
+            dataset = payload["datas"][GRADE_DATASET]
+            total, rows = int(dataset["totalSize"]), list(dataset["rows"])
+        except (KeyError, TypeError, ValueError) as e:
+            raise GradeApiError(f"无法识别成绩接口返回的数据: {str(e)}")
+        check_grade_fields(rows)
+        return total, rows
+
+    def fetch_all_grades(self) -> list:
+        """
+        获取全部成绩：先请求第一页得到总条数，再并发请求其余各页，结果按页码顺序拼接。
+
+        :return: 成绩字典列表（接口字段）
+        """
+        total, rows = self.fetch_page(1)
+        if total and not rows:
+            raise GradeApiError(f"成绩接口返回的总条数为 {total}，但第一页没有成绩")
+        # 服务器可能把每页条数限制得比请求的小
+        page_size = len(rows) if 0 < len(rows) < min(total, self.page_size) else self.page_size
+        page_count = math.ceil(total / page_size) if page_size else 1
+        if page_count > 1:
+            with ThreadPoolExecutor(max_workers=self.max_connections) as executor:
+                pages = executor.map(lambda page_number: self.fetch_page(page_number, page_size)[1],
+                                     range(2, page_count + 1))
+                for page_rows in pages:
+                    rows.extend(page_rows)
+        return rows
+
+    def close(self):
+        self.pool.close()
+
+
+def check_grade_fields(rows: list):
+    """
+    检查接口返回的每条成绩都包含 REQUIRED_FIELDS。
+
+    :raises GradeApiError: 成绩不是字典或缺少必需的字段时
+    """
+    for row in rows:
+        if not isinstance(row, dict):
+            raise GradeApiError(f"无法识别成绩接口返回的成绩: {row!r}")
+        missing = [field for field in REQUIRED_FIELDS if field not in row]
+        if missing:
+            raise GradeApiError(f"成绩接口返回的成绩缺少字段 {', '.join(missing)}，"
+                                f"实际字段为 {', '.join(sorted(row))}")
+
+
+def grade_cell_text(value) -> str:
+    """
+    接口字段值转换为页面表格中显示的文本。
+    """
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value).strip()
+
+
+def grades_to_tables(rows: list) -> list:
+    """
+    把接口返回的成绩按学年学期分组，生成与页面表格相同的 (表头, 行数据) 列表，学年学期按出现顺序排列。
+
+    :param rows: 接口返回的成绩字典列表
+    :return: [(表头, [[单元格文本, ...], ...]), ...]
+    :raises GradeApiError: 成绩缺少必需的字段时
+    """
+    check_grade_fields(rows)
+    tables = {}
+    for row in rows:
+        cells = [grade_cell_text(row.get(field, row.get(field.replace("_DISPLAY", "")))) for field, _ in GRADE_FIELDS]
+        tables.setdefault(cells[0], []).append(cells)
+    return [(list(GRADE_COLUMNS), data) for data in tables.values()]
+
+
+def load_cookie_jar(path: str = DEFAULT_COOKIE_JAR) -> http.cookiejar.MozillaCookieJar:
+    """
+    读取 Cookie 文件，文件不存在或无法读取时返回空的 Cookie。
+    """
+    cookie_jar = http.cookiejar.MozillaCookieJar(path)
+    if os.path.exists(path):
+        try:
+            # 登录 Cookie 大多是会话 Cookie，也需要保留
+            cookie_jar.load(ignore_discard=True, ignore_expires=False)
+        except (OSError, http.cookiejar.LoadError) as e:
+            print(f"无法读取 Cookie 文件，将重新登录: {str(e)}")
+            cookie_jar.clear()
+    return cookie_jar
+
+
+def save_cookie_jar(cookie_jar: http.cookiejar.MozillaCookieJar):
+    """
+    写入 Cookie 文件。文件中是有效的登录会话，只允许当前用户读写（0600），包括之前以其他权限创建的文件。
+    """
+    os.makedirs(os.path.dirname(cookie_jar.filename), exist_ok=True)
+    # 先以 0600 创建文件再写入，较早版本的 Python 保存时按默认权限创建文件
+    os.close(os.open(cookie_jar.filename, os.O_CREAT | os.O_WRONLY, 0o600))
+    os.chmod(cookie_jar.filename, 0o600)
+    cookie_jar.save(ignore_discard=True, ignore_expires=False)
+
+
+def add_browser_cookies(cookie_jar: http.cookiejar.CookieJar, cookies: list):
+    """
+    把 WebDriver.get_cookies() 返回的 Cookie 加入 cookie_jar。
+
+    :param cookie_jar: Cookie
+    :param cookies: [{"name", "value", "domain", "path", "secure", "expiry", "httpOnly"}, ...]
+    """
+    for cookie in cookies:
+        domain = cookie.get("domain", "")
+        expires = cookie.get("expiry")
+        cookie_jar.set_cookie(http.cookiejar.Cookie(
+            version=0, name=cookie["name"], value=cookie["value"], port=None, port_specified=False,
+            domain=domain, domain_specified=domain.startswith('.'), domain_initial_dot=domain.startswith('.'),
+            path=cookie.get("path", "/"), path_specified=True, secure=bool(cookie.get("secure")),
+            expires=int(expires) if expires is not None else None, discard=expires is None,
+            comment=None, comment_url=None, rest={"HttpOnly": None} if cookie.get("httpOnly") else {}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="通过成绩查询接口获取全部成绩")
+    parser.add_argument("--base-url", default=DEFAULT_BASE_URL, help="服务器地址")
+    parser.add_argument("--cookie-jar", default=DEFAULT_COOKIE_JAR, help="Cookie 文件")
+    parser.add_argument("--page-size", type=int, default=MAX_PAGE_SIZE, help="每页条数")
+    parser.add_argument("--connections", type=int, default=DEFAULT_MAX_CONNECTIONS, help="并发连接数")
+    parser.add_argument("--stub-login", action="store_true", help="使用 stub_grade_server 的会话 Cookie（离线测试）")
+    parser.add_argument("--output", help="把成绩写入该 JSON 文件")
+    args = parser.parse_args()
+
+    cookie_jar = load_cookie_jar(args.cookie_jar)
+    if args.stub_login:
+        from scraper.stub_grade_server import stub_session_cookies
+        add_browser_cookies(cookie_jar, stub_session_cookies(args.base_url))
+
+    client = GradeApiClient(args.base_url, cookie_jar, page_size=args.page_size, max_connections=args.connections)
+    try:
+        rows = client.fetch_all_grades()
+    except SessionExpiredError as e:
+        print(f"{str(e)}，请先通过 scraper.py 登录")
+        sys.exit(1)
+    finally:
+        client.close()
+
+    tables = grades_to_tables(rows)
+    print(f"共 {len(rows)} 条成绩，{len(tables)} 个学年学期，请求 {client.request_count} 次，"
+          f"建立连接 {client.pool.created} 个")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump([dict(zip(header, cells)) for header, data in tables for cells in data], file,
+                      ensure_ascii=False, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,7 @@
+import json
 import os
 import time
+import urllib.parse
 import pandas as pd
 from PyQt6.QtCore import QTimer, Qt
 from selenium import webdriver
@@ -20,6 +22,37 @@ from PyQt6.QtWidgets import QApplication, QDialog, QPushButton, QVBoxLayout, QLa
     QLineEdit, QWidget
 import sys
 
+# 以脚本运行时 scraper/ 位于 sys.path 首位，"scraper" 会解析为本文件，需要把项目根目录放在前面
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scraper.grade_client import (DEFAULT_COOKIE_JAR, GradeApiClient, GradeApiError, SessionExpiredError,
+                                  add_browser_cookies, grades_to_tables, load_cookie_jar, save_cookie_jar)
+
+
+# 在页面中一次性提取所有成绩表格的表头和单元格文本，返回 JSON 字符串：
+# [{"headers": [...], "rows": [[...], ...]}, ...]，结构与逐元素查找的 XPath 一致，
+# 某个表格缺少表头区或内容区时对应项为 null，由逐元素查找的方式处理
+EXTRACT_TABLES_SCRIPT = """
+const text = (node) => node ? node.textContent : null;
+const tables = document.querySelectorAll('[id^="contentqb-index-table-"]');
+return JSON.stringify(Array.from(tables, (table) => {
+    const headerArea = table.querySelector('[id^="columntableqb-index-table-"]');
+    const contentArea = table.querySelector('[id^="contenttableqb-index-table-"]');
+    const tbody = contentArea && contentArea.querySelector('tbody');
+    if (!headerArea || !tbody) {
+        return null;
+    }
+    const headers = Array.from(headerArea.querySelectorAll('div[role="columnheader"]'),
+                               (header) => text(header.querySelector('span')));
+    if (headers.includes(null)) {
+        return null;
+    }
+    const rows = Array.from(tbody.querySelectorAll('tr'),
+                            (row) => Array.from(row.querySelectorAll('td'), text));
+    return {headers: headers, rows: rows};
+}));
+"""
+
 
 class WelcomePage(QWidget):
     def __init__(self, default_username="", default_password=""):
@@ -163,13 +196,18 @@ class TimedMessageBox(QMessageBox):
 
 
 class GradeScraper:
-    def __init__(self):
+    def __init__(self, bulk_extraction=True, client_mode=True, cookie_jar_path=DEFAULT_COOKIE_JAR):
         self.valid_column_headers = [
             "学年学期", "课程名", "课程号", "总成绩", "课序号", "课程类别", "课程性质", "学分",
             "学时", "修读方式", "是否主修", "考试日期", "绩点", "重修重考", "等级成绩类型", "考试类型",
             "开课单位", "是否及格", "是否有效"
         ]
         self.driver = None
+        # True 时每次抓取只调用一次 execute_script 提取全部表格，失败时退回逐元素查找
+        self.bulk_extraction = bulk_extraction
+        # True 时直接请求成绩接口（浏览器只用于登录），失败时退回在浏览器中读取表格
+        self.client_mode = client_mode
+        self.cookie_jar_path = cookie_jar_path
         self.app = QApplication.instance() or QApplication(sys.argv)
 
     def show_message(self, title, message, timeout=3000):
@@ -247,12 +285,109 @@ class GradeScraper:
     def get_element_text(element):
         return element.get_attribute('textContent').strip()
 
+    def select_valid_columns(self, column_titles, rows):
+        """
+        只保留表头在 valid_column_headers 中的列，缺少的单元格补为空字符串
+        """
+        valid_indices = [i for i, title in enumerate(column_titles) if title in self.valid_column_headers]
+        valid_titles = [column_titles[i] for i in valid_indices]
+        data = [[cells[j] if j < len(cells) else '' for j in valid_indices] for cells in rows]
+        return valid_titles, data
+
+    def extract_tables_by_script(self):
+        """
+        在页面中执行一次脚本，提取所有表格的表头和单元格文本。
+        返回每个表格的 (表头, 行) 列表，无法提取的表格对应 None；脚本执行失败时返回 None
+        """
+        try:
+            tables = json.loads(self.driver.execute_script(EXTRACT_TABLES_SCRIPT))
+        except Exception as e:
+            print(f"脚本提取表格失败，改为逐元素查找: {e}")
+            return None
+
+        def strip(value):
+            return value.strip() if value else ''
+
+        return [([strip(header) for header in table["headers"]],
+                 [[strip(cell) for cell in row] for row in table["rows"]]) if table else None
+                for table in tables]
+
+    def extract_table_by_elements(self, content_element):
+        """
+        逐元素查找一个表格的表头和单元格（每个元素一次 WebDriver 请求），只读取有效列的单元格
+        """
+        column_header_element = self.wait_for_element(By.XPATH,
+                                                      './/*[starts-with(@id, "columntableqb-index-table-")]',
+                                                      element=content_element)
+        column_headers = column_header_element.find_elements(By.XPATH, './/div[@role="columnheader"]')
+        column_titles = [self.get_element_text(header.find_element(By.TAG_NAME, 'span')) for header in
+                         column_headers]
+
+        valid_indices = [i for i, title in enumerate(column_titles) if
+                         title in self.valid_column_headers]
+        valid_titles = [title for title in column_titles if title in self.valid_column_headers]
+
+        content_table_element = self.wait_for_element(By.XPATH,
+                                                      './/*[starts-with(@id, "contenttableqb-index-table-")]',
+                                                      element=content_element)
+        tbody_element = self.wait_for_element(By.TAG_NAME, 'tbody', element=content_table_element)
+        content_rows = tbody_element.find_elements(By.TAG_NAME, 'tr')
+
+        data = []
+        for row in content_rows:
+            cells = row.find_elements(By.TAG_NAME, 'td')
+            row_data = []
+            for j in valid_indices:
+                if j < len(cells):
+                    cell_text = self.get_element_text(cells[j])
+                    row_data.append(cell_text)
+                else:
+                    row_data.append('')
+            data.append(row_data)
+        return valid_titles, data
+
+    def extract_tables(self):
+        """
+        提取所有成绩表格，返回每个表格的 (有效表头, 行数据) 或提取时发生的异常
+        """
+        table_xpath = '//*[starts-with(@id, "contentqb-index-table-")]'
+        self.wait_for_element(By.XPATH, table_xpath)
+
+        scripted_tables = self.extract_tables_by_script() if self.bulk_extraction else None
+        if scripted_tables is not None and all(table is not None for table in scripted_tables):
+            print(f"找到 {len(scripted_tables)} 个符合条件的元素")
+            return [self.select_valid_columns(column_titles, rows) for column_titles, rows in scripted_tables]
+
+        content_elements = self.driver.find_elements(By.XPATH, table_xpath)
+        print(f"找到 {len(content_elements)} 个符合条件的元素")
+        if scripted_tables is not None and len(scripted_tables) != len(content_elements):
+            # 脚本执行后页面发生了变化，全部改为逐元素查找
+            scripted_tables = None
+
+        results = []
+        for i, content_element in enumerate(content_elements):
+            try:
+                if scripted_tables is not None and scripted_tables[i] is not None:
+                    results.append(self.select_valid_columns(*scripted_tables[i]))
+                else:
+                    results.append(self.extract_table_by_elements(content_element))
+            except Exception as e:
+                results.append(e)
+        return results
+
     def scrape_and_save_data(self):
         try:
-            self.wait_for_element(By.XPATH, '//*[starts-with(@id, "contentqb-index-table-")]')
-            content_elements = self.driver.find_elements(By.XPATH, '//*[starts-with(@id, "contentqb-index-table-")]')
-            print(f"找到 {len(content_elements)} 个符合条件的元素")
+            self.save_tables(self.extract_tables())
+        except TimeoutException:
+            self.show_message("错误", "等待表格加载超时")
+        except Exception as e:
+            self.show_message("错误", f"发生错误: {e}")
 
+    def save_tables(self, tables):
+        """
+        把每个表格的 (有效表头, 行数据)（或提取时发生的异常）保存为 Excel，每个表格一个工作表，另有合并的总表
+        """
+        try:
             all_data = []
             directory = "table_contents"
             file_name = "all_tables_content.xlsx"
@@ -267,36 +402,11 @@ class GradeScraper:
                 print(f"已删除现有文件: {file_path}")
 
             with pd.ExcelWriter(file_path, engine='openpyxl') as writer:
-                for i, content_element in enumerate(content_elements, 1):
+                for i, table in enumerate(tables, 1):
                     try:
-                        column_header_element = self.wait_for_element(By.XPATH,
-                                                                      './/*[starts-with(@id, "columntableqb-index-table-")]',
-                                                                      element=content_element)
-                        column_headers = column_header_element.find_elements(By.XPATH, './/div[@role="columnheader"]')
-                        column_titles = [self.get_element_text(header.find_element(By.TAG_NAME, 'span')) for header in
-                                         column_headers]
-
-                        valid_indices = [i for i, title in enumerate(column_titles) if
-                                         title in self.valid_column_headers]
-                        valid_titles = [title for title in column_titles if title in self.valid_column_headers]
-
-                        content_table_element = self.wait_for_element(By.XPATH,
-                                                                      './/*[starts-with(@id, "contenttableqb-index-table-")]',
-                                                                      element=content_element)
-                        tbody_element = self.wait_for_element(By.TAG_NAME, 'tbody', element=content_table_element)
-                        content_rows = tbody_element.find_elements(By.TAG_NAME, 'tr')
-
-                        data = []
-                        for row in content_rows:
-                            cells = row.find_elements(By.TAG_NAME, 'td')
-                            row_data = []
-                            for j in valid_indices:
-                                if j < len(cells):
-                                    cell_text = self.get_element_text(cells[j])
-                                    row_data.append(cell_text)
-                                else:
-                                    row_data.append('')
-                            data.append(row_data)
+                        if isinstance(table, Exception):
+                            raise table
+                        valid_titles, data = table
 
                         df = pd.DataFrame(data, columns=valid_titles)
 
@@ -327,8 +437,6 @@ class GradeScraper:
 
             self.show_message("保存成功", f"所有表格内容已保存到 {file_path}")
 
-        except TimeoutException:
-            self.show_message("错误", "等待表格加载超时")
         except Exception as e:
             self.show_message("错误", f"发生错误: {e}")
 
@@ -371,10 +479,76 @@ class GradeScraper:
             if self.driver:
                 self.driver.quit()
 
+    def login_and_export_cookies(self, url, cookie_jar, browser_type='chrome', default_username="",
+                                 default_password=""):
+        """
+        用浏览器登录，进入成绩查询页面后把 Cookie 导出到 cookie_jar 并保存，随后关闭浏览器
+        """
+        self.open_browser_and_navigate(url, browser_type)
+        try:
+            self.click_login_button()  # 点击"账号登录"按钮
+            if not self.input_credentials(default_username, default_password):
+                return False
+            # 登录成功后跳转回成绩查询页面（cjcx）
+            WebDriverWait(self.driver, 60).until(lambda driver: "/jwapp/" in driver.current_url)
+            add_browser_cookies(cookie_jar, self.driver.get_cookies())
+            save_cookie_jar(cookie_jar)
+            return True
+        except TimeoutException:
+            self.show_message("登录失败", "等待进入成绩查询页面超时")
+            return False
+        finally:
+            self.driver.quit()
+            self.driver = None
+
+    def run_client(self, url, browser_type='chrome', default_username="", default_password=""):
+        """
+        通过成绩接口获取全部成绩并保存。Cookie 文件有效时不打开浏览器，失效时用浏览器重新登录一次
+
+        :return: 是否成功（用户取消登录时返回 False）
+        :raises GradeApiError: 成绩接口无法使用时
+        """
+        parts = urllib.parse.urlsplit(url)
+        base_url = f"{parts.scheme}://{parts.netloc}"
+        cookie_jar = load_cookie_jar(self.cookie_jar_path)
+        logged_in = False
+        if not len(cookie_jar):
+            if not self.login_and_export_cookies(url, cookie_jar, browser_type, default_username, default_password):
+                return False
+            logged_in = True
+
+        client = GradeApiClient(base_url, cookie_jar)
+        try:
+            try:
+                rows = client.fetch_all_grades()
+            except SessionExpiredError:
+                if logged_in:
+                    raise
+                cookie_jar.clear()
+                if not self.login_and_export_cookies(url, cookie_jar, browser_type, default_username,
+                                                     default_password):
+                    return False
+                rows = client.fetch_all_grades()
+        finally:
+            client.close()
+
+        # 保存服务器刷新后的 Cookie
+        save_cookie_jar(cookie_jar)
+        print(f"通过成绩接口获取 {len(rows)} 条成绩，请求 {client.request_count} 次")
+        self.save_tables(grades_to_tables(rows))
+        return True
+
     def main(self, default_username="", default_password=""):
         url = ("https://jw.xmu.edu.cn/jwapp/sys/cjcx/*default/index.do?t_s=1723166960886&amp_sec_version_=1&gid_"
                "=SXBVK1NhazRDMGZOSHpjMWVFSmhUNGJ1ZFRJUGxaRUxpbGpiTHRNZVYyQ044U0VjRi9BcmZCVzdlek5YL25oZHMzeFU2eEZpVWlEcDJ0L3F1Q3ZxL2c9PQ&EMAP_LANG=zh&THEME=cherry#/cjcx")
-        scraper = GradeScraper()
+        scraper = GradeScraper(bulk_extraction=self.bulk_extraction, client_mode=self.client_mode,
+                               cookie_jar_path=self.cookie_jar_path)
+        if scraper.client_mode:
+            try:
+                scraper.run_client(url, default_username=default_username, default_password=default_password)
+                return
+            except GradeApiError as e:
+                self.show_message("提示", f"无法通过成绩接口获取成绩，改为在浏览器中读取: {str(e)}")
         scraper.run(url, default_username=default_username, default_password=default_password)
 
 
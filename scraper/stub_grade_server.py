@@ -0,0 +1,176 @@
+"""
+StubGradeServer 模块
+
+模拟 jwapp 成绩查询接口的本地 HTTP 服务器，用于离线测试和基准测试 GradeApiClient。
+主要功能包括：
+1. 按接口格式分页返回随机生成的成绩（datas.xscjcx.totalSize / rows），支持每页条数上限
+2. 没有会话 Cookie 时像真实服务器一样跳转到登录页
+3. 使用 HTTP/1.1 长连接，并统计建立的连接数和请求数，便于检查连接复用
+4. 可为每个请求加上固定延迟，模拟网络往返时间
+
+用法：
+    python -m scraper.stub_grade_server [--port 8765] [--rows 200] [--latency 0.02] [--max-page-size 1000]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.getcwd())
+
+from scraper.grade_client import GRADE_API_PATH, GRADE_DATASET, MAX_PAGE_SIZE
+
+SESSION_COOKIE_NAME = "MOD_AUTH_CAS"
+SESSION_COOKIE_VALUE = "stub-session"
+LOGIN_PATH = "/authserver/login"
+
+_TERMS = [f"{year}-{year + 1}-{term}" for year in range(2018, 2025) for term in (1, 2)]
+
+
+def make_stub_grades(count: int, seed: int = 0) -> list:
+    """
+    生成 count 条接口格式的成绩（字段名与 GRADE_FIELDS 一致）。
+    """
+    rng = random.Random(seed)
+    grades = []
+    for index in range(count):
+        score = rng.randint(55, 100)
+        grades.append({
+            "XNXQDM": f"XNXQ{index % len(_TERMS)}", "XNXQDM_DISPLAY": rng.choice(_TERMS),
+            "KCM": f"课程{index}", "KCH": f"KC{index:05d}", "ZCJ": rng.choice([str(score), "合格", "优秀"]),
+            "KXH": f"{rng.randint(1, 9):02d}", "KCLBDM_DISPLAY": rng.choice(["通识教育", "专业教育", "实践教学"]),
+            "KCXZDM_DISPLAY": rng.choice(["必修", "选修", "校选"]), "XF": rng.choice([1.0, 2.0, 3.0, 1.5]),
+            "XS": rng.choice([16, 32, 48, 64]), "XDFSDM_DISPLAY": "正常修读", "SFZX_DISPLAY": "是",
+            "KSSJ": f"2023-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}", "XFJD": round(rng.uniform(1, 4), 1),
+            "CXCKDM_DISPLAY": "", "DJCJLXDM_DISPLAY": "百分制", "KSLXDM_DISPLAY": "正常考试",
+            "KKDWDM_DISPLAY": "信息学院", "SFJG_DISPLAY": "是" if score >= 60 else "否", "SFYX_DISPLAY": "是",
+        })
+    return grades
+
+
+def stub_session_cookies(base_url: str) -> list:
+    """
+    模拟服务器接受的会话 Cookie，格式与 WebDriver.get_cookies() 相同。
+    """
+    host = urllib.parse.urlsplit(base_url).hostname
+    return [{"name": SESSION_COOKIE_NAME, "value": SESSION_COOKIE_VALUE, "domain": host, "path": "/",
+             "secure": False, "httpOnly": True}]
+
+
+class StubGradeServer(ThreadingHTTPServer):
+    """
+    StubGradeServer 类模拟成绩查询接口。
+
+    属性:
+        grades: 接口返回的全部成绩
+        latency: 每个请求的延迟（秒）
+        max_page_size: 每页条数上限
+        connection_count: 建立的连接数
+        request_count: 处理的请求数
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address, grades: list, latency: float = 0.0, max_page_size: int = MAX_PAGE_SIZE):
+        super().__init__(address, _StubRequestHandler)
+        self.grades = grades
+        self.latency = latency
+        self.max_page_size = max_page_size
+        self.connection_count = 0
+        self.request_count = 0
+        self._count_lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, connection: bool = False):
+        with self._count_lock:
+            if connection:
+                self.connection_count += 1
+            else:
+                self.request_count += 1
+
+
+class _StubRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.server.count(connection=True)
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_body(self, status: int, body: bytes, content_type: str, extra_headers=()):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in extra_headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        self.server.count()
+        length = int(self.headers.get("Content-Length") or 0)
+        fields = urllib.parse.parse_qs(self.rfile.read(length).decode("utf-8"))
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        if urllib.parse.urlsplit(self.path).path != GRADE_API_PATH:
+            self.send_body(404, b"Not Found", "text/plain")
+            return
+        if f"{SESSION_COOKIE_NAME}={SESSION_COOKIE_VALUE}" not in (self.headers.get("Cookie") or ""):
+            self.send_body(302, b"", "text/html", [("Location", LOGIN_PATH)])
+            return
+
+        page_size = min(int(fields.get("pageSize", ["10"])[0]), self.server.max_page_size)
+        page_number = int(fields.get("pageNumber", ["1"])[0])
+        start = (page_number - 1) * page_size
+        payload = {"code": "0", "datas": {GRADE_DATASET: {
+            "totalSize": len(self.server.grades), "pageNumber": page_number, "pageSize": page_size,
+            "rows": self.server.grades[start:start + page_size]}}}
+        # 真实服务器会刷新会话 Cookie
+        self.send_body(200, json.dumps(payload, ensure_ascii=False).encode("utf-8"), "application/json;charset=UTF-8",
+                       [("Set-Cookie", f"JSESSIONID=stub{self.server.request_count}; Path=/")])
+
+
+def start_stub_server(grades: list, port: int = 0, latency: float = 0.0,
+                      max_page_size: int = MAX_PAGE_SIZE) -> StubGradeServer:
+    """
+    在后台线程中启动模拟服务器，port 为 0 时使用任意空闲端口。使用完后调用 shutdown() 和 server_close()。
+    """
+    server = StubGradeServer(("127.0.0.1", port), grades, latency=latency, max_page_size=max_page_size)
+    threading.Thread(target=server.serve_forever, name="stub-grade-server", daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="模拟 jwapp 成绩查询接口的本地服务器")
+    parser.add_argument("--port", type=int, default=8765, help="端口")
+    parser.add_argument("--rows", type=int, default=200, help="成绩条数")
+    parser.add_argument("--latency", type=float, default=0.0, help="每个请求的延迟（秒）")
+    parser.add_argument("--max-page-size", type=int, default=MAX_PAGE_SIZE, help="每页条数上限")
+    args = parser.parse_args()
+
+    server = StubGradeServer(("127.0.0.1", args.port), make_stub_grades(args.rows), latency=args.latency,
+                             max_page_size=args.max_page_size)
+    print(f"模拟成绩接口: {server.base_url}{GRADE_API_PATH}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()